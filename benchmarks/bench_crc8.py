@@ -0,0 +1,32 @@
+'''
+Compares parsley.crc against the crc8 package on live-telemetry sized frames
+
+Usage: python benchmarks/bench_crc8.py [frame count]  (with parsley installed, or PYTHONPATH=src)
+'''
+import random
+import sys
+import timeit
+
+import crc8 as crc8_package
+from parsley.crc import crc8
+
+def main(count: int = 100_000):
+    rng = random.Random(0)
+    frames = []
+    for _ in range(count):
+        body = bytes([0x02, 0]) + rng.randbytes(rng.randint(4, 12))
+        body = body[:1] + bytes([len(body) + 1]) + body[2:]
+        frames.append(body + bytes([crc8(body)]))
+
+    assert all(crc8_package.crc8(frame[:-1]).digest()[0] == frame[-1] for frame in frames)
+
+    timings = {
+        'crc8 package': timeit.timeit(lambda: [crc8_package.crc8(frame[:-1]).digest()[0] for frame in frames], number=1),
+        'parsley.crc.crc8': timeit.timeit(lambda: [crc8(frame[:-1]) for frame in frames], number=1),
+    }
+    baseline = timings['crc8 package']
+    for name, seconds in timings.items():
+        print(f'{name:<26} {seconds / count * 1e9:8.0f} ns/frame  {baseline / seconds:5.2f}x')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
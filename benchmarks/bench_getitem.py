@@ -0,0 +1,49 @@
+'''
+Compares subscripting parse results against the full dumps subscripting used to build
+
+Usage: python benchmarks/bench_getitem.py [result count]  (with parsley installed, or PYTHONPATH=src)
+'''
+import sys
+import timeit
+from dataclasses import asdict
+
+from corpus import make_corpus
+from parsley.parse_to_object import _ParsleyParseInternal
+from parsley.parsley_message import ParsleyError
+
+def main(count: int = 20_000):
+    _, frames = make_corpus(frames_per_type=max(1, count // 30), error_ratio=0.2)
+    results = [_ParsleyParseInternal.parse_to_object(msg_sid, msg_data) for msg_sid, msg_data in frames][:count]
+    objects = [result for result in results if not isinstance(result, ParsleyError)]
+    errors = [result for result in results if isinstance(result, ParsleyError)]
+
+    # what a consumer typically reads from each result
+    def read_object(obj):
+        return obj['msg_type'], obj['board_type_id'], obj['board_inst_id'], obj['msg_metadata'], obj['data'].get('time')
+
+    def read_object_dumped(obj):
+        return obj.model_dump()['msg_type'], obj.model_dump()['board_type_id'], obj.model_dump()['board_inst_id'], \
+            obj.model_dump()['msg_metadata'], obj.model_dump()['data'].get('time')
+
+    def read_error(err):
+        return err['msg_type'], err['board_type_id'], err['board_inst_id'], err['msg_data'], err['error']
+
+    def read_error_dumped(err):
+        return asdict(err)['msg_type'], asdict(err)['board_type_id'], asdict(err)['board_inst_id'], asdict(err)['msg_data'], asdict(err)['error']
+
+    for obj in objects:
+        assert read_object(obj) == read_object_dumped(obj)
+    for err in errors:
+        assert read_error(err) == read_error_dumped(err)
+
+    timings = {
+        'ParsleyObject model_dump()[key]': (timeit.timeit(lambda: [read_object_dumped(obj) for obj in objects], number=1), len(objects)),
+        'ParsleyObject[key]': (timeit.timeit(lambda: [read_object(obj) for obj in objects], number=1), len(objects)),
+        'ParsleyError asdict()[key]': (timeit.timeit(lambda: [read_error_dumped(err) for err in errors], number=1), len(errors)),
+        'ParsleyError[key]': (timeit.timeit(lambda: [read_error(err) for err in errors], number=1), len(errors)),
+    }
+    for name, (seconds, n) in timings.items():
+        print(f'{name:<34} {seconds / (5 * n) * 1e9:8.0f} ns/subscript')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
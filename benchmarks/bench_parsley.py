@@ -0,0 +1,225 @@
+'''
+Benchmarks the parsing and encoding hot paths on the synthetic corpus from corpus.py
+
+For every benchmark prints frames/sec, ns per decoded field, and two memory figures per frame:
+the number of memory blocks still allocated once the run returns (ie. what the results keep
+alive) and the tracemalloc peak while running.
+
+Usage: python benchmarks/bench_parsley.py [--frames-per-type N] [--repeat N] [--save FILE] [--compare FILE]
+(with parsley installed, or PYTHONPATH=src)
+
+--save writes the results as a JSON baseline; --compare reports each benchmark against a saved
+baseline and exits with status 1 if any got slower than --threshold allows.
+'''
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple
+
+from corpus import live_telemetry_frames, logger_pages, make_corpus, usb_debug_lines
+from parsley import ndjson
+from parsley.archive import ArchiveReader, ArchiveWriter
+from parsley.bitstring import BitString
+from parsley.message_definitions import CAN_MESSAGE, MESSAGE_SID
+from parsley.parse_to_object import (
+    _ParsleyParseInternal, BitstringParser, LiveTelemetryParser, LiveTelemetryStream, LoggerParser, USBDebugParser,
+)
+from parsley.parsley_message import ParsleyError
+
+class Benchmark(NamedTuple):
+    name: str
+    run: Callable[[], Any]
+    frames: int
+    fields: int
+
+class Result(NamedTuple):
+    frames_per_sec: float
+    ns_per_field: float
+    blocks_per_frame: float
+    peak_bytes_per_frame: float
+
+def make_benchmarks(frames_per_type: int, tmp_dir: str) -> list[Benchmark]:
+    """ Builds the benchmarks over a fresh corpus; files they read are written to tmp_dir """
+    parsed_datas, frames = make_corpus(frames_per_type)
+    results = [_ParsleyParseInternal.parse_to_object(msg_sid, msg_data) for msg_sid, msg_data in frames]
+    valid = [(frame, result.model_dump()) for frame, result in zip(frames, results) if not isinstance(result, ParsleyError)]
+    dumps = [dump for _, dump in valid]
+    # the SID then each payload field, as parse_fields() pops them for a valid frame
+    field_pops = [
+        (msg_sid.to_bytes(4, byteorder='big') + msg_data, [(MESSAGE_SID.length, False)] + [(field.length, field.variable_length) for field in CAN_MESSAGE.get_fields(dump['msg_type'])[4:]])
+        for (msg_sid, msg_data), dump in valid
+    ]
+
+    # decoded fields per frame: the 5 SID fields plus the payload fields, nothing for errors
+    fields = sum(5 + len(dump['data']) for dump in dumps)
+    encoded_fields = sum(len(parsed_data) for parsed_data in parsed_datas)
+    msg_sids = [msg_sid for msg_sid, _ in frames]
+    msg_datas = [msg_data for _, msg_data in frames]
+    lines = usb_debug_lines(frames)
+    text = '\n'.join(lines)
+    telemetry = live_telemetry_frames(frames)
+    stream = b''.join(telemetry)
+    pages = logger_pages(frames)
+    bitstrings = [msg_sid.to_bytes(4, byteorder='big') + msg_data for msg_sid, msg_data in frames]
+
+    usb_parser = USBDebugParser()
+    telemetry_parser = LiveTelemetryParser()
+    logger_parser = LoggerParser()
+    bitstring_parser = BitstringParser()
+    parse_to_object = _ParsleyParseInternal.parse_to_object
+    encode_data = _ParsleyParseInternal.encode_data
+    format_line = _ParsleyParseInternal.format_line
+
+    def pop_fields():
+        for data, lengths in field_pops:
+            bit_str = BitString(data)
+            for length, variable_length in lengths:
+                bit_str.pop(length, variable_length)
+
+    def read_one_field(result):
+        # what a filtering dashboard does: check the msg_type, then read one field
+        if not isinstance(result, ParsleyError) and result.msg_type:
+            return next(iter(result.data.values()), None)
+
+    def dump_json():
+        # the legacy export: json.dumps() of what parsley.parse() returns
+        file = io.StringIO()
+        for result in results:
+            if isinstance(result, ParsleyError):
+                dump = {'msg_prio': result.msg_prio, 'board_type_id': result.board_type_id, 'board_inst_id': result.board_inst_id,
+                        'msg_type': result.msg_type, 'msg_metadata': result.msg_metadata, 'data': {'msg_data': result.msg_data, 'error': result.error}}
+            else:
+                dump = result.model_dump(mode='json')
+            file.write(json.dumps(dump) + '\n')
+        return file
+
+    ndjson_file = io.StringIO()
+    ndjson.write_ndjson(results, ndjson_file)
+    ndjson_text = ndjson_file.getvalue()
+
+    def write_archive():
+        with ArchiveWriter(io.BytesIO()) as writer:
+            writer.feed_many(msg_sids, msg_datas)
+
+    archive_path = os.path.join(tmp_dir, 'bench.parsley')
+    with ArchiveWriter(archive_path) as writer:
+        writer.feed_many(msg_sids, msg_datas)
+
+    def read_archive():
+        with ArchiveReader(archive_path) as reader:
+            return list(reader.iter_records())
+
+    def read_archive_columns():
+        with ArchiveReader(archive_path) as reader:
+            return [reader.read_chunk(chunk) for chunk in reader.chunks]
+
+    def feed_stream():
+        live_stream = LiveTelemetryStream()
+        return [live_stream.feed(stream[i:i + 4096]) for i in range(0, len(stream), 4096)]
+
+    n = len(frames)
+    return [
+        Benchmark('parse_to_object', lambda: [parse_to_object(msg_sid, msg_data) for msg_sid, msg_data in frames], n, fields),
+        Benchmark('parse_to_object(validate=False)', lambda: [parse_to_object(msg_sid, msg_data, False) for msg_sid, msg_data in frames], n, fields),
+        Benchmark('parse_to_object(lazy=True)', lambda: [parse_to_object(msg_sid, msg_data, lazy=True) for msg_sid, msg_data in frames], n, fields),
+        Benchmark('lazy, msg_type + first field', lambda: [read_one_field(parse_to_object(msg_sid, msg_data, lazy=True)) for msg_sid, msg_data in frames], n, fields),
+        Benchmark('parse_many', lambda: _ParsleyParseInternal.parse_many(msg_sids, msg_datas), n, fields),
+        Benchmark('encode_data', lambda: [encode_data(parsed_data) for parsed_data in parsed_datas], len(parsed_datas), encoded_fields),
+        Benchmark('encode_many', lambda: _ParsleyParseInternal.encode_many(parsed_datas), len(parsed_datas), encoded_fields),
+        Benchmark('format_line', lambda: [format_line(dump) for dump in dumps], len(dumps), fields),
+        Benchmark('json.dumps(model_dump)', dump_json, n, fields),
+        Benchmark('write_ndjson', lambda: ndjson.write_ndjson(results, io.StringIO()), n, fields),
+        Benchmark('read_ndjson', lambda: list(ndjson.read_ndjson(io.StringIO(ndjson_text))), n, fields),
+        Benchmark('read_ndjson(validate=False)', lambda: list(ndjson.read_ndjson(io.StringIO(ndjson_text), validate=False)), n, fields),
+        Benchmark('ArchiveWriter.feed_many', write_archive, n, fields),
+        Benchmark('ArchiveReader.iter_records', read_archive, n, fields),
+        Benchmark('ArchiveReader.read_chunk', read_archive_columns, n, fields),
+        Benchmark('BitString.pop', pop_fields, len(field_pops), sum(len(lengths) for _, lengths in field_pops)),
+        Benchmark('USBDebugParser.parse', lambda: [usb_parser.parse(line) for line in lines], n, fields),
+        Benchmark('USBDebugParser.parse_text', lambda: usb_parser.parse_text(text), n, fields),
+        Benchmark('LiveTelemetryParser.parse', lambda: [telemetry_parser.parse(frame) for frame in telemetry], n, fields),
+        Benchmark('LiveTelemetryStream.feed', feed_stream, n, fields),
+        Benchmark('LoggerParser.parse', lambda: [result for page_number, page in enumerate(pages) for result in logger_parser.parse(page, page_number)], n, fields),
+        Benchmark('LoggerParser.parse_many', lambda: logger_parser.parse_many(pages), n, fields),
+        Benchmark('BitstringParser.parse', lambda: [bitstring_parser.parse(BitString(data)) for data in bitstrings], n, fields),
+    ]
+
+def measure(benchmark: Benchmark, repeat: int) -> Result:
+    benchmark.run() # warm up plan and SID caches
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        benchmark.run()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    kept = benchmark.run()
+    blocks = sys.getallocatedblocks() - blocks
+    del kept
+
+    tracemalloc.start()
+    benchmark.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return Result(
+        frames_per_sec=benchmark.frames / best,
+        ns_per_field=best / max(benchmark.fields, 1) * 1e9,
+        blocks_per_frame=blocks / benchmark.frames,
+        peak_bytes_per_frame=peak / benchmark.frames,
+    )
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--frames-per-type', type=int, default=200, help='valid frames generated per message type')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark, the fastest is reported')
+    arg_parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    arg_parser.add_argument('--save', metavar='FILE', help='write the results as a JSON baseline')
+    arg_parser.add_argument('--compare', metavar='FILE', help='compare against a JSON baseline written by --save')
+    arg_parser.add_argument('--threshold', type=float, default=0.10, help='allowed frames/sec slowdown against the baseline (default 0.10)')
+    args = arg_parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        benchmarks = [benchmark for benchmark in make_benchmarks(args.frames_per_type, tmp_dir) if args.filter in benchmark.name]
+        print(f'{"benchmark":<34} {"frames/s":>11} {"ns/field":>9} {"blocks/frame":>13} {"peak B/frame":>13}' + ('  vs baseline' if baseline else ''))
+        results = {}
+        regressions = []
+        for benchmark in benchmarks:
+            result = results[benchmark.name] = measure(benchmark, args.repeat)
+            line = f'{benchmark.name:<34} {result.frames_per_sec:11.0f} {result.ns_per_field:9.0f} {result.blocks_per_frame:13.2f} {result.peak_bytes_per_frame:13.0f}'
+            if baseline and benchmark.name in baseline:
+                ratio = result.frames_per_sec / baseline[benchmark.name]['frames_per_sec']
+                line += f'  {ratio:5.2f}x'
+                if ratio < 1 - args.threshold:
+                    line += '  REGRESSION'
+                    regressions.append(benchmark.name)
+            print(line)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'frames_per_type': args.frames_per_type,
+                'results': {name: result._asdict() for name, result in results.items()},
+            }, file, indent=2)
+
+    if regressions:
+        print(f'{len(regressions)} benchmark(s) slower than the baseline: {", ".join(regressions)}')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+'''
+Deterministic synthetic CAN corpus for the benchmarks
+
+Every message type in MESSAGES gets frames with random field values, plus a share of frames
+that decode to ParsleyErrors (unknown msg_type, truncated payload, out of range enum value).
+The frames can also be rendered as USB-debug lines, live-telemetry frames or logger pages.
+'''
+import random
+import string
+from typing import Any
+
+from parsley.encode_plan import get_encode_plan
+from parsley.fields import ASCII, Bitfield, Enum, Numeric
+from parsley.message_definitions import CAN_MESSAGE, MESSAGES, MESSAGE_TYPE
+from parsley.parse_to_object import MSG_TYPE_MASK, MSG_TYPE_SHIFT, LiveTelemetryParser, LoggerParser
+import parsley.message_types as mt
+
+def random_value(field, rng: random.Random) -> Any:
+    if isinstance(field, Enum):
+        return rng.choice(list(field.get_keys()))
+    if type(field) is Numeric:
+        raw = rng.getrandbits(field.length)
+        if field.signed:
+            raw -= 1 << (field.length - 1)
+        return raw * field.scale
+    if type(field) is ASCII:
+        return ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(0, field.length // 8)))
+    if type(field) is Bitfield and field.map_name_offset is not None:
+        # only named bits, unnamed ones decode to UNKNOWN(...) which can't be encoded back
+        return field.decode_value(rng.getrandbits(field.length) & field.named_mask)
+    # Floating and custom Bitfield values are whatever decoding random bits gives
+    return field.decode(rng.getrandbits(field.length).to_bytes((field.length + 7) // 8, byteorder='big'))
+
+def random_parsed_data(msg_type: str, rng: random.Random) -> dict[str, Any]:
+    """ Flattened parsed data (as taken by encode_data()) with a random value for every field """
+    fields = CAN_MESSAGE.get_fields(msg_type)
+    parsed_data = {
+        'msg_prio': rng.choice(list(mt.msg_prio)),
+        'msg_type': msg_type,
+        'board_type_id': rng.choice(list(mt.board_type_id)),
+        'board_inst_id': rng.choice(list(mt.board_inst_id)),
+        'msg_metadata': random_value(fields[3], rng),
+    }
+    for field in fields[4:]:
+        parsed_data[field.name] = random_value(field, rng)
+    return parsed_data
+
+_UNDEFINED_MSG_TYPE = next(
+    value for value in range(MSG_TYPE_MASK, -1, -1)
+    if MESSAGE_TYPE.lookup(value) not in MESSAGES
+)
+
+def error_frame(rng: random.Random) -> tuple[int, bytes]:
+    kind = rng.randrange(3)
+    msg_type = rng.choice(list(MESSAGES))
+    msg_sid, msg_data = get_encode_plan(msg_type).encode(random_parsed_data(msg_type, rng))
+    if kind == 0: # msg_type without a definition
+        msg_sid = (msg_sid & ~(MSG_TYPE_MASK << MSG_TYPE_SHIFT)) | _UNDEFINED_MSG_TYPE << MSG_TYPE_SHIFT
+    elif kind == 1: # truncated payload
+        msg_data = msg_data[:len(msg_data) // 2]
+    else: # every payload bit set, which is out of range for most enums
+        msg_data = b'\xFF' * len(msg_data)
+    return msg_sid, msg_data
+
+def make_corpus(frames_per_type: int = 100, error_ratio: float = 0.05, seed: int = 0) -> tuple[list[dict[str, Any]], list[tuple[int, bytes]]]:
+    """
+    Returns (parsed_datas, frames): the parsed data of every valid frame, and the (msg_sid, msg_data)
+    of every frame including the error cases, shuffled so message types are interleaved.
+    """
+    rng = random.Random(seed)
+    parsed_datas = [random_parsed_data(msg_type, rng) for msg_type in MESSAGES for _ in range(frames_per_type)]
+    rng.shuffle(parsed_datas)
+    frames = [get_encode_plan(parsed_data['msg_type']).encode(parsed_data) for parsed_data in parsed_datas]
+    frames += [error_frame(rng) for _ in range(int(len(frames) * error_ratio))]
+    rng.shuffle(frames)
+    return parsed_datas, frames
+
+def usb_debug_lines(frames: list[tuple[int, bytes]]) -> list[str]:
+    """ frames as USB-debug lines, eg. '$1234:0A,FF' """
+    return [f'${msg_sid:X}:' + ','.join(f'{byte:02X}' for byte in msg_data) if msg_data else f'${msg_sid:X}' for msg_sid, msg_data in frames]
+
+def live_telemetry_frames(frames: list[tuple[int, bytes]]) -> list[bytes]:
+    return [LiveTelemetryParser.encode_frame(msg_sid, msg_data) for msg_sid, msg_data in frames]
+
+def logger_pages(frames: list[tuple[int, bytes]]) -> list[bytes]:
+    """ frames packed into consecutive 0xFF-padded logger pages starting at page 0, timestamped 1 ms apart """
+    return list(LoggerParser().pack_pages((msg_sid, msg_data, log_timestamp) for log_timestamp, (msg_sid, msg_data) in enumerate(frames)))
@@ -1,15 +1,21 @@
-from .bitstring import BitString
+from .bitstring import BitString, BitCursor
 from . import fields
 from . import message_definitions
 from . import message_types
-from .parsley_message import ParsleyObject, ParsleyError
+from .parsley_message import ParsleyObject, ParsleyError, ParsleyRecord, LazyParsleyObject, ParseResult
 from .parse_to_object import (
     ParsleyParser,
     USBDebugParser,
     LiveTelemetryParser,
+    LiveTelemetryStream,
     LoggerParser,
     BitstringParser,
+    ResultCache,
 )
+from .profiling import Profiler
+from .ndjson import NDJSONWriter, write_ndjson, read_ndjson
+from .archive import ArchiveWriter, ArchiveReader, write_archive
+from .columnar import ColumnarDecoder, ColumnBatch, CodeColumn
 from .parsley import (
     parse_fields, 
     parse, 
@@ -24,16 +30,32 @@ from .parsley import (
 
 __all__ = [
     "BitString",
+    "BitCursor",
     "fields",
     "message_definitions",
     "message_types",
     "ParsleyObject",
     "ParsleyError",
+    "ParsleyRecord",
+    "LazyParsleyObject",
+    "ParseResult",
     "ParsleyParser",
     "USBDebugParser",
     "LiveTelemetryParser",
+    "LiveTelemetryStream",
     "LoggerParser",
     "BitstringParser",
+    "ResultCache",
+    "Profiler",
+    "NDJSONWriter",
+    "write_ndjson",
+    "read_ndjson",
+    "ArchiveWriter",
+    "ArchiveReader",
+    "write_archive",
+    "ColumnarDecoder",
+    "ColumnBatch",
+    "CodeColumn",
     "parse_fields",
     "parse",
     "parse_bitstring",
@@ -0,0 +1,71 @@
+'''
+asyncio adapters that decode frames straight from an asyncio.StreamReader
+
+Each adapter is an async generator that only reads from its reader when the consumer asks for
+the next frame, so a slow consumer leaves data in the reader and its transport pauses reading,
+and several sources can be ingested by one event loop without threads.
+'''
+import asyncio
+from typing import AsyncIterator
+from parsley.parse_to_object import USBDebugParser, LiveTelemetryStream
+from parsley.parsley_message import ParseResult
+
+async def iter_usb_debug(reader: asyncio.StreamReader, parser: USBDebugParser | None = None,
+                         skip_malformed: bool = False) -> AsyncIterator[ParseResult]:
+    """
+    Yields the result of every `$SID:AA,BB,...` line read from reader until EOF.
+
+    Blank lines are ignored. Other lines USBDebugParser can't read (eg. board log output
+    sharing the serial port), including lines longer than the reader's limit, raise ValueError,
+    or are dropped if skip_malformed is set.
+    """
+    parser = parser or USBDebugParser()
+    while True:
+        try:
+            line = await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as error: # last line without a newline
+            line = error.partial
+        except asyncio.LimitOverrunError as error:
+            if not skip_malformed:
+                raise ValueError(str(error)) from error
+            await _skip_line(reader)
+            continue
+        if not line:
+            return
+        text = line.decode('ascii', errors='replace').strip(' \0\r\n')
+        if not text:
+            continue
+        try:
+            result = parser.parse(text)
+        except ValueError:
+            if skip_malformed:
+                continue
+            raise
+        yield result
+
+async def _skip_line(reader: asyncio.StreamReader):
+    """ Drops everything up to and including the next newline, however long the line is """
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.IncompleteReadError:
+            return
+        except asyncio.LimitOverrunError as error:
+            # consumed bytes hold no newline, so they can be dropped without losing the next line
+            await reader.readexactly(error.consumed)
+
+async def iter_live_telemetry(reader: asyncio.StreamReader, stream: LiveTelemetryStream | None = None,
+                              chunk_size: int = 4096) -> AsyncIterator[ParseResult]:
+    """
+    Yields every live-telemetry frame found in the bytes read from reader until EOF.
+    Framing, resyncing and CRC checks are done by stream (a new LiveTelemetryStream by default),
+    whose counters can be inspected while iterating.
+    """
+    stream = stream or LiveTelemetryStream()
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            return
+        for result in stream.feed(chunk):
+            yield result
@@ -0,0 +1,381 @@
+'''
+Indexed binary archive of decoded frames
+
+Decoding a raw dump once and writing it to an archive means a flight can be reopened without
+decoding it again. An archive holds decoded frames in column chunks, one per run of up to
+chunk_rows frames of the same (msg_type, board_type_id, board_inst_id), laid out as:
+
+    header   MAGIC, format version, SHA-256 of the message definitions the frames were decoded with
+    chunks   column data; each column is contiguous, so one can be read without touching the others
+    footer   JSON index of every chunk: key, frame count, time range and column byte offsets
+    trailer  footer offset and length, MAGIC
+
+Chunk layouts are the ColumnBatch layouts (see columnar.py) derived from message_definitions.MESSAGES,
+minus the board columns, which are constant per chunk and kept in the index:
+- array columns are stored as little-endian machine values
+- CodeColumns as their 'I' code array; the labels past the ones the layout seeds them with (eg.
+  an Enum's keys) go in the index
+- list columns (eg. ASCII fields) as a JSON array
+Chunks of frames read from a logger dump also hold log_timestamp and monotonic_time columns.
+
+ArchiveWriter appends chunks as they fill up, so memory use is bounded by chunk_rows per chunk key.
+ArchiveReader maps the file and only reads the chunks and columns that are asked for.
+ParsleyErrors aren't archived, only counted.
+'''
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import IO, Any, Hashable, Iterable, Iterator, Mapping, NamedTuple, Sequence
+
+from parsley.columnar import HEADER_COLUMNS, CodeColumn, Column, ColumnBatch
+from parsley.fields import Field
+from parsley.message_definitions import MESSAGES
+from parsley.parse_to_object import _ParsleyParseInternal
+from parsley.parsley_message import LazyParsleyObject, ParseResult, ParsleyError, ParsleyObject, ParsleyRecord
+
+MAGIC = b'PRSLYARC'
+VERSION = 1
+HEADER = struct.Struct('<8sH32s')
+TRAILER = struct.Struct('<QQ8s')
+
+BOARD_COLUMNS = ('board_type_id', 'board_inst_id')
+LOG_COLUMNS = ('log_timestamp', 'monotonic_time')
+
+# derived lookup tables and memos, which don't change what a field decodes to
+_DERIVED_ATTRIBUTES = {'map_val_key', 'value_table', 'named_mask'}
+
+def _describe(field: Field) -> dict[str, Any]:
+    description = {'type': type(field).__name__}
+    for name, value in vars(field).items():
+        if not name.startswith('_') and name not in _DERIVED_ATTRIBUTES:
+            description[name] = value
+    return description
+
+def _json_default(value: Any) -> Any:
+    return _describe(value) if isinstance(value, Field) else repr(value)
+
+def definitions_hash(messages: Mapping[str, Sequence[Field]] = MESSAGES) -> bytes:
+    """ SHA-256 of every message definition: each field's type, name, length and decoding parameters """
+    definitions = {msg_type: [_describe(field) for field in fields] for msg_type, fields in messages.items()}
+    text = json.dumps(definitions, sort_keys=True, default=_json_default)
+    return hashlib.sha256(text.encode()).digest()
+
+# labels each CodeColumn of a layout starts with, by (msg_type, column name)
+_SEED_LABELS: dict[tuple[str, str], list[Hashable]] = {}
+
+def _seed_labels(msg_type: str, name: str) -> list[Hashable]:
+    labels = _SEED_LABELS.get((msg_type, name))
+    if labels is None:
+        for column_name, column in ColumnBatch(msg_type).columns.items():
+            if isinstance(column, CodeColumn):
+                _SEED_LABELS[(msg_type, column_name)] = column.labels
+        labels = _SEED_LABELS[(msg_type, name)]
+    return labels
+
+class ColumnInfo(NamedTuple):
+    kind: str # an array typecode, 'codes' for CodeColumns or 'json' for lists
+    offset: int # from the start of the file
+    length: int
+    labels: list[Hashable] | None = None # CodeColumn labels past the seed ones
+
+class ChunkInfo(NamedTuple):
+    """
+    Index entry of a chunk. start and end are the chunk's time range: monotonic_time for frames
+    read from a logger dump, otherwise the payload's time field (None if the msg_type has none).
+    """
+    msg_type: str
+    board_type_id: str
+    board_inst_id: str
+    count: int # pyright: ignore[reportIncompatibleMethodOverride] - shadows tuple.count, but archive footers are keyed by it
+    start: float | None
+    end: float | None
+    offset: int
+    length: int
+    columns: dict[str, ColumnInfo]
+
+def _to_little_endian(column: 'array[Any]') -> 'array[Any]':
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+class _PendingChunk:
+    """ Rows of one chunk key not written yet """
+    def __init__(self, msg_type: str, logged: bool):
+        self.batch = ColumnBatch(msg_type)
+        self.logged = logged
+        self.log_timestamps = array('q')
+        self.monotonic_times = array('d')
+
+class ArchiveWriter:
+    """
+    Streams frames into an archive at target, a path or a binary file object positioned at its start.
+    Accepts parse results through write() or raw frames through feed(). Use as a context manager,
+    or call close() to write the remaining chunks and the index.
+    """
+    def __init__(self, target: str | os.PathLike[str] | IO[bytes], chunk_rows: int = 4096):
+        if chunk_rows < 1:
+            raise ValueError(f'chunk_rows must be positive, got {chunk_rows}')
+        if isinstance(target, (str, os.PathLike)):
+            self.file: IO[bytes] = open(target, 'wb')
+            self._owns_file = True
+        else:
+            self.file = target
+            self._owns_file = False
+        self.chunk_rows = chunk_rows
+        self.chunks: list[ChunkInfo] = []
+        self.errors = 0 # ParsleyErrors skipped
+        self.closed = False
+        self._pending: dict[tuple[str, str, str], _PendingChunk] = {}
+        self._offset = 0
+        self._write(HEADER.pack(MAGIC, VERSION, definitions_hash()))
+
+    def _write(self, data: bytes):
+        self.file.write(data)
+        self._offset += len(data)
+
+    def write(self, result: ParseResult):
+        if isinstance(result, ParsleyError):
+            self.errors += 1
+            return
+        if not isinstance(result, (ParsleyObject, ParsleyRecord, LazyParsleyObject)):
+            raise ValueError(f'Cannot archive a {type(result).__name__}')
+        self._append(result.msg_prio, result.msg_type, result.board_type_id, result.board_inst_id, result.msg_metadata, result.data,
+                     result.log_timestamp, result.monotonic_time)
+
+    def write_many(self, results: Iterable[ParseResult]):
+        for result in results:
+            self.write(result)
+
+    def feed(self, msg_sid: bytes | int, msg_data: bytes | list[int]):
+        """ Decodes and archives one raw frame """
+        self.write(_ParsleyParseInternal.decode_frame(msg_sid, msg_data))
+
+    def feed_many(self, msg_sids: Sequence[bytes | int], msg_datas: Sequence[bytes | list[int]]):
+        if len(msg_sids) != len(msg_datas):
+            raise ValueError(f'Got {len(msg_sids)} SIDs but {len(msg_datas)} payloads')
+        for plan, indices in _ParsleyParseInternal.group_by_msg_type(msg_sids):
+            for index in indices:
+                self.write(_ParsleyParseInternal.decode_frame(msg_sids[index], msg_datas[index], plan))
+
+    def _append(self, msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, data, log_timestamp, monotonic_time):
+        if self.closed:
+            raise ValueError('Cannot write to a closed archive')
+        key = (msg_type, board_type_id, board_inst_id)
+        logged = log_timestamp is not None
+        chunk = self._pending.get(key)
+        if chunk is not None and chunk.logged != logged:
+            # a chunk either has log columns for every row or for none
+            self._flush(key, chunk)
+            chunk = None
+        if chunk is None:
+            chunk = self._pending[key] = _PendingChunk(msg_type, logged)
+
+        chunk.batch.append(msg_prio, board_type_id, board_inst_id, msg_metadata, data)
+        if logged:
+            chunk.log_timestamps.append(log_timestamp)
+            chunk.monotonic_times.append(monotonic_time)
+        if len(chunk.batch) >= self.chunk_rows:
+            self._flush(key, chunk)
+
+    def _flush(self, key: tuple[str, str, str], chunk: _PendingChunk):
+        del self._pending[key]
+        columns: dict[str, Column] = {name: column for name, column in chunk.batch.columns.items() if name not in BOARD_COLUMNS}
+        if chunk.logged:
+            columns['log_timestamp'] = chunk.log_timestamps
+            columns['monotonic_time'] = chunk.monotonic_times
+
+        offset = self._offset
+        parts = []
+        infos = {}
+        for name, column in columns.items():
+            labels = None
+            if isinstance(column, CodeColumn):
+                kind, data = 'codes', _to_little_endian(column.codes).tobytes()
+                labels = column.labels[len(_seed_labels(chunk.batch.msg_type, name)):]
+            elif isinstance(column, array):
+                kind, data = column.typecode, _to_little_endian(column).tobytes()
+            else:
+                kind, data = 'json', json.dumps(column).encode()
+            infos[name] = ColumnInfo(kind, offset, len(data), labels)
+            offset += len(data)
+            parts.append(data)
+
+        if chunk.logged:
+            times = chunk.monotonic_times
+        else:
+            times = chunk.batch.column_values('time') if 'time' in columns else None
+        start, end = (min(times), max(times)) if times else (None, None)
+        self.chunks.append(ChunkInfo(*key, len(chunk.batch), start, end, self._offset, offset - self._offset, infos))
+        self._write(b''.join(parts))
+
+    def close(self):
+        """ Writes the pending chunks and the index; closes the file if the writer opened it """
+        if self.closed:
+            return
+        for key, chunk in list(self._pending.items()):
+            self._flush(key, chunk)
+        footer = json.dumps({
+            'definitions_hash': definitions_hash().hex(),
+            'errors': self.errors,
+            'chunks': [chunk._asdict() for chunk in self.chunks],
+        }).encode()
+        footer_offset = self._offset
+        self._write(footer)
+        self._write(TRAILER.pack(footer_offset, len(footer), MAGIC))
+        self.closed = True
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_archive(results: Iterable[ParseResult], target: str | os.PathLike[str] | IO[bytes],
+                  chunk_rows: int = 4096) -> list[ChunkInfo]:
+    """ Archives results to target and returns the index of the chunks written """
+    with ArchiveWriter(target, chunk_rows) as writer:
+        writer.write_many(results)
+    return writer.chunks
+
+class ArchiveReader:
+    """
+    Random access to an archive through a read-only memory map.
+
+    Raises ValueError if the file isn't an archive, or if it was written with different message
+    definitions than the ones in use (pass check_definitions=False to read it anyway, at the risk
+    of the chunk layouts no longer matching).
+    """
+    def __init__(self, path: str | os.PathLike[str], check_definitions: bool = True):
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER.size + TRAILER.size:
+                raise ValueError(f'{os.fspath(path)} is too short to be a parsley archive')
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, digest = HEADER.unpack_from(self._map, 0)
+            footer_offset, footer_length, end_magic = TRAILER.unpack_from(self._map, size - TRAILER.size)
+            if magic != MAGIC or end_magic != MAGIC:
+                raise ValueError(f'{os.fspath(path)} is not a parsley archive (or was not closed)')
+            if version != VERSION:
+                raise ValueError(f'Unsupported archive version {version}, expected {VERSION}')
+            if check_definitions and digest != definitions_hash():
+                raise ValueError(f'{os.fspath(path)} was written with different message definitions')
+            footer = json.loads(self._map[footer_offset:footer_offset + footer_length])
+        except Exception:
+            self._map.close()
+            raise
+
+        self.definitions_hash: bytes = digest
+        self.errors: int = footer['errors']
+        self.chunks: list[ChunkInfo] = [
+            ChunkInfo(**chunk)._replace(columns={name: ColumnInfo(*column) for name, column in chunk['columns'].items()})
+            for chunk in footer['chunks']
+        ]
+
+    def __len__(self) -> int:
+        """ Number of archived frames """
+        return sum(chunk.count for chunk in self.chunks)
+
+    def find(self, msg_type: str | None = None, board_type_id: str | None = None, board_inst_id: str | None = None,
+             start: float | None = None, end: float | None = None) -> list[ChunkInfo]:
+        """
+        Returns the index entries of the chunks matching every given key, whose time range overlaps
+        [start, end]. Chunks without a time range only match when no range is given.
+        """
+        found = []
+        for chunk in self.chunks:
+            if msg_type is not None and chunk.msg_type != msg_type: continue
+            if board_type_id is not None and chunk.board_type_id != board_type_id: continue
+            if board_inst_id is not None and chunk.board_inst_id != board_inst_id: continue
+            if start is not None or end is not None:
+                if chunk.start is None or chunk.end is None: continue
+                if start is not None and chunk.end < start: continue
+                if end is not None and chunk.start > end: continue
+            found.append(chunk)
+        return found
+
+    def read_column(self, chunk: ChunkInfo, name: str) -> Column:
+        """ Reads one column of a chunk without touching the others """
+        info = chunk.columns[name]
+        if info.kind == 'json':
+            return json.loads(self._map[info.offset:info.offset + info.length])
+        if info.kind == 'codes':
+            column = CodeColumn([*_seed_labels(chunk.msg_type, name), *(info.labels or ())])
+            column.codes = self._read_array(info, 'I')
+            return column
+        return self._read_array(info, info.kind)
+
+    def _read_array(self, info: ColumnInfo, typecode: str) -> 'array[Any]':
+        column = array(typecode, self._map[info.offset:info.offset + info.length])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        return column
+
+    def read_chunk(self, chunk: ChunkInfo) -> ColumnBatch:
+        """ Reads a chunk into a ColumnBatch, with its board columns filled back in """
+        columns = {}
+        for name in HEADER_COLUMNS:
+            if name in BOARD_COLUMNS:
+                columns[name] = self._board_column(chunk, name)
+            else:
+                columns[name] = self.read_column(chunk, name)
+        for name in chunk.columns:
+            if name not in columns and name not in LOG_COLUMNS:
+                columns[name] = self.read_column(chunk, name)
+        return ColumnBatch.from_columns(chunk.msg_type, columns)
+
+    @staticmethod
+    def _board_column(chunk: ChunkInfo, name: str) -> CodeColumn:
+        column = CodeColumn(_seed_labels(chunk.msg_type, name))
+        value = getattr(chunk, name)
+        if value in column.labels:
+            code = column.labels.index(value)
+        else:
+            code = len(column.labels)
+            column.labels.append(value)
+        column.codes = array('I', [code]) * chunk.count
+        return column
+
+    def iter_records(self, msg_type: str | None = None, board_type_id: str | None = None, board_inst_id: str | None = None,
+                     start: float | None = None, end: float | None = None, validate: bool = False) -> Iterator[ParsleyRecord | ParsleyObject[Any]]:
+        """
+        Yields the archived frames of the chunks find() returns, chunk by chunk, as ParsleyRecords
+        (or ParsleyObjects with validate=True). With a time range, frames outside of it are skipped.
+        """
+        for chunk in self.find(msg_type, board_type_id, board_inst_id, start, end):
+            batch = self.read_chunk(chunk)
+            values = [batch.column_values(name) for name in batch.columns]
+            payload_names = list(batch.columns)[len(HEADER_COLUMNS):]
+            if 'log_timestamp' in chunk.columns:
+                log_timestamps = self._read_array(chunk.columns['log_timestamp'], 'q')
+                times = monotonic_times = self._read_array(chunk.columns['monotonic_time'], 'd')
+            else:
+                log_timestamps = monotonic_times = [None] * chunk.count
+                # find() only returns chunks without a time column when no time range is given
+                times = batch.column_values('time') if 'time' in batch.columns else []
+
+            for index, (msg_prio, board_type_id_, board_inst_id_, msg_metadata, *payload) in enumerate(zip(*values)):
+                if start is not None and times[index] < start: continue
+                if end is not None and times[index] > end: continue
+                record = ParsleyRecord(msg_prio, chunk.msg_type, board_type_id_, board_inst_id_, msg_metadata, dict(zip(payload_names, payload)),
+                                       log_timestamps[index], monotonic_times[index])
+                yield record.to_object() if validate else record
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,3 +1,5 @@
+from typing import Any
+
 class BitString:
     """
     Stores the message data bits that we have yet to parse and lets us read arbitrary-length
@@ -47,3 +49,57 @@ class BitString:
         value = int.from_bytes(value, byteorder='big')
         self.data = (value << self.length) | self.data # prepend value to the front of data
         self.length += field_length
+
+class BitCursor:
+    """
+    Read-only alternative to BitString that reads arbitrary-length bits from a bytes-like buffer by
+    offset. The buffer is wrapped in a memoryview and never copied or mutated, so each read only
+    touches the bytes that hold the field instead of shifting and masking the whole message.
+
+    pop() and length behave like BitString's, so a BitCursor can be passed anywhere a BitString
+    is only read from (eg. parse_fields).
+    """
+    def __init__(self, data: 'bytes | bytearray | memoryview[Any] | list[int]' = b'', data_bit_length: int = 0):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data) # eg. a list of ints
+        self.view = memoryview(data).cast('B')
+        buffer_bits = len(self.view) * 8
+        data_bit_length = data_bit_length or buffer_bits
+        if data_bit_length > buffer_bits:
+            # like BitString, treat the missing most significant bits as zeros
+            self.view = memoryview(bytes((data_bit_length - buffer_bits + 7) // 8) + bytes(self.view))
+            buffer_bits = len(self.view) * 8
+        # like BitString, data is LSB-aligned so only the last data_bit_length bits are read
+        self.offset = buffer_bits - data_bit_length # position of the next bit to pop
+        self.end = buffer_bits
+
+    @property
+    def length(self) -> int:
+        """ Number of bits left to pop """
+        return self.end - self.offset
+
+    def read(self, bit_offset: int, field_length: int) -> int:
+        """
+        Returns the field_length bits starting bit_offset bits into the buffer as an int,
+        without moving the cursor.
+        """
+        if bit_offset < 0 or field_length < 0 or bit_offset + field_length > self.end:
+            raise IndexError
+        if field_length == 0:
+            return 0
+        stop = bit_offset + field_length
+        value = int.from_bytes(self.view[bit_offset // 8:(stop + 7) // 8], byteorder='big')
+        return (value >> (-stop % 8)) & ((1 << field_length) - 1)
+
+    def pop(self, field_length: int, variable_length: bool = False) -> bytes:
+        """
+        Returns the next field_length bits as an LSB-aligned bytes object, exactly like BitString.pop().
+        """
+        if self.length < field_length:
+            if not variable_length:
+                raise IndexError
+            else:
+                field_length = self.length
+        res = self.read(self.offset, field_length)
+        self.offset += field_length
+        return res.to_bytes((field_length + 7) // 8, byteorder='big')
@@ -0,0 +1,256 @@
+'''
+Columnar (struct-of-arrays) decoding of CAN messages
+
+Instead of one ParsleyObject per frame, frames are decoded into one ColumnBatch per msg_type
+whose columns are laid out from that msg_type's definition in message_definitions.MESSAGES:
+- Numeric and Floating fields become array.array columns (floats if the field is scaled)
+- Enum, Bitfield and other named fields become CodeColumns: an integer code array plus a
+  lookup table of the distinct values, shared by every row of the column
+- ASCII (and any other field) values are kept in plain lists
+Batches of frames read from a logger dump end with log_timestamp and monotonic_time columns.
+
+array.array supports the buffer protocol, so columns can be wrapped by NumPy without copying.
+'''
+from array import array
+from typing import Any, Hashable, Iterable, Iterator, Sequence, TypeAlias
+from parsley.fields import Field, Numeric, Floating, Enum, Switch, Bitfield
+from parsley.message_definitions import CAN_MESSAGE
+from parsley.parse_to_object import _ParsleyParseInternal, LoggerParser
+from parsley.parsley_message import ParsleyError, ParsleyRecord
+
+# the four SID fields every ColumnBatch starts with, named as in ParsleyObject
+HEADER_COLUMNS = ('msg_prio', 'board_type_id', 'board_inst_id', 'msg_metadata')
+# the columns logged batches end with
+LOG_COLUMNS = ('log_timestamp', 'monotonic_time')
+
+class CodeColumn:
+    """
+    Dictionary-encoded column: row i holds labels[codes[i]].
+
+    Columns for Enum fields are seeded with the Enum's keys in definition order, so the code
+    of each known key is the same in every batch. Values outside the seed (eg. hexified
+    unknown ids, or Bitfield combinations) are appended to labels as they first appear.
+    """
+    def __init__(self, labels: Iterable[Hashable] = ()):
+        self.labels: list[Hashable] = list(labels)
+        self.codes = array('I')
+        # label -> code, built on the first append so read-only columns don't pay for it
+        self._index: dict[Hashable, int] | None = None
+
+    def append(self, value: Hashable):
+        self.codes.append(self._code(value))
+
+    def extend(self, other: 'CodeColumn | Iterable[Hashable]'):
+        """ Appends all of other's rows, translating a CodeColumn's codes into this column's labels """
+        if not isinstance(other, CodeColumn):
+            self.codes.extend(self._code(label) for label in other)
+            return
+        codes = [self._code(label) for label in other.labels]
+        self.codes.extend(codes[code] for code in other.codes)
+
+    def _code(self, label: Hashable) -> int:
+        index = self._index
+        if index is None:
+            index = self._index = {label: code for code, label in enumerate(self.labels)}
+        code = index.get(label)
+        if code is None:
+            code = index[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Hashable:
+        return self.labels[self.codes[index]]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        labels = self.labels
+        return (labels[code] for code in self.codes)
+
+    def to_list(self) -> list[Hashable]:
+        labels = self.labels
+        return [labels[code] for code in self.codes]
+
+Column: TypeAlias = 'array[Any] | list[Any] | CodeColumn'
+
+# column names of each msg_type's layout
+_LAYOUTS: dict[str, list[str]] = {}
+
+def make_column(field: Field) -> Column:
+    """ Returns an empty column suited to the values field.decode() produces """
+    if type(field) is Numeric:
+        if not (type(field.scale) is int and field.scale == 1):
+            return array('d')
+        if field.length < 64 or (field.signed and field.length == 64):
+            return array('q')
+        return []
+    if type(field) is Floating:
+        return array('d')
+    if isinstance(field, Enum):
+        return CodeColumn(field.get_keys())
+    if isinstance(field, Bitfield):
+        return CodeColumn([field.default])
+    return []
+
+class ColumnBatch:
+    """
+    All successfully decoded frames of one msg_type, stored column by column.
+    Only flat message definitions are supported, since nested Switch fields have no fixed layout.
+
+    A logged batch (for frames read from a logger dump) also has log_timestamp and monotonic_time
+    columns after the payload ones, and takes both values in append().
+    """
+    def __init__(self, msg_type: str, logged: bool = False):
+        fields = CAN_MESSAGE.get_fields(msg_type)
+        if any(isinstance(field, Switch) for field in fields):
+            raise ValueError(f'Message type "{msg_type}" has nested fields and no columnar layout')
+
+        self.msg_type = msg_type
+        self.logged = logged
+        self.columns: dict[str, Column] = {
+            name: make_column(field) for name, field in zip(HEADER_COLUMNS, fields[:4])
+        }
+        for field in fields[4:]:
+            self.columns[field.name] = make_column(field)
+        if logged:
+            self.columns['log_timestamp'] = array('q')
+            self.columns['monotonic_time'] = array('d')
+        self._length = 0
+        self._bind_appends()
+
+    @classmethod
+    def from_columns(cls, msg_type: str, columns: dict[str, Column]) -> 'ColumnBatch':
+        """
+        Wraps already filled columns, which must follow msg_type's layout (optionally followed by
+        the log columns) and all have the same length
+        """
+        layout = _LAYOUTS.get(msg_type)
+        if layout is None:
+            layout = _LAYOUTS[msg_type] = list(cls(msg_type).columns)
+        names = list(columns)
+        logged = names[len(layout):] == list(LOG_COLUMNS)
+        if names != (layout + list(LOG_COLUMNS) if logged else layout):
+            raise ValueError(f'Columns {names} do not match the "{msg_type}" layout {layout}')
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError(f'Columns of a "{msg_type}" batch have different lengths')
+
+        batch = cls.__new__(cls)
+        batch.msg_type = msg_type
+        batch.logged = logged
+        batch.columns = dict(columns)
+        batch._length = lengths.pop()
+        batch._bind_appends()
+        return batch
+
+    def _bind_appends(self):
+        payload = list(self.columns.items())[len(HEADER_COLUMNS):len(self.columns) - len(LOG_COLUMNS) * self.logged]
+        self._payload_appends = [(name, column.append) for name, column in payload]
+
+    def __getstate__(self):
+        # bound methods don't need to be pickled, they're rebuilt from the columns
+        state = self.__dict__.copy()
+        del state['_payload_appends']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind_appends()
+
+    def append(self, msg_prio: str, board_type_id: str, board_inst_id: str, msg_metadata: int | str, data: dict[str, Any],
+               log_timestamp: int | None = None, monotonic_time: float | None = None):
+        if (log_timestamp is not None) != self.logged:
+            raise ValueError(f'Frames {"without" if self.logged else "with"} log timestamps cannot be added to this "{self.msg_type}" batch')
+        columns = self.columns
+        columns['msg_prio'].append(msg_prio)
+        columns['board_type_id'].append(board_type_id)
+        columns['board_inst_id'].append(board_inst_id)
+        columns['msg_metadata'].append(msg_metadata)
+        for name, append in self._payload_appends:
+            append(data[name])
+        if self.logged:
+            columns['log_timestamp'].append(log_timestamp)
+            columns['monotonic_time'].append(monotonic_time)
+        self._length += 1
+
+    def extend(self, other: 'ColumnBatch'):
+        """ Appends all of other's rows, which must be of the same msg_type and equally logged """
+        if other.msg_type != self.msg_type:
+            raise ValueError(f'Cannot extend a "{self.msg_type}" batch with a "{other.msg_type}" batch')
+        if other.logged != self.logged:
+            raise ValueError(f'Cannot extend a "{self.msg_type}" batch with one {"without" if self.logged else "with"} log columns')
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+        self._length += other._length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def iter_parsed_data(self) -> Iterator[dict[str, Any]]:
+        """
+        Yields each row as a flattened parsed_data dict, as taken by encode_data() and the wire-format
+        encoders (which take log_timestamp from the rows of logged batches)
+        """
+        names = list(self.columns)
+        columns = [self.column_values(name) for name in names]
+        msg_type = self.msg_type
+        for row in zip(*columns):
+            parsed_data = dict(zip(names, row))
+            parsed_data['msg_type'] = msg_type
+            yield parsed_data
+
+    def column_values(self, name: str) -> list[Any]:
+        """ Returns column name as a list of decoded values, expanding CodeColumns to their labels """
+        column = self.columns[name]
+        if isinstance(column, CodeColumn):
+            return column.to_list()
+        return list(column)
+
+class ColumnarDecoder:
+    """
+    Accumulates frames into per-msg_type ColumnBatches. Frames that would parse to a ParsleyError
+    are kept in `errors` instead.
+
+    Frames read from a logger dump can be fed with their record timestamps, which fill the
+    log_timestamp and monotonic_time columns (and error fields) like LoggerParser does. A decoder
+    takes either timestamped or untimestamped frames of a msg_type, not both.
+    """
+    def __init__(self):
+        self.batches: dict[str, ColumnBatch] = {}
+        self.errors: list[ParsleyError] = []
+        self._logger = LoggerParser(validate=False)
+
+    def feed(self, msg_sid: bytes | int, msg_data: bytes | list[int], log_timestamp: int | None = None):
+        self._add(_ParsleyParseInternal.decode_frame(msg_sid, msg_data), log_timestamp)
+
+    def feed_many(self, msg_sids: Sequence[bytes | int], msg_datas: Sequence[bytes | list[int]], log_timestamps: Sequence[int] | None = None):
+        if len(msg_sids) != len(msg_datas):
+            raise ValueError(f'Got {len(msg_sids)} SIDs but {len(msg_datas)} payloads')
+        if log_timestamps is not None and len(log_timestamps) != len(msg_sids):
+            raise ValueError(f'Got {len(msg_sids)} SIDs but {len(log_timestamps)} log timestamps')
+        for plan, indices in _ParsleyParseInternal.group_by_msg_type(msg_sids):
+            for index in indices:
+                decoded = _ParsleyParseInternal.decode_frame(msg_sids[index], msg_datas[index], plan)
+                self._add(decoded, None if log_timestamps is None else log_timestamps[index])
+
+    def merge(self, other: 'ColumnarDecoder'):
+        """ Appends everything other has accumulated, as if its frames had been fed to this decoder """
+        for msg_type, batch in other.batches.items():
+            if msg_type in self.batches:
+                self.batches[msg_type].extend(batch)
+            else:
+                self.batches[msg_type] = batch
+        self.errors.extend(other.errors)
+
+    def _add(self, decoded: ParsleyRecord | ParsleyError, log_timestamp: int | None = None):
+        if log_timestamp is not None:
+            decoded = self._logger.add_log_timestamp(decoded, log_timestamp)
+        if isinstance(decoded, ParsleyError):
+            self.errors.append(decoded)
+            return
+        msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, data, log_timestamp, monotonic_time = decoded
+        batch = self.batches.get(msg_type)
+        if batch is None:
+            batch = self.batches[msg_type] = ColumnBatch(msg_type, logged=log_timestamp is not None)
+        batch.append(msg_prio, board_type_id, board_inst_id, msg_metadata, data, log_timestamp, monotonic_time)
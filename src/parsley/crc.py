@@ -0,0 +1,25 @@
+'''
+Table-driven CRC8 for live-telemetry frames
+
+Same CRC as the crc8 package's crc8 hash (polynomial 0x07, initial value 0x00, no reflection,
+no final xor), without building a hasher object and a digest per frame.
+'''
+POLYNOMIAL = 0x07
+
+def _make_table() -> list[int]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ POLYNOMIAL) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+CRC8_TABLE = _make_table()
+
+def crc8(data: bytes | bytearray | memoryview, crc: int = 0) -> int:
+    """ Returns the CRC8 of data, continuing from crc (eg. the CRC of the bytes before it) """
+    table = CRC8_TABLE
+    for byte in data:
+        crc = table[crc ^ byte]
+    return crc
@@ -0,0 +1,179 @@
+'''
+Precompiled per-msg_type decode plans for CAN message payloads
+'''
+from typing import Any, Callable, Iterator, Mapping
+import struct
+from parsley.fields import Field, Numeric, Floating, Enum, Switch, Bitfield
+from parsley.message_definitions import CAN_MESSAGE
+
+Converter = Callable[[int], Any]
+
+def _compile_numeric(field: Numeric) -> Converter:
+    scale = field.scale
+    n_bytes = (field.length + 7) // 8
+    if field.endian == 'little':
+        signed = field.signed
+        return lambda raw: int.from_bytes(raw.to_bytes(n_bytes, byteorder='big'), byteorder='little', signed=signed) * scale
+
+    # int.from_bytes() only sees a sign bit when the field fills its last byte,
+    # so non-byte-aligned signed fields decode exactly like unsigned ones
+    if field.signed and field.length == n_bytes * 8:
+        sign_bit = 1 << (field.length - 1)
+        wrap = 1 << field.length
+        return lambda raw: (raw - wrap if raw & sign_bit else raw) * scale
+    if type(scale) is int and scale == 1:
+        return lambda raw: raw
+    return lambda raw: raw * scale
+
+def _compile_floating(field: Floating) -> Converter:
+    unpack = struct.Struct('>f' if field.endian == 'big' else '<f').unpack
+    return lambda raw: unpack(raw.to_bytes(4, byteorder='big'))[0]
+
+def _compile_enum(field: Enum) -> Converter:
+    table = field.value_table
+    lookup = field.lookup if table is None else table.__getitem__ # raw is masked to the field, so always in the table
+    name = field.name
+    def convert(raw: int) -> str:
+        key = lookup(raw)
+        if key is None:
+            raise ValueError(f'Value "{raw}" not found in map "{name}"')
+        return key
+    return convert
+
+def _compile_bitfield(field: Bitfield) -> Converter:
+    return field.decode_value
+
+def _can_fail(field: Field) -> bool:
+    # numbers and bitfields decode any raw value, everything else (eg. unmapped enum values) may raise
+    return type(field) not in (Numeric, Floating, Bitfield)
+
+def _compile_field(field: Field) -> Converter:
+    # exact type checks: subclasses may override decode() and must go through it
+    if type(field) is Numeric:
+        return _compile_numeric(field)
+    if type(field) is Floating:
+        return _compile_floating(field)
+    if type(field) is Enum:
+        return _compile_enum(field)
+    if type(field) is Bitfield:
+        return _compile_bitfield(field)
+
+    # anything else (ASCII, custom fields) decodes from the same bytes BitString.pop() would give it
+    n_bytes = (field.length + 7) // 8
+    decode = field.decode
+    return lambda raw: decode(raw.to_bytes(n_bytes, byteorder='big'))
+
+class DecodePlan:
+    """
+    A flat list of (name, shift, mask, converter) steps that decodes a payload with one
+    int conversion followed by shifts and masks, instead of popping each field off a BitString.
+
+    Plans are only compiled for flat field lists (no Switch); `steps` is None otherwise.
+    """
+    def __init__(self, msg_type: str, fields: list[Field]):
+        self.msg_type = msg_type
+        self.fields = fields
+        self.total_bits = sum(field.length for field in fields)
+        self.steps: list[tuple[str, int, int, Converter]] | None = None
+        # the same steps by field name, and the steps decode_lazy() runs up front since they may raise
+        self.step_by_name: dict[str, tuple[int, int, Converter]] = {}
+        self.checked_steps: list[tuple[str, int, int, Converter]] = []
+        # byte range and converter of a byte-aligned 'time' field, which lets frames be deduplicated on the rest of the payload
+        self.time_bytes: tuple[int, int] | None = None
+        self.convert_time: Converter | None = None
+
+        if any(isinstance(field, Switch) for field in fields):
+            return
+
+        steps = []
+        offset = 0
+        for field in fields:
+            shift = self.total_bits - offset - field.length
+            steps.append((field.name, shift, (1 << field.length) - 1, _compile_field(field)))
+            if field.name == 'time' and offset % 8 == 0 and field.length % 8 == 0:
+                self.time_bytes = (offset // 8, (offset + field.length) // 8)
+                self.convert_time = steps[-1][3]
+            if _can_fail(field):
+                self.checked_steps.append(steps[-1])
+            offset += field.length
+        self.steps = steps
+        self.step_by_name = {name: (shift, mask, convert) for name, shift, mask, convert in steps}
+
+    def decode(self, msg_data: bytes | list[int]) -> dict[str, Any] | None:
+        """
+        Decodes every field of msg_data, returning the same dictionary as parse_fields().
+
+        Returns None when the plan can't handle msg_data (payload shorter than the plan, or no
+        compiled steps); callers should then fall back to parse_fields(), which also produces
+        the matching error for truncated payloads. Extra trailing bits are ignored.
+        """
+        steps = self.steps
+        extra_bits = len(msg_data) * 8 - self.total_bits
+        if steps is None or extra_bits < 0:
+            return None
+
+        value = int.from_bytes(msg_data, byteorder='big') >> extra_bits
+        return {name: convert((value >> shift) & mask) for name, shift, mask, convert in steps}
+
+    def decode_lazy(self, msg_data: bytes | list[int]) -> 'LazyPayload | None':
+        """
+        Like decode(), but returns a LazyPayload that decodes each field on first access. Fields
+        that may fail to decode are decoded right away, so this raises the same error decode()
+        would. Returns None in the same cases as decode().
+        """
+        extra_bits = len(msg_data) * 8 - self.total_bits
+        if self.steps is None or extra_bits < 0:
+            return None
+
+        value = int.from_bytes(msg_data, byteorder='big') >> extra_bits
+        return LazyPayload(self, value, {name: convert((value >> shift) & mask) for name, shift, mask, convert in self.checked_steps})
+
+class LazyPayload(Mapping[str, Any]):
+    """
+    Read-only mapping of one payload's fields, each decoded from the raw payload the first time
+    it's accessed and then cached. Iterates in field order, like the dict DecodePlan.decode() returns.
+    """
+    __slots__ = ('_plan', '_value', '_values')
+
+    def __init__(self, plan: DecodePlan, value: int, values: dict[str, Any]):
+        self._plan = plan
+        self._value = value   # the payload as an int, without trailing bits
+        self._values = values # fields decoded so far
+
+    def __getitem__(self, name: str) -> Any:
+        values = self._values
+        if name in values:
+            return values[name]
+        shift, mask, convert = self._plan.step_by_name[name]
+        res = values[name] = convert((self._value >> shift) & mask)
+        return res
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._plan.step_by_name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._plan.step_by_name)
+
+    def __len__(self) -> int:
+        return len(self._plan.step_by_name)
+
+    def to_dict(self) -> dict[str, Any]:
+        """ Every field decoded, as DecodePlan.decode() would return them """
+        return {name: self[name] for name in self._plan.step_by_name}
+
+    def __repr__(self) -> str:
+        return f'LazyPayload({self.to_dict()!r})'
+
+_DECODE_PLANS: dict[str, DecodePlan] = {}
+
+def get_decode_plan(msg_type: str) -> DecodePlan:
+    """
+    Returns the cached decode plan for msg_type's payload fields, compiling it on first use.
+    Raises KeyError if msg_type has no message definition.
+    """
+    plan = _DECODE_PLANS.get(msg_type)
+    if plan is None:
+        # skip the SID fields (prio, board type, board inst, metadata) since those are parsed separately
+        plan = DecodePlan(msg_type, CAN_MESSAGE.get_fields(msg_type)[4:])
+        _DECODE_PLANS[msg_type] = plan
+    return plan
@@ -0,0 +1,122 @@
+'''
+Precompiled per-msg_type encode plans for CAN messages, the inverse of decode_plan
+'''
+from typing import Any, Callable, Mapping
+from parsley.fields import Field, Numeric, Enum
+from parsley.message_definitions import CAN_MESSAGE, MESSAGE_PRIO, MESSAGE_TYPE, BOARD_TYPE_ID, BOARD_INST_ID, MESSAGE_METADATA
+
+Converter = Callable[[Any], int]
+
+def _compile_generic(field: Field) -> Converter:
+    # same bits BitString.push(*field.encode(value)) would append
+    encode = field.encode
+    mask = (1 << field.length) - 1
+    return lambda value: int.from_bytes(encode(value)[0], byteorder='big') & mask
+
+def _compile_numeric(field: Numeric) -> Converter:
+    if field.endian == 'little':
+        return _compile_generic(field)
+
+    scale = field.scale
+    mask = (1 << field.length) - 1
+    low, high = (-1 << (field.length - 1), 1 << (field.length - 1)) if field.signed else (0, 1 << field.length)
+    encode = field.encode
+    def convert(value) -> int:
+        if type(value) is int or type(value) is float:
+            raw = int(round(value / scale))
+            if low <= raw < high:
+                return raw & mask
+        # anything else (other number types, out of range values) goes through encode(), which also raises the matching ValueError
+        return int.from_bytes(encode(value)[0], byteorder='big') & mask
+    return convert
+
+def _compile_enum(field: Enum) -> Converter:
+    map_key_val = field.map_key_val
+    encode = field.encode
+    def convert(value) -> int:
+        raw = map_key_val.get(value)
+        if raw is None:
+            return int.from_bytes(encode(value)[0], byteorder='big') # raises the matching ValueError
+        return raw
+    return convert
+
+def _compile_field(field: Field) -> Converter:
+    # exact type checks: subclasses may override encode() and must go through it
+    if type(field) is Numeric:
+        return _compile_numeric(field)
+    if type(field) is Enum:
+        return _compile_enum(field)
+    return _compile_generic(field)
+
+_PRIO_SHIFT = MESSAGE_TYPE.length + BOARD_TYPE_ID.length + BOARD_INST_ID.length + MESSAGE_METADATA.length
+_BOARD_TYPE_SHIFT = BOARD_INST_ID.length + MESSAGE_METADATA.length
+_BOARD_INST_SHIFT = MESSAGE_METADATA.length
+
+_encode_prio = _compile_enum(MESSAGE_PRIO)
+_encode_board_type_id = _compile_enum(BOARD_TYPE_ID)
+_encode_board_inst_id = _compile_enum(BOARD_INST_ID)
+_encode_numeric_metadata = _compile_field(MESSAGE_METADATA)
+
+class EncodePlan:
+    """
+    Encodes one msg_type's flattened parsed data (as taken by encode_data()) straight to an int SID
+    and payload bytes, with the msg_type's SID bits, field order and bit offsets resolved up front
+    instead of pushing each field through a BitString.
+    """
+    def __init__(self, msg_type: str):
+        fields = CAN_MESSAGE.get_fields(msg_type)
+        self.msg_type = msg_type
+        self.msg_type_bits = MESSAGE_TYPE.map_key_val[msg_type] << (_PRIO_SHIFT - MESSAGE_TYPE.length)
+
+        metadata_field = fields[3]
+        self.metadata_is_enum = isinstance(metadata_field, Enum)
+        self.encode_metadata = _compile_field(metadata_field)
+
+        self.fields = fields[4:]
+        self.total_bits = sum(field.length for field in self.fields)
+        self.n_bytes = (self.total_bits + 7) // 8
+        self.steps: list[tuple[str, int, Converter]] = []
+        offset = 0
+        for field in self.fields:
+            offset += field.length
+            self.steps.append((field.name, self.total_bits - offset, _compile_field(field)))
+
+    def encode_sid(self, msg_prio: str, board_type_id: str, board_inst_id: str, msg_metadata: int | str) -> int:
+        if self.metadata_is_enum and type(msg_metadata) is int:
+            metadata = _encode_numeric_metadata(msg_metadata)
+        else:
+            metadata = self.encode_metadata(msg_metadata)
+        return (
+            _encode_prio(msg_prio) << _PRIO_SHIFT | self.msg_type_bits
+            | _encode_board_type_id(board_type_id) << _BOARD_TYPE_SHIFT
+            | _encode_board_inst_id(board_inst_id) << _BOARD_INST_SHIFT
+            | metadata
+        )
+
+    def encode_payload(self, parsed_data: Mapping[str, Any]) -> int:
+        """ Returns the payload as an int of total_bits bits """
+        value = 0
+        for name, shift, convert in self.steps:
+            value |= convert(parsed_data[name]) << shift
+        return value
+
+    def encode(self, parsed_data: dict[str, Any]) -> tuple[int, bytes]:
+        """ Returns the same (msg_sid, msg_data) as encode_data(), with msg_data as bytes """
+        msg_prio = parsed_data['msg_prio']
+        board_type_id = parsed_data['board_type_id']
+        board_inst_id = parsed_data['board_inst_id']
+        msg_metadata = parsed_data['msg_metadata']
+        msg_sid = self.encode_sid(msg_prio, board_type_id, board_inst_id, msg_metadata)
+        return msg_sid, self.encode_payload(parsed_data).to_bytes(self.n_bytes, byteorder='big')
+
+_ENCODE_PLANS: dict[str, EncodePlan] = {}
+
+def get_encode_plan(msg_type: str) -> EncodePlan:
+    """
+    Returns the cached encode plan for msg_type, compiling it on first use.
+    Raises KeyError if msg_type has no message definition.
+    """
+    plan = _ENCODE_PLANS.get(msg_type)
+    if plan is None:
+        plan = _ENCODE_PLANS[msg_type] = EncodePlan(msg_type)
+    return plan
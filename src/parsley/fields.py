@@ -69,6 +69,8 @@ class Enum(Field):
     dictionary: {'GENERAL_CMD': 0x060, 'RESET_CMD': 0x160}
     b'\x01\x60' <=> 'RESET_CMD'
     """
+    MAX_TABLE_BITS = 16
+
     def __init__(self, name: str, length: int, map_key_val: dict):
         super().__init__(name, length)
 
@@ -88,12 +90,28 @@ class Enum(Field):
             if v >= 1 << self.length:
                 raise ValueError(f'Mapping value {v} for key {k} is too large to fit in {self.length} bits')
 
+        # dense value -> key table (None for unmapped values) so lookups are a single list index
+        self.value_table: list[Any] | None = None
+        if self.length <= self.MAX_TABLE_BITS:
+            value_table: list[Any] = [None] * (1 << self.length)
+            for k, v in map_key_val.items():
+                value_table[v] = k
+            self.value_table = value_table
+
+    def lookup(self, value: int):
+        """ Returns the key mapped to value, or None if value isn't mapped """
+        table = self.value_table
+        if table is not None and 0 <= value < len(table):
+            return table[value]
+        return self.map_val_key.get(value)
+
     def decode(self, data: bytes):
         value = int.from_bytes(data, byteorder='big', signed=False)
-        if value not in self.map_val_key:
+        key = self.lookup(value)
+        if key is None:
             raise ValueError(f'Value "{value}" not found in map "{self.name}"')
 
-        return self.map_val_key[value]
+        return key
 
     def encode(self, value) -> Tuple[bytes, int]:
         if value not in self.map_key_val:
@@ -205,11 +223,20 @@ class Bitfield(Field):
     dictionary: {'E_NOMINAL': 0, 'E_5V_OVER_CURRENT': 1, 'E_5V_OVER_VOLTAGE': 2}
     b'\x01\x60' <=> 'E_5V_OVER_CURRENT|E_5V_OVER_VOLTAGE'
     """
+    MAX_MEMO_SIZE = 4096
+
     def __init__(self, name: str, length: int, default: str="DEFAULT_STRING", map_name_offset: Optional[dict]=None, unit=""):
         super().__init__(name, length, unit)
         self.default = default
         self.map_name_offset = map_name_offset
 
+        self.named_mask = 0
+        if map_name_offset is not None:
+            for bit in map_name_offset.values():
+                self.named_mask |= 1 << bit
+        # decoded strings by value, since a board only ever reports a handful of distinct statuses
+        self._memo: dict[int, str] = {}
+
     def decode(self, data: bytes) -> str:
         if isinstance(data, str):
             data = bytes.fromhex(data)
@@ -218,22 +245,32 @@ class Bitfield(Field):
         if self.map_name_offset is None:
             return bin(int.from_bytes(data, byteorder='big', signed=False))
 
-        bitfield_value = int.from_bytes(data, byteorder='big')
+        return self.decode_value(int.from_bytes(data, byteorder='big'))
+
+    def decode_value(self, bitfield_value: int) -> str:
+        """ decode() for an already unpacked value """
+        if self.map_name_offset is None:
+            return bin(bitfield_value)
+
+        res = self._memo.get(bitfield_value)
+        if res is not None:
+            return res
 
         status = [j for j, bit in self.map_name_offset.items() if bitfield_value & (1 << bit)]
 
         # unnamed bits shouldn't be silently dropped or reported as nominal
-        named_mask = 0
-        for bit in self.map_name_offset.values():
-            named_mask |= 1 << bit
-        unknown = bitfield_value & ~named_mask
+        unknown = bitfield_value & ~self.named_mask
         if unknown:
             status.append(f'UNKNOWN(0x{unknown:X})')
 
         if bitfield_value == 0:
             status.append(self.default)
 
-        return f"{'|'.join(status)}"
+        res = f"{'|'.join(status)}"
+        if len(self._memo) >= self.MAX_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[bitfield_value] = res
+        return res
 
     def encode(self, value: Any) -> Tuple[bytes, int]:
         if not isinstance(value, str):
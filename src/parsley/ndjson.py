@@ -0,0 +1,175 @@
+'''
+Streaming newline-delimited JSON export of parse results
+
+Each result becomes one line holding exactly what json.dumps() of the legacy parsley.parse()
+dictionary would (ie. result.model_dump(mode='json') for decoded frames, and the msg_data/error
+dictionary for ParsleyErrors), plus "log_timestamp" and "monotonic_time" keys for frames read
+from a logger dump. Lines are filled into a template cached per field layout (one per msg_type
+in practice) with a direct encoder per value type, without building intermediate dictionaries.
+'''
+import json
+import math
+import os
+from json.encoder import encode_basestring_ascii
+from typing import IO, Any, Callable, Iterable, Iterator
+
+import parsley.message_types as mt
+from parsley.parsley_message import LazyParsleyObject, ParseResult, ParsleyError, ParsleyObject, ParsleyRecord
+
+MAX_TEMPLATES = 4096
+
+def _encode_float(value: float) -> str:
+    # model_dump(mode='json') turns nan and infinities into null
+    return float.__repr__(value) if math.isfinite(value) else 'null'
+
+# JSON encoders for the value types our decoders produce; anything else takes the json.dumps() path
+_ENCODERS: dict[type, Callable[[Any], str]] = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    float: _encode_float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda value: 'null',
+}
+
+_OBJECT_KEYS = ('board_type_id', 'board_inst_id', 'msg_prio', 'msg_type', 'msg_metadata')
+_ERROR_KEYS = ('msg_prio', 'board_type_id', 'board_inst_id', 'msg_type', 'msg_metadata')
+
+def _template(header_keys: tuple[str, ...], data_keys: tuple[str, ...]) -> str:
+    """ printf-style template of a line, without its closing brace, taking one encoded value per key """
+    def fields(keys):
+        return ', '.join(json.dumps(key).replace('%', '%%') + ': %s' for key in keys)
+    return '{' + fields(header_keys) + ', "data": {' + fields(data_keys) + '}'
+
+# line templates keyed by the data keys of a result, ie. one per msg_type in practice
+_TEMPLATES: dict[tuple[str, ...], str] = {}
+_ERROR_TEMPLATE = _template(_ERROR_KEYS, ('msg_data', 'error'))
+_LOG_TEMPLATE = ', "log_timestamp": %s, "monotonic_time": %s}'
+
+def dumps(result: ParseResult) -> str:
+    """ Returns result's JSON line, without the trailing newline """
+    try:
+        if isinstance(result, ParsleyError):
+            values = (result.msg_prio, result.board_type_id, result.board_inst_id, result.msg_type, result.msg_metadata, result.msg_data, result.error)
+            template = _ERROR_TEMPLATE
+        elif isinstance(result, (ParsleyObject, ParsleyRecord, LazyParsleyObject)):
+            data = result.data
+            values = (result.board_type_id, result.board_inst_id, result.msg_prio, result.msg_type, result.msg_metadata, *data.values())
+            keys = tuple(data)
+            template = _TEMPLATES.get(keys)
+            if template is None:
+                if len(_TEMPLATES) >= MAX_TEMPLATES:
+                    _TEMPLATES.clear()
+                template = _TEMPLATES[keys] = _template(_OBJECT_KEYS, keys)
+        else:
+            raise ValueError(f'Cannot export a {type(result).__name__}')
+        line = template % tuple([_ENCODERS[type(value)](value) for value in values])
+    except KeyError: # a value type without a fast path
+        return _dumps_generic(result)
+
+    if result.log_timestamp is None:
+        return line + '}'
+    return line + _LOG_TEMPLATE % (json.dumps(result.log_timestamp), json.dumps(result.monotonic_time))
+
+def _dumps_generic(result: ParseResult) -> str:
+    if isinstance(result, ParsleyError):
+        dump = {key: getattr(result, key) for key in _ERROR_KEYS}
+        dump['data'] = {'msg_data': result.msg_data, 'error': result.error}
+    elif isinstance(result, ParsleyObject):
+        dump = result.model_dump(mode='json')
+    else:
+        dump = ParsleyObject.model_construct(**{key: getattr(result, key) for key in _OBJECT_KEYS}, data=dict(result.data)).model_dump(mode='json')
+    if result.log_timestamp is not None:
+        dump['log_timestamp'] = result.log_timestamp
+        dump['monotonic_time'] = result.monotonic_time
+    return json.dumps(dump)
+
+class NDJSONWriter:
+    """
+    Writes results to a text file as JSON lines, joining batch_size lines per write() call.
+    Use as a context manager, or call flush() once done.
+    """
+    def __init__(self, file: IO[str], batch_size: int = 1024):
+        self.file = file
+        self.batch_size = batch_size
+        self.count = 0 # lines written so far, including buffered ones
+        self._lines: list[str] = []
+
+    def write(self, result: ParseResult):
+        self._lines.append(dumps(result))
+        self.count += 1
+        if len(self._lines) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, results: Iterable[ParseResult]):
+        for result in results:
+            self.write(result)
+
+    def flush(self):
+        if self._lines:
+            self.file.write('\n'.join(self._lines) + '\n')
+            self._lines.clear()
+
+    def __enter__(self) -> 'NDJSONWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+def write_ndjson(results: Iterable[ParseResult], target: str | os.PathLike[str] | IO[str], batch_size: int = 1024) -> int:
+    """ Writes results as JSON lines to a path or text file object and returns the number of lines written """
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'w', encoding='ascii') as file:
+            return write_ndjson(results, file, batch_size)
+
+    with NDJSONWriter(target, batch_size) as writer:
+        writer.write_many(results)
+    return writer.count
+
+def loads(line: str | bytes, validate: bool = True) -> ParseResult:
+    """
+    Turns a JSON line back into a result: a ParsleyObject (or a ParsleyRecord with validate=False)
+    for decoded frames, and a ParsleyError for errors.
+    """
+    return _from_dump(json.loads(line), validate)
+
+def _from_dump(dump: dict[str, Any], validate: bool) -> ParseResult:
+    msg_type = dump['msg_type']
+    data = dump['data']
+    log_timestamp = dump.get('log_timestamp')
+    monotonic_time = dump.get('monotonic_time')
+    if msg_type not in mt.msg_type: # errors report the raw msg_type in hex
+        return ParsleyError(
+            msg_prio=dump['msg_prio'],
+            board_type_id=dump['board_type_id'],
+            board_inst_id=dump['board_inst_id'],
+            msg_type=msg_type,
+            msg_metadata=dump['msg_metadata'],
+            msg_data=data['msg_data'],
+            error=data['error'],
+            log_timestamp=log_timestamp,
+            monotonic_time=monotonic_time,
+        )
+
+    record = ParsleyRecord(dump['msg_prio'], msg_type, dump['board_type_id'], dump['board_inst_id'], dump['msg_metadata'], data, log_timestamp, monotonic_time)
+    if not validate:
+        return record
+    return ParsleyObject(**record._asdict())
+
+def read_ndjson(source: str | os.PathLike[str] | IO[Any], validate: bool = True, batch_size: int = 1024) -> Iterator[ParseResult]:
+    """
+    Lazily reads the results written by write_ndjson() from a path or a text or binary file
+    object. Lines are decoded batch_size at a time; blank lines are ignored.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield from read_ndjson(file, validate, batch_size)
+        return
+
+    decoder = json.JSONDecoder()
+    while lines := source.readlines(batch_size * 128):
+        if isinstance(lines[0], bytes):
+            lines = [line.decode() for line in lines]
+        # one json parse per batch instead of one per line
+        joined = ','.join(line for line in lines if not line.isspace())
+        for dump in decoder.decode(f'[{joined}]'):
+            yield _from_dump(dump, validate)
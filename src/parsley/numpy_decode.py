@@ -0,0 +1,147 @@
+'''
+Optional NumPy-backed bulk decoding of fixed-layout CAN message payloads
+
+NumPy is not a dependency of parsley; this module can be imported without it, but
+decode_payloads() raises ImportError unless NumPy is installed.
+'''
+from importlib.util import find_spec
+from typing import Any, Sequence
+from parsley.decode_plan import Converter, DecodePlan, get_decode_plan
+from parsley.fields import Numeric, Floating
+
+def numpy_available() -> bool:
+    return find_spec('numpy') is not None
+
+class NumpyDecodePlan:
+    """
+    Splits a DecodePlan's fields into the ones NumPy can decode in bulk (byte-aligned Numeric
+    fields of up to 8 bytes and byte-aligned Floating fields) and the rest, which are decoded
+    row by row with the plan's scalar converters.
+    """
+    def __init__(self, plan: DecodePlan):
+        steps = plan.steps
+        if steps is None:
+            raise ValueError(f'Message type "{plan.msg_type}" has nested fields and no fixed layout')
+
+        self.plan = plan
+        self.steps = steps
+        self.min_payload_size = (plan.total_bits + 7) // 8
+        # (name, byte offset, field) for vectorized fields, (name, index into plan.steps) for the rest
+        self.vector_fields: list[tuple[str, int, Numeric | Floating]] = []
+        self.scalar_steps: list[tuple[str, int]] = []
+
+        offset = 0
+        for index, field in enumerate(plan.fields):
+            aligned = offset % 8 == 0 and field.length % 8 == 0
+            if aligned and type(field) is Numeric and field.length <= 64:
+                self.vector_fields.append((field.name, offset // 8, field))
+            elif aligned and type(field) is Floating:
+                self.vector_fields.append((field.name, offset // 8, field))
+            else:
+                self.scalar_steps.append((field.name, index))
+            offset += field.length
+
+    def decode(self, payloads: 'bytes | bytearray | memoryview[Any]', payload_size: int | None = None, count: int | None = None) -> dict[str, Any]:
+        """
+        Decodes a contiguous buffer of equally sized payloads and returns a dict of field name to
+        column. Vectorized fields are NumPy arrays, the others are lists of the values parse_fields()
+        would produce. Bytes past the plan's fields in each payload are ignored.
+
+        Empty payloads (of message types without payload fields) can't be counted from the buffer,
+        so their number is taken from count.
+
+        Raises ValueError if the buffer isn't a whole number of payloads, if payloads are shorter
+        than the message definition, or (like parse_fields()) on the first undecodable value.
+        """
+        try:
+            import numpy as np
+        except ImportError: # pragma: no cover - exercised only without numpy
+            raise ImportError('numpy is required for vectorized decoding') from None
+
+        if payload_size is None:
+            payload_size = self.min_payload_size
+        if payload_size < self.min_payload_size:
+            raise ValueError(f'Payloads of {payload_size} bytes are too short for "{self.plan.msg_type}" ({self.min_payload_size} bytes)')
+        raw = np.frombuffer(payloads, dtype=np.uint8)
+        if payload_size == 0:
+            if len(raw):
+                raise ValueError(f'Buffer of {len(raw)} bytes is not a whole number of 0-byte payloads')
+            rows = count or 0
+        else:
+            if len(raw) % payload_size:
+                raise ValueError(f'Buffer of {len(raw)} bytes is not a whole number of {payload_size}-byte payloads')
+            rows = len(raw) // payload_size
+        if rows == 0:
+            raw = np.zeros(payload_size, dtype=np.uint8) # so the strided views below have a buffer to point into
+
+        res: dict[str, Any] = {}
+        for name, byte_offset, field in self.vector_fields:
+            res[name] = self._decode_vector(raw, rows, payload_size, byte_offset, field)
+
+        if self.scalar_steps:
+            extra_bits = payload_size * 8 - self.plan.total_bits
+            steps = self.steps
+            columns: list[tuple[str, int, int, Converter, list[Any]]] = [(name, steps[index][1], steps[index][2], steps[index][3], []) for name, index in self.scalar_steps]
+            data = bytes(raw)
+            for start in range(0, rows * payload_size, payload_size):
+                value = int.from_bytes(data[start:start + payload_size], byteorder='big') >> extra_bits
+                for _, shift, mask, convert, column in columns:
+                    column.append(convert((value >> shift) & mask))
+            for name, _, _, _, column in columns:
+                res[name] = column
+
+        # keep the message definition's field order
+        return {field.name: res[field.name] for field in self.plan.fields}
+
+    @staticmethod
+    def _decode_vector(raw, rows: int, payload_size: int, byte_offset: int, field: Numeric | Floating):
+        import numpy as np # already imported by decode()
+        n_bytes = field.length // 8
+        byteorder = '>' if field.endian == 'big' else '<'
+
+        if isinstance(field, Floating):
+            view = np.ndarray((rows,), dtype=f'{byteorder}f4', buffer=raw, offset=byte_offset, strides=(payload_size,))
+            return view.astype(np.float64)
+
+        if n_bytes in (1, 2, 4, 8):
+            # zero-copy strided view over the field in every payload
+            kind = 'i' if field.signed else 'u'
+            view = np.ndarray((rows,), dtype=f'{byteorder}{kind}{n_bytes}', buffer=raw, offset=byte_offset, strides=(payload_size,))
+            values = view.astype(np.uint64 if kind == 'u' and n_bytes == 8 else np.int64)
+        else:
+            # odd widths (eg. 24 bits) have no dtype, so assemble them a byte at a time
+            values = np.zeros(rows, dtype=np.int64)
+            for i in range(n_bytes):
+                column = np.ndarray((rows,), dtype=np.uint8, buffer=raw, offset=byte_offset + i, strides=(payload_size,))
+                shift = 8 * (n_bytes - 1 - i) if byteorder == '>' else 8 * i
+                values |= column.astype(np.int64) << shift
+            if field.signed:
+                values = np.where(values >= 1 << (field.length - 1), values - (1 << field.length), values)
+
+        scale = field.scale
+        if type(scale) is int and scale == 1:
+            return values
+        return values * scale
+
+_NUMPY_PLANS: dict[str, NumpyDecodePlan] = {}
+
+def get_numpy_plan(msg_type: str) -> NumpyDecodePlan:
+    plan = _NUMPY_PLANS.get(msg_type)
+    if plan is None:
+        plan = _NUMPY_PLANS[msg_type] = NumpyDecodePlan(get_decode_plan(msg_type))
+    return plan
+
+def decode_payloads(msg_type: str, payloads: bytes | bytearray | memoryview | Sequence[bytes], payload_size: int | None = None) -> dict[str, Any]:
+    """
+    Decodes many payloads of one msg_type at once. payloads is either a contiguous buffer of
+    payload_size-byte payloads or a sequence of payloads, which must all have the same length.
+    """
+    count = None
+    if not isinstance(payloads, (bytes, bytearray, memoryview)):
+        sizes = {len(payload) for payload in payloads}
+        if len(sizes) > 1:
+            raise ValueError(f'Payloads must all have the same length, got lengths {sorted(sizes)}')
+        payload_size = sizes.pop() if sizes else payload_size
+        count = len(payloads)
+        payloads = b''.join(payloads)
+    return get_numpy_plan(msg_type).decode(payloads, payload_size, count)
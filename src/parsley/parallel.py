@@ -0,0 +1,73 @@
+'''
+Multiprocess decoding of logger dumps
+
+Every logger page starts with its own 'LOG' signature and page number, so a dump can be split
+into page ranges that are decoded independently in a process pool and merged back in page order.
+'''
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+from parsley.columnar import ColumnarDecoder
+from parsley.parse_to_object import LoggerParser
+from parsley.parsley_message import ParseResult
+
+PAGE_SIZE = LoggerParser.PARSE_LOGGER_PAGE_SIZE
+
+def _read_page_range(path: str | os.PathLike[str], first_page: int, page_count: int) -> list[bytes]:
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = first_page * PAGE_SIZE
+            return [mapped[offset:offset + PAGE_SIZE] for offset in range(start, start + page_count * PAGE_SIZE, PAGE_SIZE)]
+
+def _decode_page_range(path: str | os.PathLike[str], first_page: int, page_count: int, page_number: int, validate: bool) -> list[ParseResult]:
+    """ Worker: decodes pages [first_page, first_page + page_count) of the dump at path """
+    pages = _read_page_range(path, first_page, page_count)
+    return LoggerParser(validate).parse_many(pages, page_number + first_page)
+
+def _decode_page_range_columnar(path: str | os.PathLike[str], first_page: int, page_count: int, page_number: int) -> ColumnarDecoder:
+    """ Worker: like _decode_page_range(), but into a ColumnarDecoder """
+    pages = _read_page_range(path, first_page, page_count)
+    msg_sids, msg_datas, log_timestamps = LoggerParser().read_frames(pages, page_number + first_page)
+    decoder = ColumnarDecoder()
+    decoder.feed_many(msg_sids, msg_datas, log_timestamps)
+    return decoder
+
+def parse_dump_parallel(path: str | os.PathLike[str], page_number: int = 0, max_workers: int | None = None,
+                        pages_per_chunk: int = 256, validate: bool = True, columnar: bool = False
+                        ) -> list[ParseResult] | ColumnarDecoder:
+    """
+    Decodes the logger dump at path (starting at page_number) across a pool of max_workers
+    processes, each handling pages_per_chunk pages at a time.
+
+    Returns the same list LoggerParser(validate).parse_dump(path, page_number) would produce,
+    or with columnar=True a single ColumnarDecoder holding every frame (with log_timestamp and
+    monotonic_time columns), which is much cheaper to send back from the workers than millions
+    of result objects.
+    Raises ValueError, like LoggerParser, if any page is malformed.
+    """
+    if pages_per_chunk <= 0:
+        raise ValueError(f'pages_per_chunk must be positive, got {pages_per_chunk}')
+
+    size = os.path.getsize(path)
+    page_total = (size + PAGE_SIZE - 1) // PAGE_SIZE # a trailing partial page is rejected by LoggerParser
+    chunks = [(first_page, min(pages_per_chunk, page_total - first_page)) for first_page in range(0, page_total, pages_per_chunk)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        if columnar:
+            decoders = [
+                executor.submit(_decode_page_range_columnar, path, first_page, page_count, page_number)
+                for first_page, page_count in chunks
+            ]
+            decoder = ColumnarDecoder()
+            for future in decoders:
+                decoder.merge(future.result())
+            return decoder
+
+        futures = [
+            executor.submit(_decode_page_range, path, first_page, page_count, page_number, validate)
+            for first_page, page_count in chunks
+        ]
+        results: list[ParseResult] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
@@ -1,15 +1,22 @@
 '''
 Contains the new static class implementation of Parsley.py
 '''
-from typing import Any
-from parsley.parsley_message import ParsleyObject, ParsleyError
-from parsley.bitstring import BitString
-from parsley.message_definitions import CAN_MESSAGE, MESSAGE_PRIO, MESSAGE_TYPE, BOARD_TYPE_ID, BOARD_INST_ID, MESSAGE_METADATA, MESSAGE_SID
+from typing import IO, Any, BinaryIO, Iterable, Iterator, Mapping, NamedTuple, Sequence, TypeVar
+from parsley.parsley_message import ParsleyObject, ParsleyError, ParsleyRecord, LazyParsleyObject, ParseResult
+from parsley.bitstring import BitString, BitCursor
+from parsley.decode_plan import DecodePlan, LazyPayload, get_decode_plan
+from parsley.encode_plan import EncodePlan, get_encode_plan
+from parsley.message_definitions import CAN_MESSAGE, TIMESTAMP_2, MESSAGE_PRIO, MESSAGE_TYPE, BOARD_TYPE_ID, BOARD_INST_ID, MESSAGE_METADATA, MESSAGE_SID
 import parsley.parse_utils as pu
 from parsley.fields import Field, Switch, Bitfield, Enum
 from abc import ABC, abstractmethod
+import mmap
+import os
 import struct
-import crc8
+import threading
+from parsley.crc import CRC8_TABLE, crc8
+from parsley.profiling import NULL_PROFILER, Profiler
+from time import perf_counter_ns
 import parsley.message_types as mt
 
 #Used for formatting lines
@@ -19,6 +26,25 @@ BOARD_TYPE_ID_LEN = max([len(board_type_id) for board_type_id in mt.board_type_i
 BOARD_INST_ID_LEN = max([len(board_inst_id) for board_inst_id in mt.board_inst_id])
 MSG_METADATA_LEN = max((len(name) for fields in CAN_MESSAGE.map_key_enum.values() if isinstance(fields[3], Enum) for name in fields[3].map_key_val), default=0)
 
+#Cached format_line() headers by header values and body templates by field names
+MAX_LINE_TEMPLATES = 4096
+_LINE_HEADERS: dict[tuple[Any, ...], str] = {}
+_LINE_TEMPLATES: dict[tuple[Any, ...], str] = {}
+#Held while a miss checks the size of a line cache and fills it, so lines can be formatted from several threads
+_LINE_CACHE_LOCK = threading.Lock()
+
+#Used for grouping frames by msg_type without fully decoding the SID
+MSG_TYPE_SHIFT = BOARD_TYPE_ID.length + BOARD_INST_ID.length + MESSAGE_METADATA.length
+MSG_TYPE_MASK = (1 << MESSAGE_TYPE.length) - 1
+
+#Start byte, length and SID of a live-telemetry frame, which are followed by the payload and a CRC8
+LIVE_TELEMETRY_HEADER = struct.Struct('>BBI')
+
+#Any one kind of parse result, for functions that return the kind they were given
+ResultT = TypeVar('ResultT', bound=ParseResult)
+#What the encoders take: a decoded result or a flattened parsed_data dict (see encode_results)
+EncodableResult = ParsleyObject[Any] | ParsleyRecord | LazyParsleyObject | dict[str, Any]
+
 class _ParsleyParseInternal:
     def __init__(self):
         raise NotImplementedError("This class is static only do not instantiate it")
@@ -31,17 +57,66 @@ class _ParsleyParseInternal:
         board_inst_id = parsed_data['board_inst_id']
         msg_metadata = parsed_data['msg_metadata']
         data = parsed_data['data']
-        
-        res = (
-            f'[ {msg_prio:<{MSG_PRIO_LEN}} {msg_type:<{MSG_TYPE_LEN}}'
-            f' {board_type_id:<{BOARD_TYPE_ID_LEN}} {board_inst_id:<{BOARD_INST_ID_LEN}}'
-            f' {str(msg_metadata):<{MSG_METADATA_LEN}} ]'
-        )
-        
-        for k, v in data.items():
-            formatted_value = f"{v:.3f}" if isinstance(v, float) else v
-            res += f' {k}: {formatted_value}'
-        return res
+        return _ParsleyParseInternal._format_fields(msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, data)
+
+    @staticmethod
+    def _format_fields(msg_prio: str, msg_type: str, board_type_id: str, board_inst_id: str, msg_metadata: int | str, data: Mapping[str, Any]) -> str:
+        # a bus only carries a few hundred distinct headers and one field layout per msg_type,
+        # so both halves of the line come from cached templates
+        try:
+            key = (msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, type(msg_metadata))
+            header = _LINE_HEADERS.get(key)
+        except TypeError: # unhashable values are just formatted every time
+            key = header = None
+        if header is None:
+            header = (
+                f'[ {msg_prio:<{MSG_PRIO_LEN}} {msg_type:<{MSG_TYPE_LEN}}'
+                f' {board_type_id:<{BOARD_TYPE_ID_LEN}} {board_inst_id:<{BOARD_INST_ID_LEN}}'
+                f' {str(msg_metadata):<{MSG_METADATA_LEN}} ]'
+            )
+            if key is not None:
+                with _LINE_CACHE_LOCK:
+                    if len(_LINE_HEADERS) >= MAX_LINE_TEMPLATES:
+                        _LINE_HEADERS.clear()
+                    _LINE_HEADERS[key] = header
+
+        keys = tuple(data)
+        template = _LINE_TEMPLATES.get(keys)
+        if template is None:
+            template = ''.join(' ' + f'{k}'.replace('{', '{{').replace('}', '}}') + ': {}' for k in keys)
+            with _LINE_CACHE_LOCK:
+                if len(_LINE_TEMPLATES) >= MAX_LINE_TEMPLATES:
+                    _LINE_TEMPLATES.clear()
+                _LINE_TEMPLATES[keys] = template
+        return header + template.format(*[f"{v:.3f}" if isinstance(v, float) else v for v in data.values()])
+
+    @staticmethod
+    def write_lines(results: Iterable[EncodableResult], file: IO[str], batch_size: int = 1024) -> int:
+        """
+        Writes format_line() of every result to a text file, one per line, and returns the number
+        of lines written. results are ParsleyObjects, ParsleyRecords or parsed_data dicts as taken
+        by format_line(); lines are joined and written batch_size at a time.
+        Raises ValueError for ParsleyErrors, which format_line() can't format.
+        """
+        format_fields = _ParsleyParseInternal._format_fields
+        lines: list[str] = []
+        count = 0
+        for result in results:
+            if isinstance(result, (ParsleyObject, ParsleyRecord, LazyParsleyObject)):
+                line = format_fields(result.msg_prio, result.msg_type, result.board_type_id, result.board_inst_id, result.msg_metadata, result.data)
+            elif isinstance(result, dict):
+                line = _ParsleyParseInternal.format_line(result)
+            else:
+                raise ValueError(f'Cannot format a {type(result).__name__}')
+            lines.append(line)
+            if len(lines) >= batch_size:
+                file.write('\n'.join(lines) + '\n')
+                count += len(lines)
+                lines.clear()
+        if lines:
+            file.write('\n'.join(lines) + '\n')
+            count += len(lines)
+        return count
 
     @staticmethod
     def calculate_msg_bit_len(can_message):
@@ -52,6 +127,72 @@ class _ParsleyParseInternal:
 
     @staticmethod
     def encode_data(parsed_data: dict) -> tuple[int, list[int]]:
+        try:
+            plan = get_encode_plan(parsed_data['msg_type'])
+        except KeyError:
+            # let the BitString path raise the usual error for missing keys or unknown msg_types
+            return _ParsleyParseInternal._encode_data_bitstring(parsed_data)
+        msg_sid, msg_data = plan.encode(parsed_data)
+        return msg_sid, list(msg_data)
+
+    @staticmethod
+    def encode_many(items: Sequence[EncodableResult]) -> bytearray:
+        """
+        Encodes parsed results (see encode_results) as back-to-back live-telemetry frames, as built
+        by LiveTelemetryParser.encode_frame(), written in place into one preallocated buffer.
+        Raises ValueError like encode_results() does.
+        """
+        encoded = [_ParsleyParseInternal._encode_item(item) for item in items]
+        # every frame is its payload plus 7 bytes: start byte, length, 4 SID bytes and CRC8
+        buf = bytearray(sum(plan.n_bytes + 7 for plan, _, _, _ in encoded))
+        pack_header = LIVE_TELEMETRY_HEADER.pack_into
+        crc_table = CRC8_TABLE # crc8() inlined
+        offset = 0
+        for plan, msg_sid, data, _ in encoded:
+            n_bytes = plan.n_bytes
+            crc_at = offset + 6 + n_bytes
+            pack_header(buf, offset, 0x02, n_bytes + 7, msg_sid & 0x1FFF_FFFF)
+            buf[offset + 6:crc_at] = plan.encode_payload(data).to_bytes(n_bytes, byteorder='big')
+            crc = 0
+            for byte in buf[offset:crc_at]:
+                crc = crc_table[crc ^ byte]
+            buf[crc_at] = crc
+            offset = crc_at + 1
+        return buf
+
+    @staticmethod
+    def encode_results(items: Iterable[EncodableResult]) -> Iterator[tuple[int, bytes, int | None]]:
+        """
+        Encodes parsed results back to (msg_sid, msg_data, log_timestamp) for the wire-format
+        encoders. items are ParsleyObjects, ParsleyRecords or flattened parsed_data dicts as
+        taken by encode_data() (eg. from ColumnBatch.iter_parsed_data()); log_timestamp is
+        the item's log_timestamp if it has one.
+        Raises ValueError for ParsleyErrors, which can't be encoded, and unknown msg_types.
+        """
+        for item in items:
+            plan, msg_sid, data, log_timestamp = _ParsleyParseInternal._encode_item(item)
+            yield msg_sid, plan.encode_payload(data).to_bytes(plan.n_bytes, byteorder='big'), log_timestamp
+
+    @staticmethod
+    def _encode_item(item: EncodableResult) -> tuple[EncodePlan, int, Mapping[str, Any], int | None]:
+        """ Returns item's encode plan, its encoded SID, the mapping holding its field values and its log_timestamp """
+        if isinstance(item, (ParsleyObject, ParsleyRecord, LazyParsleyObject)):
+            msg_type, data, log_timestamp = item.msg_type, item.data, item.log_timestamp
+            msg_prio, board_type_id, board_inst_id, msg_metadata = item.msg_prio, item.board_type_id, item.board_inst_id, item.msg_metadata
+        elif isinstance(item, dict):
+            msg_type, data, log_timestamp = item['msg_type'], item, item.get('log_timestamp')
+            msg_prio, board_type_id, board_inst_id, msg_metadata = item['msg_prio'], item['board_type_id'], item['board_inst_id'], item['msg_metadata']
+        else:
+            raise ValueError(f'Cannot encode a {type(item).__name__}')
+
+        try:
+            plan = get_encode_plan(msg_type)
+        except KeyError:
+            raise ValueError(f'No message definition for msg_type "{msg_type}"') from None
+        return plan, plan.encode_sid(msg_prio, board_type_id, board_inst_id, msg_metadata), data, log_timestamp
+
+    @staticmethod
+    def _encode_data_bitstring(parsed_data: dict[str, Any]) -> tuple[int, list[int]]:
         msg_prio = parsed_data['msg_prio']
         msg_type = parsed_data['msg_type']
         board_type_id = parsed_data['board_type_id']
@@ -77,9 +218,9 @@ class _ParsleyParseInternal:
         return msg_sid, msg_data
 
     @staticmethod
-    def parse_fields(bit_str: BitString, fields: list[Field]) -> dict[str, Any]:
+    def parse_fields(bit_str: BitString | BitCursor, fields: list[Field]) -> dict[str, Any]:
         """
-        Parses binary data stored in a BitString and decodes the data
+        Parses binary data stored in a BitString (or read through a BitCursor) and decodes the data
         based on each field's decode() implementation. Returns a dictionary
         of each field's name to its decoded python value.
         """
@@ -102,51 +243,205 @@ class _ParsleyParseInternal:
 
     @staticmethod
     def parse_board_type_id(encoded_board_type_id: bytes) -> str:
-        board_type_id = None
-        try:
-            board_type_id = BOARD_TYPE_ID.decode(encoded_board_type_id)
-        except ValueError:
+        board_type_id = BOARD_TYPE_ID.lookup(int.from_bytes(encoded_board_type_id, byteorder='big'))
+        if board_type_id is None:
             board_type_id = pu.hexify(encoded_board_type_id)
         return board_type_id
 
     @staticmethod
     def parse_board_inst_id(encoded_board_inst_id: bytes) -> str:
-        board_inst_id = None
-        try:
-            board_inst_id = BOARD_INST_ID.decode(encoded_board_inst_id)
-        except ValueError:
+        board_inst_id = BOARD_INST_ID.lookup(int.from_bytes(encoded_board_inst_id, byteorder='big'))
+        if board_inst_id is None:
             board_inst_id = pu.hexify(encoded_board_inst_id)
         return board_inst_id
 
     @staticmethod
     def parse_msg_prio(encoded_msg_prio: bytes) -> str:
-        try:
-            return MESSAGE_PRIO.decode(encoded_msg_prio)
-        except ValueError:
+        msg_prio = MESSAGE_PRIO.lookup(int.from_bytes(encoded_msg_prio, byteorder='big'))
+        if msg_prio is None:
             return pu.hexify(encoded_msg_prio)
+        return msg_prio
 
     @staticmethod
     def parse_msg_metadata(encoded_msg_metadata: bytes, msg_type: str) -> int | str:
-        try:
-            metadata_field = CAN_MESSAGE.get_fields(msg_type)[3]
-            return metadata_field.decode(encoded_msg_metadata)
-        except ValueError:
-            return MESSAGE_METADATA.decode(encoded_msg_metadata) # if value error based on message type just decode as number
+        metadata_field = CAN_MESSAGE.get_fields(msg_type)[3]
+        if type(metadata_field) is Enum:
+            msg_metadata = metadata_field.lookup(int.from_bytes(encoded_msg_metadata, byteorder='big'))
+            if msg_metadata is not None:
+                return msg_metadata
+        else:
+            try:
+                return metadata_field.decode(encoded_msg_metadata)
+            except ValueError:
+                pass
+        return MESSAGE_METADATA.decode(encoded_msg_metadata) # if value error based on message type just decode as number
 
     @staticmethod
-    def parse_to_object(msg_sid: bytes, msg_data: bytes) -> ParsleyObject | ParsleyError:
+    def parse_to_object(msg_sid: bytes | int, msg_data: bytes | list[int], validate: bool = True, result_cache: 'ResultCache | None' = None,
+                        profiler: Profiler | None = None, lazy: bool = False) -> ParseResult:
         """
         Extracts the message_type and board_id from msg_sid to construct a Parsley Object along with message_data.
         Upon reading poorly formatted data, the error is caught and returned in a ParsleyError object.
+
+        With validate=False, a lightweight ParsleyRecord is returned instead of a ParsleyObject
+        and pydantic validation is skipped. With a result_cache, payloads that only differ from an
+        earlier frame's by their time field reuse its decoded fields. With a profiler, the decode
+        stages are timed and the frame is counted.
+
+        With lazy=True, a LazyParsleyObject whose payload fields are only decoded when accessed is
+        returned instead, and validate and result_cache are ignored.
         """
+        return _ParsleyParseInternal._parse_frame(msg_sid, msg_data, None, validate, result_cache, profiler, lazy)
+
+    @staticmethod
+    def parse_many(msg_sids: Sequence[bytes | int], msg_datas: Sequence[bytes | list[int]], validate: bool = True, result_cache: 'ResultCache | None' = None,
+                   profiler: Profiler | None = None, lazy: bool = False) -> list[ParseResult]:
+        """
+        Batch version of parse_to_object(): parses msg_sids[i] with msg_datas[i] for every frame
+        and returns the results in input order.
+
+        Frames are grouped by their encoded msg_type so the msg_type lookup and decode plan are
+        resolved once per group instead of once per frame.
+        """
+        if len(msg_sids) != len(msg_datas):
+            raise ValueError(f'Got {len(msg_sids)} SIDs but {len(msg_datas)} payloads')
+
+        results: list[Any] = [None] * len(msg_sids) # filled in input order below
+        if profiler is None:
+            groups = _ParsleyParseInternal.group_by_msg_type(msg_sids)
+        else:
+            groups = profiler.call('sid_decode', _ParsleyParseInternal.group_by_msg_type, msg_sids)
+        for plan, indices in groups:
+            for index in indices:
+                results[index] = _ParsleyParseInternal._parse_frame(msg_sids[index], msg_datas[index], plan, validate, result_cache, profiler, lazy)
+        return results
+
+    @staticmethod
+    def group_by_msg_type(msg_sids: Sequence[bytes | int]) -> list[tuple[DecodePlan | None, list[int]]]:
+        """
+        Groups the indices of msg_sids by their encoded msg_type and resolves each group's decode
+        plan once. The plan is None for groups whose msg_type is unknown.
+        """
+        groups: dict[int, list[int]] = {}
+        for index, msg_sid in enumerate(msg_sids):
+            sid = msg_sid if isinstance(msg_sid, int) else int.from_bytes(msg_sid, byteorder='big')
+            groups.setdefault((sid >> MSG_TYPE_SHIFT) & MSG_TYPE_MASK, []).append(index)
+
+        res: list[tuple[DecodePlan | None, list[int]]] = []
+        for encoded_msg_type, indices in groups.items():
+            try:
+                msg_type = MESSAGE_TYPE.decode(encoded_msg_type.to_bytes(1, byteorder='big'))
+                plan = get_decode_plan(msg_type)
+            except (ValueError, KeyError):
+                plan = None # unknown msg_type, let every frame in the group report its own error
+            res.append((plan, indices))
+        return res
+
+    @staticmethod
+    def _parse_frame(msg_sid: bytes | int, msg_data: bytes | list[int], plan: DecodePlan | None, validate: bool, result_cache: 'ResultCache | None' = None,
+                     profiler: Profiler | None = None, lazy: bool = False) -> ParseResult:
+        """
+        Shared implementation of parse_to_object(), parse_many() and decode_frame(). If the caller
+        already resolved the decode plan for msg_sid's msg_type it is passed in, otherwise it is
+        looked up here. Stages are timed by profiler, or by the no-op NULL_PROFILER.
+        """
+        timer = profiler or NULL_PROFILER
+        start = timer.clock()
         # Allow callers to pass integer SID
         if isinstance(msg_sid, int):
-            sid_bytes, data_bytes = _ParsleyParseInternal.format_can_message(msg_sid,list(msg_data))
-            msg_sid = sid_bytes
-            msg_data = data_bytes
+            msg_data = bytes(msg_data)
+        else:
+            msg_sid = int.from_bytes(msg_sid, byteorder='big')
+        header = SID_CACHE.get(msg_sid)
+        msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, error_msg_type, error = header
+        decoded_at = timer.lap('sid_decode', start)
+
+        if error is not None:
+            timer.count_error('msg_type')
+            timer.count_frame(error_msg_type)
+            return _ParsleyParseInternal._frame_error(header, msg_data, error)
+        if lazy and msg_prio not in mt.msg_prio:
+            # ParsleyObject rejects these, take the eager path so the same ValidationError is raised
+            lazy, validate = False, True
+
+        try:
+            # the plan only covers the payload fields since we've already manually parsed BOARD_ID
+            # if BOARD_ID threw an error, we want to try and parse the rest of the CAN message
+            if plan is None:
+                plan = get_decode_plan(msg_type)
+            if lazy:
+                data = _ParsleyParseInternal._decode_payload_lazy(msg_data, plan)
+            elif result_cache is not None:
+                data = result_cache.decode(msg_sid, msg_data, plan)
+            else:
+                data = _ParsleyParseInternal.decode_payload(msg_data, plan)
+        except (ValueError, IndexError, KeyError) as error:
+            timer.lap('field_decode', decoded_at)
+            timer.count_error('truncated' if isinstance(error, IndexError) else 'field')
+            timer.count_frame(error_msg_type)
+            return _ParsleyParseInternal._frame_error(header, msg_data, f"error: {error}")
+        start = timer.lap('field_decode', decoded_at)
+        timer.count_frame(msg_type)
+
+        if lazy:
+            return LazyParsleyObject(msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, data)
+        # data is only a LazyPayload when lazy
+        if not validate:
+            return ParsleyRecord(msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, data) # pyright: ignore[reportArgumentType]
+        result = ParsleyObject(
+            msg_prio=msg_prio,
+            msg_type=msg_type,
+            board_type_id=board_type_id,
+            board_inst_id=board_inst_id,
+            msg_metadata=msg_metadata,
+            data=data,
+        )
+        timer.lap('validation', start)
+        return result
+
+    @staticmethod
+    def _decode_payload_lazy(msg_data: bytes | list[int], plan: DecodePlan) -> LazyPayload | dict[str, Any]:
+        """ The payload of a LazyParsleyObject: decoded on access where the plan allows it, otherwise now """
+        data = plan.decode_lazy(msg_data)
+        if data is None: # truncated payload or nested fields, decode everything eagerly
+            return _ParsleyParseInternal.decode_payload(msg_data, plan)
+        return data
 
-        # begin parsing
-        bit_str_msg_sid = BitString(msg_sid, MESSAGE_SID.length)
+    @staticmethod
+    def decode_frame(msg_sid: bytes | int, msg_data: bytes | list[int], plan: DecodePlan | None = None, result_cache: 'ResultCache | None' = None) -> ParsleyRecord | ParsleyError:
+        """
+        Decodes one frame into an unvalidated ParsleyRecord without building a ParsleyObject,
+        or returns the ParsleyError parse_to_object() would.
+        plan may be passed in if the caller already resolved it for msg_sid's msg_type.
+        """
+        # validate=False and lazy=False only give ParsleyRecords and ParsleyErrors
+        return _ParsleyParseInternal._parse_frame(msg_sid, msg_data, plan, False, result_cache) # pyright: ignore[reportReturnType]
+
+    @staticmethod
+    def _frame_error(header: 'SidHeader', msg_data: bytes | list[int], error: str) -> ParsleyError:
+        # msg_type is reported in its canlib 12-bit hex form since it may not have decoded
+        return ParsleyError(
+            msg_prio=header.msg_prio,
+            board_type_id=header.board_type_id,
+            board_inst_id=header.board_inst_id,
+            msg_type=header.error_msg_type,
+            msg_metadata=header.msg_metadata,
+            msg_data=pu.hexify(msg_data),
+            error=error
+        )
+
+    @staticmethod
+    def decode_payload(msg_data: bytes | list[int], plan: DecodePlan) -> dict[str, Any]:
+        decoded = plan.decode(msg_data)
+        if decoded is None: # truncated payload or nested fields, take the field-by-field path
+            decoded = _ParsleyParseInternal.parse_fields(BitCursor(msg_data), plan.fields)
+        return decoded
+
+    @staticmethod
+    def decode_sid(msg_sid: int) -> 'SidHeader':
+        """ Decodes the header fields of msg_sid, as cached by SidHeaderCache """
+        sid_bytes, _ = _ParsleyParseInternal.format_can_message(msg_sid, [])
+        bit_str_msg_sid = BitString(sid_bytes, MESSAGE_SID.length)
         encoded_msg_prio = bit_str_msg_sid.pop(MESSAGE_PRIO.length)
         encoded_msg_type = bit_str_msg_sid.pop(MESSAGE_TYPE.length)
         encoded_board_type_id = bit_str_msg_sid.pop(BOARD_TYPE_ID.length)
@@ -157,40 +452,153 @@ class _ParsleyParseInternal:
         board_inst_id = _ParsleyParseInternal.parse_board_inst_id(encoded_board_inst_id)
         msg_prio = _ParsleyParseInternal.parse_msg_prio(encoded_msg_prio)
 
-        msg_type = None
+        msg_type = ''
         msg_metadata: int | str = MESSAGE_METADATA.decode(encoded_msg_metadata)  # numeric default if msg_type decode fails
-        data: dict[str, Any] = {}
-
+        error = None
         try:
             msg_type = MESSAGE_TYPE.decode(encoded_msg_type)
             msg_metadata = _ParsleyParseInternal.parse_msg_metadata(encoded_msg_metadata, msg_type)
-            # we splice the first element since we've already manually parsed BOARD_ID
-            # if BOARD_ID threw an error, we want to try and parse the rest of the CAN message
-            fields = CAN_MESSAGE.get_fields(msg_type)[4:]
-            data = _ParsleyParseInternal.parse_fields(BitString(msg_data), fields)
-        except (ValueError, IndexError, KeyError) as error:
-            # convert the 6-bit msg_type into its canlib 12-bit form and include an error object
-            return ParsleyError(
-                msg_prio=msg_prio,
-                board_type_id=board_type_id,
-                board_inst_id=board_inst_id,
-                msg_type=pu.hexify(encoded_msg_type, is_msg_type=True),
-                msg_metadata=msg_metadata,
-                msg_data=pu.hexify(msg_data),
-                error=f"error: {error}"
-            )
-            
-        return ParsleyObject(
-            msg_prio=msg_prio,
-            msg_type=msg_type,
-            board_type_id=board_type_id,
-            board_inst_id=board_inst_id,
-            msg_metadata=msg_metadata,
-            data=data,
-        )
-        
+        except (ValueError, KeyError) as e:
+            error = f"error: {e}"
+
+        error_msg_type = pu.hexify(encoded_msg_type, is_msg_type=True)
+        return SidHeader(msg_prio, msg_type, board_type_id, board_inst_id, msg_metadata, error_msg_type, error)
+
+class SidHeader(NamedTuple):
+    """ The decoded header fields of one SID """
+    msg_prio: str
+    msg_type: str # empty if it couldn't be decoded
+    board_type_id: str
+    board_inst_id: str
+    msg_metadata: int | str
+    error_msg_type: str # msg_type as reported in a ParsleyError
+    error: str | None   # ParsleyError message if msg_type or its metadata couldn't be decoded
+
+class SidCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class SidHeaderCache:
+    """
+    Bounded cache of SidHeaders by raw SID. A bus only carries a few hundred distinct SIDs, so
+    once warm, decoding a frame's header is a single dict lookup. When full, the oldest entry
+    is evicted.
+
+    Safe to share between threads: hits are plain lookups, and misses fill the cache under a lock.
+    The hit and miss counters are not synchronised, so they may undercount under contention.
+    """
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._headers: dict[int, SidHeader] = {}
+        self._lock = threading.Lock()
+
+    def get(self, msg_sid: int) -> SidHeader:
+        header = self._headers.get(msg_sid)
+        if header is not None:
+            self.hits += 1
+            return header
+
+        self.misses += 1
+        header = _ParsleyParseInternal.decode_sid(msg_sid)
+        if self.maxsize > 0:
+            with self._lock:
+                if msg_sid not in self._headers and len(self._headers) >= self.maxsize:
+                    del self._headers[next(iter(self._headers))]
+                self._headers[msg_sid] = header
+        return header
+
+    def cache_info(self) -> SidCacheInfo:
+        return SidCacheInfo(self.hits, self.misses, self.maxsize, len(self._headers))
+
+    def clear(self):
+        with self._lock:
+            self._headers.clear()
+        self.hits = 0
+        self.misses = 0
+
+SID_CACHE = SidHeaderCache()
+
+class ResultCache:
+    """
+    Opt-in cache of decoded payloads for frames that repeat with only their timestamp changing
+    (eg. GENERAL_BOARD_STATUS, ACTUATOR_STATUS). Entries are keyed on the SID and the payload
+    without its byte-aligned 'time' field; on a hit the other fields are copied from the entry
+    and only `time` is decoded. Message types without such a field are decoded as usual.
+
+    eviction is 'lru' (evict the least recently used entry when full) or 'fifo' (evict the
+    oldest entry, which makes hits slightly cheaper).
+
+    Safe to share between threads like SidHeaderCache: every change to the entries is made under
+    a lock, so only misses and lru hits take it.
+    """
+    def __init__(self, maxsize: int = 1024, eviction: str = 'lru'):
+        if eviction not in ('lru', 'fifo'):
+            raise ValueError(f'Unknown eviction policy "{eviction}", expected "lru" or "fifo"')
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple[int, bytes], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def decode(self, msg_sid: int, msg_data: bytes | list[int], plan: DecodePlan) -> dict[str, Any]:
+        """ Returns the same data as _ParsleyParseInternal.decode_payload(msg_data, plan) """
+        time_bytes, convert_time = plan.time_bytes, plan.convert_time
+        if time_bytes is None or convert_time is None or len(msg_data) * 8 < plan.total_bits:
+            return _ParsleyParseInternal.decode_payload(msg_data, plan)
+
+        start, end = time_bytes
+        key = (msg_sid, bytes(msg_data[:start]) + bytes(msg_data[end:]))
+        entries = self._entries
+        cached = entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            if self.eviction == 'lru':
+                with self._lock:
+                    # another thread may have evicted the entry since the lookup
+                    if entries.pop(key, None) is not None:
+                        entries[key] = cached
+            data = cached.copy()
+            data['time'] = convert_time(int.from_bytes(msg_data[start:end], byteorder='big'))
+            return data
+
+        self.misses += 1
+        data = _ParsleyParseInternal.decode_payload(msg_data, plan)
+        if self.maxsize > 0:
+            with self._lock:
+                if key not in entries and len(entries) >= self.maxsize:
+                    del entries[next(iter(entries))]
+                entries[key] = data.copy()
+        return data
+
+    def cache_info(self) -> SidCacheInfo:
+        return SidCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
 class ParsleyParser(ABC):
-    """ Abstract base for different input-format parsers """
+    """
+    Abstract base for different input-format parsers
+
+    Parsers constructed with validate=False return unvalidated ParsleyRecords instead of ParsleyObjects.
+    Parsers given a ResultCache reuse decoded fields of frames that only differ by their time field.
+    Parsers given a Profiler record per-stage timings and counters into it.
+    Parsers constructed with lazy=True return LazyParsleyObjects, which decode payload fields on access.
+    """
+
+    def __init__(self, validate: bool = True, result_cache: ResultCache | None = None, profiler: Profiler | None = None, lazy: bool = False):
+        self.validate = validate
+        self.result_cache = result_cache
+        self.profiler = profiler
+        self.lazy = lazy
 
     @abstractmethod
     def parse(self, *args, **kwargs):
@@ -199,7 +607,17 @@ class ParsleyParser(ABC):
 class USBDebugParser(ParsleyParser):
     """ Parse ASCII USB-debug lines """
 
-    def parse(self, line: str) -> ParsleyObject | ParsleyError:
+    def parse(self, line: str) -> ParseResult:
+        profiler = self.profiler
+        if profiler is None:
+            msg_sid, msg_data = self._read_line(line)
+        else:
+            profiler.bytes_consumed += len(line)
+            msg_sid, msg_data = profiler.call('framing', self._read_line, line)
+        return _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, self.validate, self.result_cache, profiler, self.lazy)
+
+    @staticmethod
+    def _read_line(line: str) -> tuple[int, list[int]]:
         line = line.strip(' \0\r\n')
         if len(line) == 0 or line[0] != '$':
             raise ValueError('Incorrect line format')
@@ -212,13 +630,102 @@ class USBDebugParser(ParsleyParser):
         else:
             msg_sid_int = int(line, 16)
             msg_data_list = []
+        return msg_sid_int, msg_data_list
+
+    def parse_text(self, text: str | bytes, skip_malformed: bool = False) -> list[ParseResult]:
+        """
+        Parses every `$SID:AA,BB,...` line of text in one batch, giving the same results as
+        calling parse() on each line. Blank lines are ignored.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            msg_sids, msg_datas = self.read_frames(text, skip_malformed)
+        else:
+            profiler.bytes_consumed += len(text)
+            msg_sids, msg_datas = profiler.call('framing', self.read_frames, text, skip_malformed)
+        return _ParsleyParseInternal.parse_many(msg_sids, msg_datas, self.validate, self.result_cache, profiler, self.lazy)
+
+    def parse_file(self, source: str | os.PathLike[str] | IO[Any], skip_malformed: bool = False,
+                   chunk_size: int = 1 << 20) -> Iterator[ParseResult]:
+        """
+        Lazily parses a USB debug capture, reading it chunk_size bytes at a time so captures of
+        any size can be parsed in bounded memory. source is a path or a text or binary file object.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as file:
+                yield from self.parse_file(file, skip_malformed, chunk_size)
+            return
+
+        tail = ''
+        while chunk := source.read(chunk_size):
+            if isinstance(chunk, bytes):
+                chunk = chunk.decode('ascii', errors='replace')
+            chunk = tail + chunk
+            cut = chunk.rfind('\n') + 1
+            tail = chunk[cut:]
+            yield from self.parse_text(chunk[:cut], skip_malformed)
+        yield from self.parse_text(tail, skip_malformed)
+
+    def read_frames(self, text: str | bytes, skip_malformed: bool = False) -> tuple[list[int], list[bytes | list[int]]]:
+        """
+        Splits text into the SIDs and payloads of its lines without decoding them, eg. to feed
+        a ColumnarDecoder. Lines that parse() would reject raise ValueError, or are dropped if
+        skip_malformed is set.
+        """
+        if isinstance(text, bytes):
+            text = text.decode('ascii', errors='replace')
 
-        return _ParsleyParseInternal.parse_to_object(msg_sid_int, msg_data_list)
+        msg_sids: list[int] = []
+        msg_datas: list[bytes | list[int]] = []
+        for line in text.split('\n'):
+            line = line.strip(' \0\r\n')
+            if not line:
+                continue
+            try:
+                if line[0] != '$':
+                    raise ValueError('Incorrect line format')
+                msg_sid, colon, msg_data = line[1:].partition(':')
+                if ':' in msg_data:
+                    raise ValueError('Incorrect line format')
+                msg_sid_int = int(msg_sid, 16)
+                msg_datas.append(self._read_payload(msg_data) if colon else [])
+            except ValueError:
+                if skip_malformed:
+                    continue
+                raise
+            msg_sids.append(msg_sid_int)
+        return msg_sids, msg_datas
+
+    @staticmethod
+    def _read_payload(msg_data: str) -> bytes | list[int]:
+        try:
+            data = bytes.fromhex(msg_data.replace(',', ' '))
+        except ValueError:
+            data = None
+        # only trust fromhex() for the exact `AA,BB,...` layout; anything else (eg. single digit
+        # bytes) is read byte by byte like parse() does
+        n_bytes = len(data) if data is not None else 0
+        if data is None or len(msg_data) != 3 * n_bytes - 1 or msg_data[2::3] != ',' * (n_bytes - 1):
+            return [int(byte, 16) for byte in msg_data.split(',')]
+        return data
 
 class LiveTelemetryParser(ParsleyParser):
     """ Parse binary live-telemetry """
 
-    def parse(self, frame: bytes) -> ParsleyObject | ParsleyError:
+    def parse(self, frame: bytes) -> ParseResult:
+        profiler = self.profiler
+        if profiler is None:
+            msg_sid, crc_data, exp_crc = self._read_frame(frame)
+            self._check_crc(crc_data, exp_crc)
+        else:
+            profiler.bytes_consumed += len(frame)
+            msg_sid, crc_data, exp_crc = profiler.call('framing', self._read_frame, frame)
+            profiler.call('crc', self._check_crc, crc_data, exp_crc)
+        return _ParsleyParseInternal.parse_to_object(msg_sid, list(crc_data[6:]), self.validate, self.result_cache, profiler, self.lazy)
+
+    @staticmethod
+    def _read_frame(frame: bytes) -> tuple[int, bytes, int]:
+        """ Returns the SID, the bytes covered by the CRC and the expected CRC of frame """
         if len(frame) < 7:
             raise ValueError('Incorrect frame length')
         if frame[0] != 0x02:
@@ -229,14 +736,119 @@ class LiveTelemetryParser(ParsleyParser):
         if not 7 <= frame_len <= len(frame):
             raise ValueError('Incorrect frame length')
         msg_sid = int.from_bytes(bytes([frame[2] & 0x1F]) + frame[3:6], byteorder='big')
-        msg_data = frame[6:frame_len-1]
-        exp_crc = frame[frame_len-1]
-        msg_crc = crc8.crc8(frame[:frame_len-1]).digest()[0]
+        return msg_sid, frame[:frame_len-1], frame[frame_len-1]
 
+    @staticmethod
+    def _check_crc(crc_data: bytes, exp_crc: int):
+        msg_crc = crc8(crc_data)
         if msg_crc != exp_crc:
             raise ValueError(f'Bad checksum, expected {exp_crc:02X} but got {msg_crc:02X}')
 
-        return _ParsleyParseInternal.parse_to_object(msg_sid, list(msg_data))
+    @staticmethod
+    def encode_frame(msg_sid: int, msg_data: bytes) -> bytes:
+        """ Builds the frame parse() reads: 0x02, length, SID (4 bytes, top 3 bits clear), data, CRC8 """
+        frame = bytearray(b'\x02\x00') + (msg_sid & 0x1FFF_FFFF).to_bytes(4, byteorder='big') + msg_data
+        frame[1] = len(frame) + 1
+        frame.append(crc8(frame))
+        return bytes(frame)
+
+    def encode(self, item: EncodableResult) -> bytes:
+        """ Encodes one parsed result (see _ParsleyParseInternal.encode_results) as a live-telemetry frame """
+        return self.encode_many([item])
+
+    def encode_many(self, items: Iterable[EncodableResult]) -> bytes:
+        """ Encodes parsed results as back-to-back live-telemetry frames, eg. for radio test vectors """
+        return bytes(_ParsleyParseInternal.encode_many(items if isinstance(items, Sequence) else list(items)))
+
+class LiveTelemetryStream(LiveTelemetryParser):
+    """
+    Incrementally frames and parses a raw live-telemetry byte stream, which may start mid-frame
+    and contain corrupted bytes.
+
+    Bytes passed to feed() are appended to an internal buffer. Complete frames are located by
+    their 0x02 header, then checked against the length byte and CRC8; a candidate that fails
+    either check is skipped one byte at a time until the next header, so scanning never goes
+    back over bytes that were already consumed. Incomplete trailing frames are kept for the
+    next feed().
+    """
+
+    FRAME_HEADER = b'\x02'
+    MIN_FRAME_LEN = 7  # header, length, 4 SID bytes, CRC
+    MAX_FRAME_LEN = 15 # with 8 bytes of CAN payload
+
+    def __init__(self, validate: bool = True, result_cache: ResultCache | None = None, profiler: Profiler | None = None, lazy: bool = False):
+        super().__init__(validate, result_cache, profiler, lazy)
+        self._buffer = bytearray()
+        self.frames = 0        # frames that passed the length and CRC checks
+        self.bytes_dropped = 0 # bytes skipped while resyncing
+
+    @property
+    def pending(self) -> int:
+        """ Number of buffered bytes waiting for the rest of their frame """
+        return len(self._buffer)
+
+    def reset(self):
+        """ Discards any buffered partial frame, eg. after the link reconnects """
+        self.bytes_dropped += len(self._buffer)
+        self._buffer.clear()
+
+    def feed(self, chunk: bytes | bytearray | memoryview) -> list[ParseResult]:
+        """ Buffers chunk and returns the results of every complete frame found so far """
+        profiler = self.profiler
+        check_crc = crc8
+        start_ns = crc_ns = 0
+        if profiler is not None:
+            profiler.bytes_consumed += len(chunk)
+            start_ns = perf_counter_ns()
+            crc_ns = profiler.stage_ns['crc']
+            check_crc = profiler.timed('crc', crc8)
+
+        buf = self._buffer
+        buf += chunk
+        end = len(buf)
+        frames = []
+        pos = 0
+
+        while True:
+            start = buf.find(self.FRAME_HEADER, pos)
+            if start < 0:
+                self.bytes_dropped += end - pos
+                pos = end
+                break
+            self.bytes_dropped += start - pos
+            pos = start
+            if end - start < 2:
+                break
+
+            frame_len = buf[start + 1]
+            if not self.MIN_FRAME_LEN <= frame_len <= self.MAX_FRAME_LEN:
+                if profiler is not None:
+                    profiler.count_error('framing')
+                self.bytes_dropped += 1
+                pos = start + 1
+                continue
+            if end - start < frame_len:
+                break
+
+            crc_at = start + frame_len - 1
+            if check_crc(buf[start:crc_at]) != buf[crc_at]:
+                if profiler is not None:
+                    profiler.count_error('crc')
+                self.bytes_dropped += 1
+                pos = start + 1
+                continue
+
+            msg_sid = (buf[start + 2] & 0x1F) << 24 | buf[start + 3] << 16 | buf[start + 4] << 8 | buf[start + 5]
+            frames.append((msg_sid, list(buf[start + 6:crc_at])))
+            self.frames += 1
+            pos = start + frame_len
+
+        # deleting a bytearray's prefix just moves its start, so this stays amortized O(1)
+        del buf[:pos]
+        if profiler is not None:
+            # crc checks were timed separately
+            profiler.add('framing', perf_counter_ns() - start_ns - (profiler.stage_ns['crc'] - crc_ns))
+        return [_ParsleyParseInternal.parse_to_object(msg_sid, msg_data, self.validate, self.result_cache, profiler, self.lazy) for msg_sid, msg_data in frames]
 
 class LoggerParser(ParsleyParser):
     """ Parses logger pages and yields `ParsleyObject` items """
@@ -259,8 +871,160 @@ class LoggerParser(ParsleyParser):
     HEADER_FMT = '<IIB'                      # SID(uint32 LE), timestamp(uint32 LE), DLC(uint8)
     HEADER_LEN = struct.calcsize(HEADER_FMT) # == 9
     PARSE_LOGGER_PAGE_SIZE = 4096
+    LOG_TIMESTAMP_SCALE = 1/1000             # record timestamps count milliseconds
+    TIME_WRAP = (1 << TIMESTAMP_2.length) * TIMESTAMP_2.scale # seconds before a message's 16-bit time wraps
 
-    def parse(self, buf: bytes, page_number: int) -> ParsleyObject | ParsleyError:
+    def parse(self, buf: bytes, page_number: int) -> Iterator[ParseResult]:
+        profiler = self.profiler
+        records = self._iter_records(buf, page_number)
+        if profiler is not None:
+            profiler.bytes_consumed += len(buf)
+            records = profiler.timed_iter('framing', records)
+        for sid, log_timestamp, data in records:
+            result = _ParsleyParseInternal.parse_to_object(sid, data, self.validate, self.result_cache, profiler, self.lazy)
+            yield self.add_log_timestamp(result, log_timestamp)
+
+    def parse_many(self, bufs: Iterable[bytes], page_number: int = 0) -> list[ParseResult]:
+        """
+        Parses consecutive logger pages (the first one being page_number) in one batch and
+        returns every record's result in log order.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            msg_sids, msg_datas, log_timestamps = self.read_frames(bufs, page_number)
+        else:
+            bufs = list(bufs)
+            profiler.bytes_consumed += sum(len(buf) for buf in bufs)
+            msg_sids, msg_datas, log_timestamps = profiler.call('framing', self.read_frames, bufs, page_number)
+        results = _ParsleyParseInternal.parse_many(msg_sids, msg_datas, self.validate, self.result_cache, profiler, self.lazy)
+        return [self.add_log_timestamp(result, log_timestamp) for result, log_timestamp in zip(results, log_timestamps)]
+
+    def read_frames(self, bufs: Iterable[bytes], page_number: int = 0) -> tuple[list[int], list[bytes], list[int]]:
+        """
+        Validates consecutive logger pages (the first one being page_number) and returns the SIDs,
+        payloads and record timestamps of their records without decoding them.
+        """
+        msg_sids: list[int] = []
+        msg_datas: list[bytes] = []
+        log_timestamps: list[int] = []
+        for page_offset, buf in enumerate(bufs):
+            for sid, log_timestamp, data in self._iter_records(buf, page_number + page_offset):
+                msg_sids.append(sid)
+                msg_datas.append(data)
+                log_timestamps.append(log_timestamp)
+        return msg_sids, msg_datas, log_timestamps
+
+    @classmethod
+    def monotonic_time(cls, time: float | None, log_timestamp: int) -> float:
+        """
+        Reconstructs a non-wrapping time in seconds for a logged message. Its 16-bit `time` field
+        wraps every TIME_WRAP seconds, so the logger's 32-bit record timestamp is used to pick the
+        wrap count that lands closest to it. Messages without a `time` field use the record
+        timestamp directly.
+
+        Each message is unwrapped on its own, so results don't depend on which pages are decoded
+        together (eg. by parallel.parse_dump). This only works while the sending board's clock
+        and the logger's agree to within half a wrap (TIME_WRAP / 2, about 32.8 s); a board
+        further ahead or behind than that is placed a whole wrap off.
+        """
+        log_time = log_timestamp * cls.LOG_TIMESTAMP_SCALE
+        if time is None:
+            return log_time
+        return time + cls.TIME_WRAP * max(0, round((log_time - time) / cls.TIME_WRAP))
+
+    def add_log_timestamp(self, result: ResultT, log_timestamp: int) -> ResultT:
+        """ Fills in result's log_timestamp and monotonic_time from its record timestamp """
+        time = None
+        if not isinstance(result, ParsleyError):
+            time = result.data.get('time')
+            if not isinstance(time, (int, float)):
+                time = None
+        monotonic_time = self.monotonic_time(time, log_timestamp)
+
+        if isinstance(result, ParsleyRecord):
+            return result._replace(log_timestamp=log_timestamp, monotonic_time=monotonic_time)
+        result.log_timestamp = log_timestamp
+        result.monotonic_time = monotonic_time
+        return result
+
+    def parse_dump(self, source: str | os.PathLike[str] | BinaryIO, page_number: int = 0) -> Iterator[ParseResult]:
+        """
+        Lazily parses a whole logger dump (eg. an SD card or flash image) page by page, starting
+        from page_number and incrementing it for each following page.
+
+        source is a path or a binary file object. Files are memory-mapped when possible, so only
+        the page being parsed is held in memory regardless of the dump's size.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as file:
+                yield from self.parse_dump(file, page_number)
+            return
+
+        for page_offset, buf in enumerate(self.iter_pages(source)):
+            yield from self.parse(buf, page_number + page_offset)
+
+    def iter_pages(self, file: BinaryIO) -> Iterator[bytes]:
+        """ Yields the pages of a binary file object from its current position onwards """
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            # not backed by a mappable (non-empty) file, eg. BytesIO or a pipe, so read it instead
+            while buf := file.read(self.PARSE_LOGGER_PAGE_SIZE):
+                yield buf
+            return
+
+        with mapped:
+            for start in range(file.tell(), len(mapped), self.PARSE_LOGGER_PAGE_SIZE):
+                yield mapped[start:start + self.PARSE_LOGGER_PAGE_SIZE]
+
+    def encode_pages(self, items: Iterable[EncodableResult], page_number: int = 0) -> Iterator[bytes]:
+        """
+        Packs parsed results (see _ParsleyParseInternal.encode_results) into consecutive logger
+        pages starting at page_number, filling each page with as many records as parse() will read
+        back and padding the rest with 0xFF. Record timestamps are the items' log_timestamps, or 0.
+        """
+        return self.pack_pages(_ParsleyParseInternal.encode_results(items), page_number)
+
+    def pack_pages(self, records: Iterable[tuple[int, bytes, int | None]], page_number: int = 0) -> Iterator[bytes]:
+        """ Same as encode_pages(), but takes already encoded (msg_sid, msg_data, log_timestamp) records """
+        page_size = self.PARSE_LOGGER_PAGE_SIZE
+        header_len = self.HEADER_LEN
+        pack_into = struct.Struct(self.HEADER_FMT).pack_into
+        blank_page = self.LOG_MAGIC + b'\x00' + b'\xFF' * (page_size - len(self.LOG_MAGIC) - 1)
+
+        page = None
+        offset = 0
+        for msg_sid, msg_data, log_timestamp in records:
+            dlc = len(msg_data)
+            # parse() stops once a header would leave no room for data, so the record must fit before that
+            if page is None or offset + header_len + dlc > page_size or page_size - offset <= header_len:
+                if page is not None:
+                    yield bytes(page)
+                    page_number += 1
+                page = bytearray(blank_page)
+                page[3] = page_number % 256
+                offset = 4
+            pack_into(page, offset, msg_sid, (log_timestamp or 0) & 0xFFFF_FFFF, dlc)
+            offset += header_len
+            page[offset:offset + dlc] = msg_data
+            offset += dlc
+        if page is not None:
+            yield bytes(page)
+
+    def write_dump(self, items: Iterable[EncodableResult], target: str | os.PathLike[str] | BinaryIO, page_number: int = 0) -> int:
+        """ Writes encode_pages(items, page_number) to a path or binary file object and returns the number of pages written """
+        if isinstance(target, (str, os.PathLike)):
+            with open(target, 'wb') as file:
+                return self.write_dump(items, file, page_number)
+
+        page_count = 0
+        for page in self.encode_pages(items, page_number):
+            target.write(page)
+            page_count += 1
+        return page_count
+
+    def _iter_records(self, buf: bytes, page_number: int) -> Iterator[tuple[int, int, bytes]]:
+        """ Validates one logger page and yields the raw (sid, timestamp, data) of each record in it """
         # Strip the buffer to 4096 bytes, as required by the logger.
         if len(buf) != self.PARSE_LOGGER_PAGE_SIZE:
             raise ValueError('Logger message must be exactly 4096 bytes')
@@ -274,7 +1038,7 @@ class LoggerParser(ParsleyParser):
         offset = 4 # start of the header
         
         while (self.PARSE_LOGGER_PAGE_SIZE - offset > self.HEADER_LEN): # at least one message
-            sid, _, dlc = struct.unpack_from(self.HEADER_FMT, buf, offset)
+            sid, timestamp, dlc = struct.unpack_from(self.HEADER_FMT, buf, offset)
 
             if sid & 0xE000_0000:
                 break
@@ -283,15 +1047,25 @@ class LoggerParser(ParsleyParser):
                 raise ValueError(f'DLC out of range (0-8), got {dlc}')
 
             offset += self.HEADER_LEN
-            data_list: list[int] = list(buf[offset: offset + dlc])
+            data = bytes(buf[offset: offset + dlc])
             offset += dlc
 
-            yield _ParsleyParseInternal.parse_to_object(sid, data_list)
+            yield sid, timestamp, data
             
 class BitstringParser(ParsleyParser):
     ''' Parse BitString objects '''
 
-    def parse(self, bit_str: BitString) -> ParsleyObject | ParsleyError:
+    def parse(self, bit_str: BitString) -> ParseResult:
+        profiler = self.profiler
+        if profiler is None:
+            msg_sid, msg_data = self._read_bit_string(bit_str)
+        else:
+            profiler.bytes_consumed += (bit_str.length + 7) // 8
+            msg_sid, msg_data = profiler.call('framing', self._read_bit_string, bit_str)
+        return _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, self.validate, self.result_cache, profiler, self.lazy)
+
+    @staticmethod
+    def _read_bit_string(bit_str: BitString) -> tuple[int, list[int]]:
         msg_sid = int.from_bytes(bit_str.pop(MESSAGE_SID.length), byteorder='big')
         msg_data = [byte for byte in bit_str.pop(bit_str.length)]
-        return _ParsleyParseInternal.parse_to_object(msg_sid, msg_data)
+        return msg_sid, msg_data
@@ -41,7 +41,8 @@ def parse(msg_sid: bytes, msg_data: bytes) -> dict:
             }
         }
     else:
-        return result.model_dump(mode='json')
+        # validate=True, so this is a ParsleyObject
+        return result.model_dump(mode='json') # pyright: ignore[reportAttributeAccessIssue]
 
 @deprecated(version='2026.2', reason="Deprecated; use BitstringParser.parse in the new BitstringParser object")
 def parse_bitstring(bit_str: BitString) -> tuple[bytes, bytes]:
@@ -1,6 +1,6 @@
-from dataclasses import dataclass, asdict
-from typing import Generic, TypeVar
-from pydantic import BaseModel, field_validator, model_validator
+from dataclasses import dataclass, field, fields
+from typing import Any, Generic, Mapping, NamedTuple, TypeVar
+from pydantic import BaseModel, Field, field_validator, model_validator
 import parsley.message_types as mt
 from parsley.message_definitions import CAN_MESSAGE
 from parsley.fields import Enum as _Enum
@@ -13,6 +13,24 @@ MsgPrio = str
 MsgType = str
 MsgMetadata = int | str
 
+# subscriptable keys of each result class, in model_dump()/asdict() order
+_RESULT_KEYS: dict[type, dict[str, None]] = {}
+
+_PLAIN_VALUES = frozenset({str, int, float, bool, dict, type(None)})
+
+# ParsleyError fields only set for frames read from a logger dump, kept out of its dumps and keys
+_LOG_FIELDS = frozenset({'log_timestamp', 'monotonic_time'})
+
+def _result_keys(cls: type) -> dict[str, None]:
+    keys = _RESULT_KEYS.get(cls)
+    if keys is None:
+        if issubclass(cls, BaseModel):
+            keys = dict.fromkeys(name for name, field in cls.model_fields.items() if not field.exclude)
+        else:
+            keys = dict.fromkeys(field.name for field in fields(cls) if field.name not in _LOG_FIELDS)
+        _RESULT_KEYS[cls] = keys
+    return keys
+
 @dataclass
 class ParsleyError():
     """Custom error container for Parsley errors."""
@@ -23,9 +41,24 @@ class ParsleyError():
     msg_metadata: MsgMetadata
     msg_data: str
     error: str
+    # only set for frames read from a logger dump (see LoggerParser). Like ParsleyObject's excluded
+    # fields, they're left out of repr(), ==, asdict() and subscripting
+    log_timestamp: int | None = field(default=None, repr=False, compare=False)
+    monotonic_time: float | None = field(default=None, repr=False, compare=False)
 
     def __getitem__(self, key: str):
-        return asdict(self)[key]
+        # same as self.asdict()[key] since every field is immutable, without copying the others
+        if key not in (_RESULT_KEYS.get(type(self)) or _result_keys(type(self))):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def asdict(self) -> dict[str, Any]:
+        """ dataclasses.asdict(self) without the logger fields, as model_dump() is for ParsleyObjects """
+        return {key: getattr(self, key) for key in (_RESULT_KEYS.get(type(self)) or _result_keys(type(self)))}
+
+    def as_mapping(self) -> 'ResultView':
+        """ Read-only view of this error's fields, for code that wants a Mapping """
+        return ResultView(self)
     
 class ParsleyObject(BaseModel, Generic[T]):
     """
@@ -38,6 +71,10 @@ class ParsleyObject(BaseModel, Generic[T]):
     msg_type: MsgType
     msg_metadata: MsgMetadata
     data: T # ParsleyDataType
+    # only set for frames read from a logger dump (see LoggerParser), and left out of
+    # model_dump() so dumps from every other source are unchanged
+    log_timestamp: int | None = Field(default=None, exclude=True)
+    monotonic_time: float | None = Field(default=None, exclude=True)
 
     @field_validator("msg_prio")
     def validate_msg_prio(cls, value):
@@ -83,4 +120,144 @@ class ParsleyObject(BaseModel, Generic[T]):
         return self
 
     def __getitem__(self, key: str):
-        return self.model_dump()[key]
+        # the keys and values of model_dump()[key] without dumping every field
+        if key not in (_RESULT_KEYS.get(type(self)) or _result_keys(type(self))):
+            raise KeyError(key)
+        value = getattr(self, key)
+        if type(value) is dict:
+            # model_dump() hands out a copy, so mutating it never changes the parsed object
+            return dict(value)
+        # isinstance() against BaseModel is slow, so skip it for the types our decoders produce
+        if type(value) not in _PLAIN_VALUES and isinstance(value, BaseModel): # model_dump() would have turned it into a dict
+            return self.model_dump()[key]
+        return value
+
+    def as_mapping(self) -> 'ResultView':
+        """ Read-only view of the keys model_dump() would give, for code that wants a Mapping """
+        return ResultView(self)
+
+
+class ParsleyRecord(NamedTuple):
+    """
+    Lightweight parse result returned when validation is turned off (eg. parse_to_object(..., validate=False)).
+
+    The values come straight from our own decoders, so none of ParsleyObject's validators are run.
+    Supports the same string subscripting as ParsleyObject; use to_object() to get a ParsleyObject.
+    """
+    msg_prio: MsgPrio
+    msg_type: MsgType
+    board_type_id: BoardTypeID
+    board_inst_id: BoardInstID
+    msg_metadata: MsgMetadata
+    data: dict[str, Any]
+    # only set for frames read from a logger dump, see LoggerParser
+    log_timestamp: int | None = None
+    monotonic_time: float | None = None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def to_object(self) -> ParsleyObject[Any]:
+        # an unknown msg_prio is the only thing our decoders can produce that ParsleyObject rejects,
+        # so only that case goes through full validation (and raises the same ValidationError)
+        if self.msg_prio not in mt.msg_prio:
+            return ParsleyObject(**self._asdict())
+        return ParsleyObject.model_construct(**self._asdict())
+
+
+class LazyParsleyObject:
+    """
+    Parse result returned when lazy decoding is turned on (eg. parse_to_object(..., lazy=True)).
+
+    The header fields are decoded up front, but `data` is a read-only mapping (usually a
+    LazyPayload) that decodes each payload field the first time it's accessed. Fields that can
+    fail to decode are still checked while parsing, so frames that give a ParsleyError eagerly
+    give the same ParsleyError here.
+
+    Subscripting and model_dump() behave like ParsleyObject's, except that obj['data'] is the
+    lazy mapping itself rather than a copy; use to_object() to get a ParsleyObject.
+    """
+    __slots__ = ('msg_prio', 'msg_type', 'board_type_id', 'board_inst_id', 'msg_metadata', 'data', 'log_timestamp', 'monotonic_time')
+    # keys of ParsleyObject.model_dump(), in its order
+    DUMP_KEYS = ('board_type_id', 'board_inst_id', 'msg_prio', 'msg_type', 'msg_metadata', 'data')
+
+    def __init__(self, msg_prio: MsgPrio, msg_type: MsgType, board_type_id: BoardTypeID, board_inst_id: BoardInstID,
+                 msg_metadata: MsgMetadata, data: Mapping[str, Any], log_timestamp: int | None = None, monotonic_time: float | None = None):
+        self.msg_prio = msg_prio
+        self.msg_type = msg_type
+        self.board_type_id = board_type_id
+        self.board_inst_id = board_inst_id
+        self.msg_metadata = msg_metadata
+        self.data = data
+        # only set for frames read from a logger dump, see LoggerParser
+        self.log_timestamp = log_timestamp
+        self.monotonic_time = monotonic_time
+
+    def __getitem__(self, key: str):
+        if key not in self.DUMP_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def model_dump(self, **kwargs) -> dict[str, Any]:
+        """ Same as to_object().model_dump(**kwargs), which decodes every field """
+        if kwargs:
+            return self.to_object().model_dump(**kwargs)
+        res = {key: getattr(self, key) for key in self.DUMP_KEYS}
+        res['data'] = dict(self.data)
+        return res
+
+    def to_object(self) -> ParsleyObject[Any]:
+        # header fields come from our own decoders and were checked like ParsleyRecord.to_object() does
+        return ParsleyObject.model_construct(
+            msg_prio=self.msg_prio,
+            msg_type=self.msg_type,
+            board_type_id=self.board_type_id,
+            board_inst_id=self.board_inst_id,
+            msg_metadata=self.msg_metadata,
+            data=dict(self.data),
+            log_timestamp=self.log_timestamp,
+            monotonic_time=self.monotonic_time,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LazyParsleyObject):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'LazyParsleyObject({fields})'
+
+# anything a parser can return for one frame, depending on its validate/lazy options
+ParseResult = ParsleyObject[Any] | ParsleyRecord | LazyParsleyObject | ParsleyError
+
+class ResultView(Mapping[str, Any]):
+    """
+    Read-only Mapping over a ParsleyObject's or ParsleyError's subscriptable keys, in
+    model_dump()/asdict() order. Values are read from the result on access, so the view never
+    goes stale and costs nothing to create; the key layout is computed once per result class.
+    """
+    __slots__ = ('_result', '_keys')
+
+    def __init__(self, result: ParsleyObject[Any] | ParsleyError):
+        self._result = result
+        self._keys = _result_keys(type(result))
+
+    def __getitem__(self, key: str) -> Any:
+        return self._result[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f'ResultView({dict(self)!r})'
@@ -0,0 +1,136 @@
+'''
+Opt-in per-stage timings and counters for the parsing pipeline
+
+Pass a Profiler to a ParsleyParser (or to parse_to_object()/parse_many()) to record where the time
+goes and what was parsed. Without one, frames are timed by NULL_PROFILER, whose methods do nothing.
+
+Stages:
+    framing       splitting wire input (USB lines, telemetry frames, logger pages) into SIDs and payloads
+    crc           live-telemetry CRC8 checks
+    sid_decode    decoding SIDs into their header fields
+    field_decode  decoding payload fields
+    validation    building pydantic ParsleyObjects
+    formatting    rendering results as text, for callers that wrap their formatter with timed()
+'''
+from collections import Counter
+from time import perf_counter_ns
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+T = TypeVar('T')
+
+STAGES = ('framing', 'crc', 'sid_decode', 'field_decode', 'validation', 'formatting')
+
+class StageStats(NamedTuple):
+    calls: int
+    total_ns: int
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+class Profiler:
+    """
+    In-process registry of per-stage timings (calls and total nanoseconds), frames by msg_type,
+    errors by kind and bytes consumed.
+
+    Error kinds are the stage a frame was rejected in ('framing', 'crc') for parser errors that
+    raise, and 'msg_type' (SID didn't decode), 'truncated' (payload too short) or 'field' (a field
+    value didn't decode) for frames returned as ParsleyErrors.
+    """
+    def __init__(self):
+        self.stage_calls: dict[str, int] = dict.fromkeys(STAGES, 0)
+        self.stage_ns: dict[str, int] = dict.fromkeys(STAGES, 0)
+        self.frames_by_type: Counter[str] = Counter()
+        self.errors_by_kind: Counter[str] = Counter()
+        self.bytes_consumed = 0
+
+    def add(self, stage: str, elapsed_ns: int, calls: int = 1):
+        self.stage_calls[stage] = self.stage_calls.get(stage, 0) + calls
+        self.stage_ns[stage] = self.stage_ns.get(stage, 0) + elapsed_ns
+
+    @staticmethod
+    def clock() -> int:
+        return perf_counter_ns()
+
+    def lap(self, stage: str, start_ns: int) -> int:
+        """ Adds the time since start_ns to stage and returns the current clock(), to time the next stage from """
+        now = perf_counter_ns()
+        self.add(stage, now - start_ns)
+        return now
+
+    def count_frame(self, msg_type: str):
+        self.frames_by_type[msg_type] += 1
+
+    def count_error(self, kind: str):
+        self.errors_by_kind[kind] += 1
+
+    def call(self, stage: str, func: Callable[..., T], *args: Any) -> T:
+        """ Returns func(*args), timed as stage. A ValueError it raises is counted as a stage error. """
+        start = perf_counter_ns()
+        try:
+            return func(*args)
+        except ValueError:
+            self.errors_by_kind[stage] += 1
+            raise
+        finally:
+            self.add(stage, perf_counter_ns() - start)
+
+    def timed(self, stage: str, func: Callable[..., T]) -> Callable[..., T]:
+        """ Wraps func so every call is timed as stage, eg. timed('formatting', format_line) """
+        def wrapper(*args: Any) -> T:
+            return self.call(stage, func, *args)
+        return wrapper
+
+    def timed_iter(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        """ Yields items, timing each step of the underlying iterator as stage """
+        iterator = iter(items)
+        while True:
+            try:
+                item = self.call(stage, iterator.__next__)
+            except StopIteration:
+                return
+            yield item
+
+    def stages(self) -> dict[str, StageStats]:
+        return {stage: StageStats(self.stage_calls[stage], self.stage_ns[stage]) for stage in self.stage_calls}
+
+    def report(self) -> str:
+        """ Human readable summary of every counter """
+        lines = [f'{"stage":<14} {"calls":>10} {"total ms":>10} {"mean ns":>9}']
+        for stage, stats in self.stages().items():
+            lines.append(f'{stage:<14} {stats.calls:>10} {stats.total_ns / 1e6:>10.3f} {stats.mean_ns:>9.0f}')
+        lines.append(f'bytes consumed: {self.bytes_consumed}')
+        lines.append(f'frames: {sum(self.frames_by_type.values())}')
+        for msg_type, count in self.frames_by_type.most_common():
+            lines.append(f'  {msg_type:<30} {count:>10}')
+        lines.append(f'errors: {sum(self.errors_by_kind.values())}')
+        for kind, count in self.errors_by_kind.most_common():
+            lines.append(f'  {kind:<30} {count:>10}')
+        return '\n'.join(lines)
+
+    def reset(self):
+        self.stage_calls = dict.fromkeys(STAGES, 0)
+        self.stage_ns = dict.fromkeys(STAGES, 0)
+        self.frames_by_type.clear()
+        self.errors_by_kind.clear()
+        self.bytes_consumed = 0
+
+class NullProfiler(Profiler):
+    """ Profiler that records nothing, used by the pipeline when no Profiler is given """
+    @staticmethod
+    def clock() -> int:
+        return 0
+
+    def add(self, stage: str, elapsed_ns: int, calls: int = 1):
+        pass
+
+    def lap(self, stage: str, start_ns: int) -> int:
+        return 0
+
+    def count_frame(self, msg_type: str):
+        pass
+
+    def count_error(self, kind: str):
+        pass
+
+NULL_PROFILER = NullProfiler()
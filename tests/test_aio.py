@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+
+from parsley.aio import iter_usb_debug, iter_live_telemetry
+from parsley.parse_to_object import USBDebugParser, LiveTelemetryParser, LiveTelemetryStream
+
+import utils as utilities
+
+def make_reader(*chunks):
+    reader = asyncio.StreamReader()
+    for chunk in chunks:
+        reader.feed_data(chunk)
+    reader.feed_eof()
+    return reader
+
+async def collect(results):
+    return [result async for result in results]
+
+async def collect_usb_debug(data, **kwargs):
+    return await collect(iter_usb_debug(make_reader(data), **kwargs))
+
+ANALOG_SID = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '3', 'POWER', 'ROCKET'), 'big')
+
+class TestAio:
+    def test_usb_debug(self):
+        lines = [f'${ANALOG_SID:X}:03,E8,0C,E4', f'${ANALOG_SID:X}:00,01,00,02', '$1234:AB']
+        data = '\r\n'.join(lines).encode() + b'\r\n\r\n'
+        assert asyncio.run(collect_usb_debug(data)) == [USBDebugParser().parse(line) for line in lines]
+
+    def test_usb_debug_malformed(self):
+        data = f'booting...\n${ANALOG_SID:X}:03,E8,0C,E4\n'.encode()
+        with pytest.raises(ValueError):
+            asyncio.run(collect_usb_debug(data))
+        results = asyncio.run(collect_usb_debug(data, skip_malformed=True))
+        assert len(results) == 1
+        assert results[0].data == {'time': 1.0, 'value': 3300}
+
+    def test_usb_debug_long_lines(self):
+        line = f'${ANALOG_SID:X}:03,E8,0C,E4\n'.encode()
+        long_line = b'x' * 300
+        # the first long line arrives in pieces, so it overruns the limit before its newline is read
+        chunks = [long_line, long_line, b'\n' + line + long_line + b'\n' + line, long_line]
+
+        async def run(**kwargs):
+            reader = asyncio.StreamReader(limit=64)
+            async def feed():
+                for chunk in chunks:
+                    reader.feed_data(chunk)
+                    await asyncio.sleep(0)
+                reader.feed_eof()
+            results, _ = await asyncio.gather(collect(iter_usb_debug(reader, **kwargs)), feed())
+            return results
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+        assert asyncio.run(run(skip_malformed=True)) == [USBDebugParser().parse(line.decode())] * 2
+
+    def test_live_telemetry(self):
+        frames = [
+            utilities.make_live_telemetry_frame(ANALOG_SID, b'\x03\xE8\x0C\xE4'),
+            utilities.make_live_telemetry_frame(0x1234, b'\xAB'),
+        ]
+        data = b'\x00' + b''.join(frames)
+        async def run():
+            stream = LiveTelemetryStream()
+            results = await collect(iter_live_telemetry(make_reader(data[:5], data[5:]), stream, chunk_size=4))
+            return results, stream
+        results, stream = asyncio.run(run())
+        assert results == [LiveTelemetryParser().parse(frame) for frame in frames]
+        assert stream.bytes_dropped == 1
+
+    def test_live_telemetry_backpressure(self):
+        frame = utilities.make_live_telemetry_frame(ANALOG_SID, b'\x03\xE8\x0C\xE4')
+        async def run():
+            reader = make_reader(frame * 3)
+            results = iter_live_telemetry(reader, chunk_size=len(frame))
+            await results.__anext__()
+            unread = len(reader._buffer)
+            await results.aclose()
+            return unread
+        # only the bytes of the frames asked for have been read
+        assert asyncio.run(run()) == 2 * len(frame)
@@ -0,0 +1,149 @@
+import io
+import json
+import random
+from array import array
+
+import pytest
+
+from parsley.archive import ArchiveReader, ArchiveWriter, definitions_hash, write_archive
+from parsley.columnar import CodeColumn
+from parsley.fields import Numeric
+from parsley.message_definitions import MESSAGES
+from parsley.parse_to_object import _ParsleyParseInternal, LoggerParser
+from parsley.parsley_message import ParsleyError, ParsleyObject
+
+import utils as utilities
+
+def random_frames(count: int, seed: int = 0) -> list[tuple[int, bytes]]:
+    rng = random.Random(seed)
+    return [(rng.getrandbits(29), bytes(rng.getrandbits(8) for _ in range(8))) for _ in range(count)]
+
+def analog_frames(count: int) -> list[tuple[int, bytes]]:
+    # one board reporting a channel every 10 ms
+    msg_sid = utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '13', 'POWER', 'ROCKET')
+    return [(msg_sid, (10 * i).to_bytes(2, 'big') + i.to_bytes(2, 'big')) for i in range(count)]
+
+def by_chunk_key(results) -> dict[tuple, list]:
+    grouped = {}
+    for result in results:
+        grouped.setdefault((result.msg_type, result.board_type_id, result.board_inst_id), []).append(result)
+    return grouped
+
+class TestArchive:
+    def test_round_trip(self, tmp_path):
+        frames = random_frames(3000)
+        results = [_ParsleyParseInternal.parse_to_object(*frame) for frame in frames]
+        objects = [result for result in results if isinstance(result, ParsleyObject)]
+        assert objects
+
+        path = tmp_path / 'flight.parsley'
+        with ArchiveWriter(path, chunk_rows=3) as writer:
+            writer.feed_many([msg_sid for msg_sid, _ in frames], [msg_data for _, msg_data in frames])
+        assert writer.errors == len(results) - len(objects)
+
+        with ArchiveReader(path) as reader:
+            assert len(reader) == len(objects)
+            assert reader.errors == writer.errors
+            assert reader.chunks == writer.chunks
+            assert all(chunk.count <= 3 for chunk in reader.chunks)
+            # rows keep their order within a chunk key
+            assert by_chunk_key(reader.iter_records(validate=True)) == by_chunk_key(objects)
+
+    def test_write_results(self):
+        results = [_ParsleyParseInternal.parse_to_object(*frame, lazy=True) for frame in random_frames(500, seed=1)]
+        file = io.BytesIO()
+        chunks = write_archive(results, file)
+        assert sum(chunk.count for chunk in chunks) == sum(not isinstance(result, ParsleyError) for result in results)
+
+        with pytest.raises(ValueError):
+            ArchiveWriter(io.BytesIO()).write({'msg_type': 'LEDS_ON'})
+        with pytest.raises(ValueError):
+            ArchiveWriter(io.BytesIO(), chunk_rows=0)
+
+    def test_columns(self, tmp_path):
+        frames = analog_frames(100)
+        path = tmp_path / 'analog.parsley'
+        with ArchiveWriter(path, chunk_rows=40) as writer:
+            for frame in frames:
+                writer.feed(*frame)
+
+        with ArchiveReader(path) as reader:
+            assert [(chunk.count, chunk.start, chunk.end) for chunk in reader.chunks] == [(40, 0.0, 0.39), (40, 0.4, 0.79), (20, 0.8, 0.99)]
+            chunk = reader.chunks[1]
+            assert chunk.board_type_id == 'POWER' and chunk.board_inst_id == 'ROCKET'
+            assert set(chunk.columns) == {'msg_prio', 'msg_metadata', 'time', 'value'}
+
+            value = reader.read_column(chunk, 'value')
+            assert value == array('q', range(40, 80))
+            metadata = reader.read_column(chunk, 'msg_metadata')
+            assert isinstance(metadata, CodeColumn) and set(metadata.to_list()) == {'SENSOR_PT_CHANNEL_1'}
+
+            batch = reader.read_chunk(chunk)
+            assert len(batch) == 40
+            assert batch.column_values('board_type_id') == ['POWER'] * 40
+            assert batch.column_values('value') == list(range(40, 80))
+
+    def test_find(self, tmp_path):
+        frames = analog_frames(100) + random_frames(500)
+        path = tmp_path / 'mixed.parsley'
+        with ArchiveWriter(path, chunk_rows=40) as writer:
+            writer.feed_many([msg_sid for msg_sid, _ in frames], [msg_data for _, msg_data in frames])
+
+        with ArchiveReader(path) as reader:
+            assert reader.find() == reader.chunks
+            analog = reader.find('SENSOR_ANALOG16', 'POWER', 'ROCKET')
+            assert sum(chunk.count for chunk in analog) >= 100
+            assert all(chunk.msg_type == 'SENSOR_ANALOG16' for chunk in analog)
+            assert all(chunk.start is not None and chunk.end >= 0.45 and chunk.start <= 0.5 for chunk in reader.find(start=0.45, end=0.5))
+
+            records = list(reader.iter_records('SENSOR_ANALOG16', 'POWER', 'ROCKET', start=0.45, end=0.5))
+            assert records and all(0.45 <= record.data['time'] <= 0.5 for record in records)
+            assert {record.data['value'] for record in records} >= {45, 46, 47, 48, 49, 50}
+
+    def test_log_fields(self, tmp_path):
+        frames = analog_frames(6)
+        page = utilities.make_logger_page(0, [(int.from_bytes(msg_sid, 'big'), 1000 * i, msg_data) for i, (msg_sid, msg_data) in enumerate(frames)])
+        logged = list(LoggerParser().parse(page, 0))
+        unlogged = [_ParsleyParseInternal.parse_to_object(*frame) for frame in frames]
+
+        path = tmp_path / 'logged.parsley'
+        write_archive(logged[:3] + unlogged + logged[3:], path)
+        with ArchiveReader(path) as reader:
+            # switching between logged and unlogged frames starts a new chunk
+            assert [chunk.count for chunk in reader.chunks] == [3, 6, 3]
+            assert 'monotonic_time' in reader.chunks[0].columns and 'monotonic_time' not in reader.chunks[1].columns
+            assert (reader.chunks[0].start, reader.chunks[0].end) == (logged[0].monotonic_time, logged[2].monotonic_time)
+            assert list(reader.iter_records(validate=True)) == logged[:3] + unlogged + logged[3:]
+
+    def test_definitions_hash(self, tmp_path):
+        assert definitions_hash() == definitions_hash(MESSAGES)
+        changed = dict(MESSAGES, SENSOR_ANALOG16=MESSAGES['SENSOR_ANALOG16'][:-1] + [Numeric('value', 16, signed=True)])
+        assert definitions_hash(changed) != definitions_hash()
+
+        path = tmp_path / 'flight.parsley'
+        write_archive([], path)
+        data = bytearray(path.read_bytes())
+        data[10] ^= 0xFF # first byte of the embedded hash
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError):
+            ArchiveReader(path)
+        with ArchiveReader(path, check_definitions=False) as reader:
+            assert len(reader) == 0
+
+    def test_not_an_archive(self, tmp_path):
+        path = tmp_path / 'flight.parsley'
+        path.write_bytes(b'\x00' * 100)
+        with pytest.raises(ValueError):
+            ArchiveReader(path)
+
+        # a writer that was never closed has no index
+        file = io.BytesIO()
+        writer = ArchiveWriter(file)
+        writer.write_many(_ParsleyParseInternal.parse_to_object(*frame) for frame in analog_frames(10))
+        path.write_bytes(file.getvalue())
+        with pytest.raises(ValueError):
+            ArchiveReader(path)
+
+        writer.close()
+        footer = json.loads(file.getvalue()[file.getvalue().rindex(b'{"definitions_hash"'):-24])
+        assert footer['definitions_hash'] == definitions_hash().hex()
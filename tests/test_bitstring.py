@@ -1,5 +1,6 @@
+import random
 import pytest
-from parsley.bitstring import BitString
+from parsley.bitstring import BitString, BitCursor
 
 class TestBitString:
     def test_bitstring(self):
@@ -72,3 +73,62 @@ class TestBitString:
         bit_str.push_front(b'\x01', 4) # 0001
         res = bit_str.pop(12)
         assert res == b'\x01\xAA' # 0001 1010 1010
+
+
+class TestBitCursor:
+    def test_matches_bitstring_pop(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            data = bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 16)))
+            bit_length = rng.randint(0, len(data) * 8 + 12)
+            # BitString keeps any set bits above bit_length, which BitCursor (rightly) ignores
+            value = int.from_bytes(data, byteorder='big') & ((1 << bit_length) - 1)
+            data = value.to_bytes(len(data), byteorder='big')
+            bit_str = BitString(data, bit_length)
+            cursor = BitCursor(data, bit_length)
+            assert cursor.length == bit_str.length
+            while bit_str.length:
+                field_length = rng.randint(1, 20)
+                variable_length = rng.random() < 0.5
+                if bit_str.length < field_length and not variable_length:
+                    with pytest.raises(IndexError):
+                        cursor.pop(field_length)
+                    break
+                assert cursor.pop(field_length, variable_length) == bit_str.pop(field_length, variable_length)
+                assert cursor.length == bit_str.length
+
+    def test_non_octet(self):
+        cursor = BitCursor(b'\x01\x5D', 9) # ___1 0101 1101
+        assert cursor.pop(5) == b'\x15'
+        assert cursor.pop(4) == b'\x0D'
+
+    def test_read_does_not_move(self):
+        cursor = BitCursor(b'\x12\x34\x56')
+        assert cursor.read(4, 12) == 0x234
+        assert cursor.read(20, 4) == 0x6
+        assert cursor.length == 24
+        assert cursor.pop(8) == b'\x12'
+        assert cursor.read(0, 8) == 0x12
+
+    def test_read_out_of_range(self):
+        cursor = BitCursor(b'\x12')
+        with pytest.raises(IndexError):
+            cursor.read(4, 8)
+
+    def test_does_not_copy(self):
+        buf = bytearray(b'\x00\xFF')
+        cursor = BitCursor(buf)
+        assert cursor.view.obj is buf
+        buf[0] = 0xAB
+        assert cursor.pop(8) == b'\xAB'
+
+    def test_list_of_ints(self):
+        cursor = BitCursor([0x12, 0x34])
+        assert cursor.pop(16) == b'\x12\x34'
+
+    def test_empty(self):
+        cursor = BitCursor()
+        assert cursor.pop(0) == b''
+        assert cursor.pop(8, variable_length=True) == b''
+        with pytest.raises(IndexError):
+            cursor.pop(1)
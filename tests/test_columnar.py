@@ -0,0 +1,160 @@
+import pytest
+from array import array
+
+from parsley.columnar import ColumnarDecoder, ColumnBatch, CodeColumn, make_column
+from parsley.fields import ASCII, Bitfield, Enum, Floating, Numeric
+from parsley.message_definitions import MESSAGES
+from parsley.parse_to_object import _ParsleyParseInternal, LiveTelemetryParser, LiveTelemetryStream
+from parsley.parsley_message import ParsleyError, ParsleyObject
+
+import parsley.message_types as mt
+import utils as utilities
+
+def frames():
+    analog_sid = utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '13', 'POWER', 'ROCKET')
+    status_sid = utilities.create_msg_sid_from_strings('HIGH', 'ACTUATOR_STATUS', '1', 'INJECTOR', 'ROCKET')
+    gps_sid = utilities.create_msg_sid_from_strings('LOW', 'GPS_LATITUDE', '0', 'GPS', 'ROCKET')
+    return [
+        (analog_sid, b'\x03\xE8\x0C\xE4'),
+        (status_sid, b'\x00\x10\x00\x01'),
+        (analog_sid, b'\x03\xE9\x0C\xE5'),
+        (gps_sid, b'\x00\x05\x2B\x1E\x01\x02N'),
+        (b'\x00\x00', b'\xAB'),                     # UNDEFINED msg_type
+        (status_sid, b'\x00\x11\x00\x07'),          # curr_state out of range
+        (status_sid, b'\x00\x12\x01\x00'),
+    ]
+
+class TestColumnar:
+    def test_columns_match_parse_to_object(self):
+        decoder = ColumnarDecoder()
+        decoder.feed_many([sid for sid, _ in frames()], [data for _, data in frames()])
+
+        expected: dict[str, list[ParsleyObject]] = {}
+        for msg_sid, msg_data in frames():
+            result = _ParsleyParseInternal.parse_to_object(msg_sid, msg_data)
+            if isinstance(result, ParsleyObject):
+                expected.setdefault(result.msg_type, []).append(result)
+
+        assert set(decoder.batches) == set(expected)
+        for msg_type, objects in expected.items():
+            batch = decoder.batches[msg_type]
+            assert len(batch) == len(objects)
+            for name in ('msg_prio', 'board_type_id', 'board_inst_id', 'msg_metadata'):
+                assert batch.column_values(name) == [getattr(obj, name) for obj in objects]
+            for name in objects[0].data:
+                assert batch.column_values(name) == [obj.data[name] for obj in objects]
+        assert len(decoder.errors) == 2
+        assert all(isinstance(error, ParsleyError) for error in decoder.errors)
+
+    def test_iter_parsed_data_round_trip(self):
+        decoder = ColumnarDecoder()
+        decoder.feed_many([sid for sid, _ in frames()], [data for _, data in frames()])
+        batch = decoder.batches['SENSOR_ANALOG16']
+        rows = list(batch.iter_parsed_data())
+        assert rows[0] == {
+            'msg_prio': 'MEDIUM', 'board_type_id': 'POWER', 'board_inst_id': 'ROCKET', 'msg_metadata': 'SENSOR_PT_CHANNEL_1',
+            'time': 1.0, 'value': 3300, 'msg_type': 'SENSOR_ANALOG16',
+        }
+        stream = LiveTelemetryParser().encode_many(rows)
+        assert LiveTelemetryStream().feed(stream) == [
+            _ParsleyParseInternal.parse_to_object(sid, data) for sid, data in frames() if data in (b'\x03\xE8\x0C\xE4', b'\x03\xE9\x0C\xE5')
+        ]
+
+    def test_feed_matches_feed_many(self):
+        one_by_one = ColumnarDecoder()
+        for msg_sid, msg_data in frames():
+            one_by_one.feed(msg_sid, msg_data)
+        batched = ColumnarDecoder()
+        batched.feed_many([sid for sid, _ in frames()], [data for _, data in frames()])
+        for msg_type, batch in batched.batches.items():
+            for name in batch.columns:
+                assert batch.column_values(name) == one_by_one.batches[msg_type].column_values(name)
+
+    def test_column_types(self):
+        decoder = ColumnarDecoder()
+        for msg_sid, msg_data in frames():
+            decoder.feed(msg_sid, msg_data)
+        analog = decoder.batches['SENSOR_ANALOG16'].columns
+        assert isinstance(analog['time'], array) and analog['time'].typecode == 'd'
+        assert isinstance(analog['value'], array) and analog['value'].typecode == 'q'
+        assert isinstance(analog['msg_metadata'], CodeColumn)
+        assert list(analog['value']) == [3300, 3301]
+
+        status = decoder.batches['ACTUATOR_STATUS'].columns['curr_state']
+        # Enum columns are seeded with the Enum's keys so codes match definition order
+        assert status.labels[:len(mt.actuator_state)] == list(mt.actuator_state)
+        assert list(status.codes) == [mt.actuator_state['ACT_STATE_OFF'], mt.actuator_state['ACT_STATE_ON']]
+
+        assert decoder.batches['GPS_LATITUDE'].columns['direction'] == ['N']
+
+    def test_make_column(self):
+        assert make_column(Numeric('x', 8)).typecode == 'q'
+        assert make_column(Numeric('x', 8, scale=0.5)).typecode == 'd'
+        assert make_column(Numeric('x', 64)) == []
+        assert make_column(Floating('x')).typecode == 'd'
+        assert isinstance(make_column(Enum('x', 2, mt.msg_prio)), CodeColumn)
+        assert make_column(Bitfield('x', 8, 'OK', {'A': 0})).labels == ['OK']
+        assert make_column(ASCII('x', 8)) == []
+
+    @pytest.mark.parametrize('msg_type', list(MESSAGES))
+    def test_every_message_type_has_a_layout(self, msg_type):
+        batch = ColumnBatch(msg_type)
+        assert list(batch.columns)[:4] == ['msg_prio', 'board_type_id', 'board_inst_id', 'msg_metadata']
+        assert list(batch.columns)[4:] == [field.name for field in MESSAGES[msg_type][4:]]
+
+    def test_code_column(self):
+        column = CodeColumn(['A'])
+        for value in ['B', 'A', 'B', 3]:
+            column.append(value)
+        assert list(column.codes) == [1, 0, 1, 2]
+        assert column.to_list() == ['B', 'A', 'B', 3]
+        assert column[2] == 'B'
+        assert len(column) == 4
+        assert list(column) == column.to_list()
+
+        # other columns are translated into this one's labels, plain iterables are appended label by label
+        other = CodeColumn([3, 'C'])
+        other.append('A')
+        other.append('C')
+        column.extend(other)
+        column.extend(['C', 'D'])
+        assert list(column.codes) == [1, 0, 1, 2, 0, 3, 3, 4]
+        assert column.to_list() == ['B', 'A', 'B', 3, 'A', 'C', 'C', 'D']
+
+    def test_from_columns(self):
+        decoder = ColumnarDecoder()
+        decoder.feed_many([sid for sid, _ in frames()], [data for _, data in frames()])
+        batch = decoder.batches['SENSOR_ANALOG16']
+
+        copy = ColumnBatch.from_columns('SENSOR_ANALOG16', batch.columns)
+        assert len(copy) == len(batch)
+        assert list(copy.iter_parsed_data()) == list(batch.iter_parsed_data())
+        copy.append('HIGH', 'POWER', 'ROCKET', 'SENSOR_PT_CHANNEL_1', {'time': 2.0, 'value': 1})
+        assert copy.column_values('value')[-1] == 1
+
+        with pytest.raises(ValueError):
+            ColumnBatch.from_columns('ACTUATOR_STATUS', batch.columns)
+        with pytest.raises(ValueError):
+            ColumnBatch.from_columns('SENSOR_ANALOG16', {**batch.columns, 'value': array('q')})
+
+    def test_log_timestamps(self):
+        decoder = ColumnarDecoder()
+        msg_sids, msg_datas = zip(*frames())
+        decoder.feed_many(msg_sids, msg_datas, list(range(1000, 1000 + len(msg_sids))))
+        batch = decoder.batches['SENSOR_ANALOG16']
+        assert batch.logged
+        assert batch.column_values('log_timestamp') == [1000, 1002]
+        assert batch.column_values('monotonic_time') == pytest.approx([1.0, 1.001])
+        assert [row['log_timestamp'] for row in batch.iter_parsed_data()] == [1000, 1002]
+        assert sorted(error.log_timestamp for error in decoder.errors) == [1004, 1005]
+
+        copy = ColumnBatch.from_columns('SENSOR_ANALOG16', batch.columns)
+        assert copy.logged and len(copy) == 2
+
+        # a msg_type's frames are either all timestamped or none are
+        with pytest.raises(ValueError):
+            decoder.feed(msg_sids[0], msg_datas[0])
+        with pytest.raises(ValueError):
+            ColumnBatch('SENSOR_ANALOG16').extend(batch)
+        with pytest.raises(ValueError):
+            decoder.feed_many(msg_sids, msg_datas, [0])
@@ -0,0 +1,19 @@
+import random
+import crc8 as crc8_package
+
+from parsley.crc import CRC8_TABLE, crc8
+
+class TestCrc:
+    def test_matches_crc8_package(self):
+        rng = random.Random(0)
+        for length in range(40):
+            data = rng.randbytes(length)
+            assert crc8(data) == crc8_package.crc8(data).digest()[0]
+            assert crc8(bytearray(data)) == crc8(memoryview(data)) == crc8(data)
+
+    def test_table(self):
+        assert CRC8_TABLE[:4] == [0x00, 0x07, 0x0E, 0x09]
+        assert len(CRC8_TABLE) == 256
+
+    def test_continue(self):
+        assert crc8(b'\x89', crc8(b'\x01\x02')) == crc8(b'\x01\x02\x89')
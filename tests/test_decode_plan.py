@@ -0,0 +1,107 @@
+import random
+import pytest
+
+from parsley.bitstring import BitString
+from parsley.decode_plan import DecodePlan, get_decode_plan
+from parsley.fields import ASCII, Enum, Numeric, Floating, Switch
+from parsley.message_definitions import MESSAGES
+from parsley.parse_to_object import _ParsleyParseInternal
+
+import parsley.message_types as mt
+
+def slow_decode(fields, msg_data):
+    try:
+        return _ParsleyParseInternal.parse_fields(BitString(msg_data), fields)
+    except (ValueError, IndexError) as error:
+        return f'error: {error}'
+
+def plan_decode(plan, msg_data):
+    try:
+        return plan.decode(msg_data)
+    except ValueError as error:
+        return f'error: {error}'
+
+class TestDecodePlan:
+    @pytest.mark.parametrize('msg_type', list(MESSAGES))
+    def test_matches_parse_fields(self, msg_type):
+        plan = get_decode_plan(msg_type)
+        rng = random.Random(msg_type)
+        for _ in range(200):
+            msg_data = bytes(rng.getrandbits(8) for _ in range(8))
+            assert plan_decode(plan, msg_data) == slow_decode(plan.fields, msg_data)
+
+    def test_plan_is_cached(self):
+        assert get_decode_plan('SENSOR_ANALOG16') is get_decode_plan('SENSOR_ANALOG16')
+
+    def test_unknown_msg_type(self):
+        with pytest.raises(KeyError):
+            get_decode_plan('NOT_A_MSG_TYPE')
+
+    def test_truncated_payload_falls_back(self):
+        plan = get_decode_plan('ALT_ARM_STATUS')
+        assert plan.decode(b'\x00\x00\x01') is None
+
+    def test_trailing_bits_ignored(self):
+        plan = get_decode_plan('SENSOR_ANALOG16')
+        assert plan.decode(b'\x03\xE8\x00\x10\xFF\xFF') == {'time': 1.0, 'value': 16}
+
+    def test_switch_not_compiled(self):
+        switch = Switch('inner', 8, {'A': 0}, {'A': [Numeric('x', 8)]})
+        plan = DecodePlan('NESTED', [switch])
+        assert plan.steps is None
+        assert plan.decode(b'\x00\x05') is None
+
+    @pytest.mark.parametrize('fields', [
+        [Numeric('a', 8, signed=True), Numeric('b', 16, signed=True, big_endian=False)],
+        [Numeric('a', 4, signed=True), Numeric('b', 12, scale=0.5, signed=True)],
+        [Numeric('a', 24, big_endian=False), Numeric('b', 8, scale=2)],
+        [Floating('a'), Floating('b', big_endian=False)],
+        [Enum('a', 2, mt.msg_prio), Numeric('b', 6), ASCII('c', 16)],
+    ])
+    def test_custom_fields_match_parse_fields(self, fields):
+        plan = DecodePlan('CUSTOM', fields)
+        rng = random.Random(repr([field.name for field in fields]))
+        for _ in range(200):
+            msg_data = bytes(rng.getrandbits(7) for _ in range(plan.total_bits // 8))
+            assert plan_decode(plan, msg_data) == slow_decode(fields, msg_data)
+
+    def test_time_bytes(self):
+        plan = get_decode_plan('SENSOR_ANALOG16')
+        assert plan.time_bytes == (0, 2)
+        assert plan.convert_time(1000) == 1.0
+        assert DecodePlan('NO_TIME', [Numeric('a', 8), Numeric('time', 12)]).time_bytes is None
+
+    @pytest.mark.parametrize('msg_type', list(MESSAGES))
+    def test_decode_lazy_matches_decode(self, msg_type):
+        plan = get_decode_plan(msg_type)
+        rng = random.Random(msg_type)
+        for _ in range(200):
+            msg_data = bytes(rng.getrandbits(8) for _ in range(8))
+            expected = plan_decode(plan, msg_data)
+            try:
+                lazy = plan.decode_lazy(msg_data)
+            except ValueError as error:
+                assert expected == f'error: {error}'
+                continue
+            assert lazy == expected
+            assert list(lazy) == list(expected)
+            assert lazy.to_dict() == expected
+
+    def test_lazy_payload(self):
+        plan = get_decode_plan('SENSOR_ANALOG16')
+        lazy = plan.decode_lazy(b'\x03\xE8\x00\x10')
+        assert len(lazy) == 2 and 'value' in lazy and 'other' not in lazy
+        assert lazy._values == {} # numeric fields are only decoded on access
+        assert lazy['value'] == 16
+        assert lazy._values == {'value': 16}
+        assert lazy.get('time') == 1.0
+        assert lazy.get('other') is None
+        with pytest.raises(KeyError):
+            lazy['other']
+        assert plan.decode_lazy(b'\x00') is None
+
+    def test_lazy_payload_checks_enums(self):
+        plan = DecodePlan('CUSTOM', [Numeric('a', 6), Enum('b', 2, {'X': 0, 'Y': 1})])
+        assert plan.decode_lazy(b'\x01')._values == {'b': 'Y'}
+        with pytest.raises(ValueError):
+            plan.decode_lazy(b'\x03')
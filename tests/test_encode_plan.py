@@ -0,0 +1,100 @@
+import random
+import string
+import pytest
+
+from parsley.encode_plan import get_encode_plan
+from parsley.fields import ASCII, Enum, Numeric
+from parsley.message_definitions import CAN_MESSAGE, MESSAGES
+from parsley.parse_to_object import _ParsleyParseInternal, LiveTelemetryParser, LiveTelemetryStream
+
+import parsley.message_types as mt
+
+def outcome(encode, parsed_data):
+    try:
+        return encode(parsed_data)
+    except (ValueError, KeyError) as error:
+        return type(error), str(error)
+
+def random_value(field, rng):
+    if isinstance(field, Enum):
+        return rng.choice(list(field.get_keys()))
+    if type(field) is Numeric:
+        raw = rng.getrandbits(field.length)
+        if field.signed:
+            raw -= 1 << (field.length - 1)
+        return raw * field.scale
+    if type(field) is ASCII:
+        return ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(0, field.length // 8)))
+    # Floating and Bitfield values are whatever decoding random bits gives
+    return field.decode(rng.getrandbits(field.length).to_bytes((field.length + 7) // 8, 'big'))
+
+def random_parsed_data(msg_type, rng):
+    """ Flattened parsed data (as encode_data() takes it) with a random value for every field """
+    fields = CAN_MESSAGE.get_fields(msg_type)
+    parsed_data = {
+        'msg_prio': rng.choice(list(mt.msg_prio)),
+        'msg_type': msg_type,
+        'board_type_id': rng.choice(list(mt.board_type_id)),
+        'board_inst_id': rng.choice(list(mt.board_inst_id)),
+        'msg_metadata': random_value(fields[3], rng) if rng.random() < 0.8 else rng.getrandbits(8),
+    }
+    for field in fields[4:]:
+        parsed_data[field.name] = random_value(field, rng)
+    return parsed_data
+
+class TestEncodePlan:
+    @pytest.mark.parametrize('msg_type', list(MESSAGES))
+    def test_matches_bitstring_encoder(self, msg_type):
+        rng = random.Random(msg_type)
+        for _ in range(50):
+            parsed_data = random_parsed_data(msg_type, rng)
+            assert outcome(_ParsleyParseInternal.encode_data, parsed_data) == outcome(_ParsleyParseInternal._encode_data_bitstring, parsed_data)
+
+    @pytest.mark.parametrize('change', [
+        {'msg_prio': 'NOT_A_PRIO'},
+        {'msg_type': 'NOT_A_TYPE'},
+        {'msg_type': 'UNDEFINED'},
+        {'board_type_id': 'NOT_A_BOARD'},
+        {'msg_metadata': 'NOT_A_METADATA'},
+        {'msg_metadata': 3},
+        {'time': -1.0},
+        {'time': 'soon'},
+        {'value': 1 << 16},
+        {'value': 2**15 + 0.4},
+    ])
+    def test_errors_match_bitstring_encoder(self, change):
+        parsed_data = {
+            'msg_prio': 'MEDIUM', 'msg_type': 'SENSOR_ANALOG16', 'board_type_id': 'POWER',
+            'board_inst_id': 'ROCKET', 'msg_metadata': 'SENSOR_5V_VOLT', 'time': 1.5, 'value': 100,
+        }
+        parsed_data.update(change)
+        assert outcome(_ParsleyParseInternal.encode_data, parsed_data) == outcome(_ParsleyParseInternal._encode_data_bitstring, parsed_data)
+
+    def test_missing_key(self):
+        with pytest.raises(KeyError):
+            _ParsleyParseInternal.encode_data({'msg_type': 'SENSOR_ANALOG16'})
+        with pytest.raises(KeyError):
+            _ParsleyParseInternal.encode_data({'msg_prio': 'LOW'})
+
+    def test_plan_is_cached(self):
+        assert get_encode_plan('SENSOR_ANALOG16') is get_encode_plan('SENSOR_ANALOG16')
+
+    def test_encode_many(self):
+        rng = random.Random(0)
+        parsed_datas = [random_parsed_data(msg_type, rng) for msg_type in MESSAGES for _ in range(3)]
+        parsed_datas = [parsed_data for parsed_data in parsed_datas if not isinstance(outcome(_ParsleyParseInternal.encode_data, parsed_data)[0], type)]
+        buf = _ParsleyParseInternal.encode_many(parsed_datas)
+        frames = [_ParsleyParseInternal.encode_data(parsed_data) for parsed_data in parsed_datas]
+        assert buf == b''.join(LiveTelemetryParser.encode_frame(msg_sid, bytes(msg_data)) for msg_sid, msg_data in frames)
+        assert LiveTelemetryParser().encode_many(iter(parsed_datas)) == buf
+        # the frames parse back to what each parsed_data encodes to
+        results = LiveTelemetryStream().feed(buf)
+        assert len(results) == len(parsed_datas)
+        for result, frame in zip(results, frames):
+            assert result == _ParsleyParseInternal.parse_to_object(*frame)
+
+    def test_encode_many_errors(self):
+        assert _ParsleyParseInternal.encode_many([]) == bytearray()
+        with pytest.raises(ValueError) as e:
+            _ParsleyParseInternal.encode_many([{'msg_prio': 'LOW', 'msg_type': 'NOT_A_TYPE', 'board_type_id': 'ANY', 'board_inst_id': 'ANY', 'msg_metadata': 0}])
+        assert 'NOT_A_TYPE' in str(e.value)
@@ -109,6 +109,23 @@ class TestEnum:
         with pytest.raises(ValueError):
             enum.decode(b"\xff")
 
+    def test_enum_lookup(self):
+        enum = Enum("enum", 4, {"a": 1, "b": 15})
+        assert enum.value_table == [None, "a"] + [None] * 13 + ["b"]
+        assert enum.lookup(1) == "a"
+        assert enum.lookup(15) == "b"
+        assert enum.lookup(2) is None
+        assert enum.lookup(16) is None
+        assert enum.decode(b"\x0f") == "b"
+
+    def test_enum_lookup_without_table(self):
+        enum = Enum("enum", 24, {"a": 1, "b": 0xABCDEF})
+        assert enum.value_table is None
+        assert enum.lookup(0xABCDEF) == "b"
+        assert enum.lookup(2) is None
+        with pytest.raises(ValueError, match='Value "2" not found in map "enum"'):
+            enum.decode(b"\x00\x00\x02")
+
     def test_enum_get_keys(self):
         map = {"a": 1, "b": 2}
         enum = Enum("enum", 8, map)
@@ -335,6 +352,17 @@ class TestBitfieldLogs:
         assert bf.decode((0).to_bytes(4, "big")) == "E_NOMINAL"
         assert bf.decode((1 << 20).to_bytes(4, "big")) == "UNKNOWN(0x100000)"
 
+    def test_decode_memoized(self, bitfield):
+        assert bitfield.named_mask == sum(1 << bit for bit in mt.board_error_bitfield_offset.values())
+        first = bitfield.decode(b"\x00\x03")
+        assert bitfield.decode(b"\x00\x03") is first
+        assert bitfield.decode_value(3) is first
+
+        bitfield.MAX_MEMO_SIZE = 2
+        for value in range(10):
+            assert bitfield.decode_value(value) == bitfield.decode(value.to_bytes(2, "big"))
+        assert len(bitfield._memo) <= 2
+
     def test_encode_unknown_flag_raises(self, bitfield):
         with pytest.raises(ValueError):
             bitfield.encode("E_NOT_A_REAL_FLAG")
@@ -0,0 +1,112 @@
+import io
+import json
+import random
+
+import pytest
+
+from parsley import ndjson
+from parsley.parse_to_object import _ParsleyParseInternal, LoggerParser
+from parsley.parsley_message import ParsleyError, ParsleyObject, ParsleyRecord
+
+import utils as utilities
+
+def random_frames(count: int, seed: int = 0) -> list[tuple[int, bytes]]:
+    rng = random.Random(seed)
+    return [(rng.getrandbits(29), bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 8)))) for _ in range(count)]
+
+def legacy_dump(result) -> dict:
+    # what parsley.parse() returns for the same frame
+    if isinstance(result, ParsleyError):
+        return {
+            'msg_prio': result.msg_prio,
+            'board_type_id': result.board_type_id,
+            'board_inst_id': result.board_inst_id,
+            'msg_type': result.msg_type,
+            'msg_metadata': result.msg_metadata,
+            'data': {'msg_data': result.msg_data, 'error': result.error},
+        }
+    return result.model_dump(mode='json')
+
+class TestNDJSON:
+    def test_dumps_matches_legacy(self):
+        frames = random_frames(2000)
+        for msg_sid, msg_data in frames:
+            expected = json.dumps(legacy_dump(_ParsleyParseInternal.parse_to_object(msg_sid, msg_data)))
+            assert ndjson.dumps(_ParsleyParseInternal.parse_to_object(msg_sid, msg_data)) == expected
+            assert ndjson.dumps(_ParsleyParseInternal.parse_to_object(msg_sid, msg_data, False)) == expected
+            assert ndjson.dumps(_ParsleyParseInternal.parse_to_object(msg_sid, msg_data, lazy=True)) == expected
+
+    def test_unusual_values(self):
+        header = ('HIGH', 'SENSOR_ANALOG16', 'POWER', 'ROCKET', 'SENSOR_5V_VOLT')
+        for data in (
+            {'time': float('nan'), 'value': float('inf')},
+            {'time': -0.0, 'value': 1e300},
+            {'text': 'quote " backslash \\ percent %s unicode é \x00'},
+            {'per%cent "key"': True, 'none': None},
+            {'list': [1, 2.5, 'a'], 'bytes': b'\x01'}, # no fast path
+            {},
+        ):
+            record = ParsleyRecord(*header, data)
+            expected = ParsleyObject.model_construct(**record._asdict()).model_dump(mode='json')
+            assert json.loads(ndjson.dumps(record)) == expected
+            assert ndjson.dumps(record) == json.dumps(expected)
+
+        with pytest.raises(ValueError):
+            ndjson.dumps({'msg_type': 'GENERAL_BOARD_STATUS'})
+
+    def test_log_fields(self):
+        msg_sid, msg_data = random_frames(1)[0]
+        valid = _ParsleyParseInternal.encode_data({
+            'msg_prio': 'HIGH', 'msg_type': 'SENSOR_ANALOG16', 'board_type_id': 'POWER',
+            'board_inst_id': 'ROCKET', 'msg_metadata': 'SENSOR_5V_VOLT', 'time': 1.5, 'value': 100,
+        })
+        page = utilities.make_logger_page(0, [(valid[0], 10, bytes(valid[1])), (msg_sid | 0x3F << 20, 20, msg_data)])
+        results = list(LoggerParser().parse(page, 0))
+        assert results
+
+        for result in results:
+            dump = json.loads(ndjson.dumps(result))
+            assert dump['log_timestamp'] == result.log_timestamp
+            assert dump['monotonic_time'] == result.monotonic_time
+            assert ndjson.loads(ndjson.dumps(result)) == result
+
+    def test_write_and_read(self, tmp_path):
+        results = [_ParsleyParseInternal.parse_to_object(*frame) for frame in random_frames(1000, seed=1)]
+        assert any(isinstance(result, ParsleyError) for result in results)
+        assert any(isinstance(result, ParsleyObject) for result in results)
+
+        file = io.StringIO()
+        assert ndjson.write_ndjson(results, file, batch_size=7) == len(results)
+        text = file.getvalue()
+        assert text == ''.join(json.dumps(legacy_dump(result)) + '\n' for result in results)
+
+        assert list(ndjson.read_ndjson(io.StringIO(text), batch_size=3)) == results
+        assert list(ndjson.read_ndjson(io.BytesIO(text.encode()))) == results
+        assert [ndjson.loads(line) for line in text.splitlines()] == results
+
+        records = list(ndjson.read_ndjson(io.StringIO(text), validate=False))
+        for record, result in zip(records, results):
+            if isinstance(result, ParsleyError):
+                assert record == result
+            else:
+                assert isinstance(record, ParsleyRecord)
+                assert record.to_object() == result
+
+        path = tmp_path / 'results.ndjson'
+        assert ndjson.write_ndjson(results, path) == len(results)
+        assert list(ndjson.read_ndjson(path)) == results
+        assert list(ndjson.read_ndjson(io.StringIO('\n' + text + '\n\n'))) == results
+
+    def test_writer(self):
+        results = [_ParsleyParseInternal.parse_to_object(*frame) for frame in random_frames(10)]
+        file = io.StringIO()
+        with ndjson.NDJSONWriter(file, batch_size=4) as writer:
+            writer.write_many(results[:5])
+            assert file.getvalue().count('\n') == 4
+            writer.write(results[5])
+        assert writer.count == 6
+        assert file.getvalue().splitlines() == [ndjson.dumps(result) for result in results[:6]]
+
+        file = io.StringIO()
+        assert ndjson.write_ndjson([], file) == 0
+        assert file.getvalue() == ''
@@ -0,0 +1,95 @@
+import random
+import pytest
+
+from parsley.decode_plan import DecodePlan, get_decode_plan
+from parsley.fields import ASCII, Enum, Floating, Numeric
+from parsley.message_definitions import MESSAGES
+from parsley.numpy_decode import NumpyDecodePlan, decode_payloads, get_numpy_plan
+
+import parsley.message_types as mt
+
+np = pytest.importorskip('numpy')
+
+def valid_payloads(plan: DecodePlan, count: int, payload_size: int, seed: str) -> list[bytes]:
+    rng = random.Random(seed)
+    payloads = []
+    while len(payloads) < count:
+        payload = bytes(rng.getrandbits(7) for _ in range(payload_size))
+        try:
+            plan.decode(payload)
+        except ValueError:
+            continue
+        payloads.append(payload)
+    return payloads
+
+def assert_matches_scalar(plan: DecodePlan, columns: dict, payloads: list[bytes]):
+    expected = [plan.decode(payload) for payload in payloads]
+    assert list(columns) == [field.name for field in plan.fields]
+    for name, column in columns.items():
+        values = column.tolist() if isinstance(column, np.ndarray) else column
+        assert values == [row[name] for row in expected]
+        assert [type(v) for v in values] == [type(row[name]) for row in expected]
+
+class TestNumpyDecode:
+    @pytest.mark.parametrize('msg_type', [msg_type for msg_type in MESSAGES if len(MESSAGES[msg_type]) > 4])
+    def test_matches_decode_plan(self, msg_type):
+        plan = get_decode_plan(msg_type)
+        size = (plan.total_bits + 7) // 8
+        payloads = valid_payloads(plan, 50, size, msg_type)
+        assert_matches_scalar(plan, decode_payloads(msg_type, b''.join(payloads)), payloads)
+
+    def test_vectorized_fields(self):
+        plan = get_numpy_plan('SENSOR_3D_ANALOG16')
+        assert [name for name, _, _ in plan.vector_fields] == ['time', 'value_x', 'value_y', 'value_z']
+        assert plan.scalar_steps == []
+
+        # Enum and ASCII fields fall back to the scalar converters
+        plan = get_numpy_plan('GPS_LATITUDE')
+        assert [name for name, _ in plan.scalar_steps] == ['direction']
+
+    def test_custom_layouts(self):
+        fields = [
+            Numeric('a', 8, signed=True), Numeric('b', 24, signed=True, big_endian=False),
+            Numeric('c', 16, scale=0.25, signed=True, big_endian=False), Floating('d'),
+            Numeric('e', 4), Numeric('f', 12, signed=True), Enum('g', 8, {'X': 0, 'Y': 127}),
+            Numeric('h', 64), ASCII('i', 16),
+        ]
+        plan = DecodePlan('CUSTOM', fields)
+        payloads = valid_payloads(plan, 100, plan.total_bits // 8, 'custom')
+        columns = NumpyDecodePlan(plan).decode(b''.join(payloads))
+        assert columns['h'].dtype == np.uint64
+        assert_matches_scalar(plan, columns, payloads)
+
+    def test_sequence_input_and_trailing_bytes(self):
+        payloads = [b'\x03\xE8\x0C\xE4\xFF', b'\x03\xE9\x0C\xE5\xFF']
+        columns = decode_payloads('SENSOR_ANALOG16', payloads)
+        assert columns['value'].tolist() == [3300, 3301]
+        assert columns['time'].tolist() == [1000 * (1/1000), 1001 * (1/1000)]
+
+    def test_empty(self):
+        columns = decode_payloads('SENSOR_ANALOG16', b'')
+        assert len(columns['time']) == 0 and len(columns['value']) == 0
+        columns = decode_payloads('GPS_LATITUDE', b'')
+        assert columns['direction'] == []
+
+    @pytest.mark.parametrize('msg_type', ['LEDS_ON', 'LEDS_OFF'])
+    def test_no_payload_fields(self, msg_type):
+        assert get_numpy_plan(msg_type).min_payload_size == 0
+        assert decode_payloads(msg_type, [b'', b'']) == {}
+        assert decode_payloads(msg_type, b'') == {}
+        assert decode_payloads(msg_type, [b'\x01', b'\x02']) == {} # trailing bytes are ignored
+        assert get_numpy_plan(msg_type).decode(b'', count=3) == {}
+        with pytest.raises(ValueError, match='whole number'):
+            get_numpy_plan(msg_type).decode(b'\x00', payload_size=0)
+
+    def test_bad_buffers(self):
+        with pytest.raises(ValueError, match='whole number'):
+            decode_payloads('SENSOR_ANALOG16', b'\x00' * 5)
+        with pytest.raises(ValueError, match='too short'):
+            decode_payloads('SENSOR_ANALOG16', b'\x00' * 6, payload_size=3)
+        with pytest.raises(ValueError, match='same length'):
+            decode_payloads('SENSOR_ANALOG16', [b'\x00' * 4, b'\x00' * 5])
+
+    def test_invalid_enum_raises(self):
+        with pytest.raises(ValueError, match='not found in map'):
+            decode_payloads('ACTUATOR_STATUS', b'\x00\x00\x00\x09')
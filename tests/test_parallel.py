@@ -0,0 +1,91 @@
+import pickle
+import pytest
+
+from parsley.columnar import ColumnarDecoder
+from parsley.parallel import parse_dump_parallel
+from parsley.parse_to_object import LoggerParser
+from parsley.parsley_message import ParsleyError
+
+import utils as utilities
+
+def write_dump(path, page_count, page_number=0):
+    analog_sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+    status_sid = int.from_bytes(utilities.create_msg_sid_from_strings('HIGH', 'ACTUATOR_STATUS', '1', 'INJECTOR', 'ROCKET'), 'big')
+    pages = []
+    for page in range(page_count):
+        records = [
+            (analog_sid, page, bytes([0, 1, page >> 8, page & 0xFF])),
+            (status_sid, page, bytes([0, 2, 0, page % 5])), # curr_state >= 4 is an error
+            (0x1234, page, b'\xAB'),
+        ]
+        pages.append(utilities.make_logger_page(page_number + page, records))
+    path.write_bytes(b''.join(pages))
+    return path
+
+class TestParallel:
+    def test_matches_serial(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.bin', 20, 250)
+        expected = list(LoggerParser().parse_dump(path, 250))
+        assert parse_dump_parallel(path, 250, max_workers=2, pages_per_chunk=3) == expected
+
+    def test_without_validation(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.bin', 5)
+        expected = list(LoggerParser(validate=False).parse_dump(path))
+        assert parse_dump_parallel(path, max_workers=2, pages_per_chunk=2, validate=False) == expected
+
+    def test_columnar(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.bin', 20)
+        serial = ColumnarDecoder()
+        with open(path, 'rb') as file:
+            msg_sids, msg_datas, log_timestamps = LoggerParser().read_frames(LoggerParser().iter_pages(file))
+            serial.feed_many(msg_sids, msg_datas, log_timestamps)
+
+        decoder = parse_dump_parallel(path, max_workers=2, pages_per_chunk=3, columnar=True)
+        assert isinstance(decoder, ColumnarDecoder)
+        assert set(decoder.batches) == set(serial.batches)
+        for msg_type, batch in serial.batches.items():
+            assert len(decoder.batches[msg_type]) == len(batch)
+            for name in batch.columns:
+                assert decoder.batches[msg_type].column_values(name) == batch.column_values(name)
+        # feed_many groups frames by msg_type, so errors are only ordered within each group
+        assert sorted(map(repr, decoder.errors)) == sorted(map(repr, serial.errors))
+        assert decoder.batches['SENSOR_ANALOG16'].column_values('value') == list(range(20))
+
+    def test_columnar_keeps_log_timestamps(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.bin', 20)
+        objects = list(LoggerParser().parse_dump(path))
+        decoder = parse_dump_parallel(path, max_workers=2, pages_per_chunk=3, columnar=True)
+
+        for msg_type, batch in decoder.batches.items():
+            assert batch.logged and list(batch.columns)[-2:] == ['log_timestamp', 'monotonic_time']
+            expected = [result for result in objects if not isinstance(result, ParsleyError) and result.msg_type == msg_type]
+            assert batch.column_values('log_timestamp') == [result.log_timestamp for result in expected]
+            assert batch.column_values('monotonic_time') == [result.monotonic_time for result in expected]
+
+        errors = [result for result in objects if isinstance(result, ParsleyError)]
+        assert sorted((error.log_timestamp, error.monotonic_time) for error in decoder.errors) == \
+            sorted((error.log_timestamp, error.monotonic_time) for error in errors)
+        assert all(error.log_timestamp is not None for error in decoder.errors)
+
+    def test_columnar_decoder_pickles(self):
+        decoder = ColumnarDecoder()
+        sid = utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET')
+        decoder.feed(sid, b'\x00\x01\x00\x02')
+        copy = pickle.loads(pickle.dumps(decoder))
+        copy.feed(sid, b'\x00\x01\x00\x03')
+        assert copy.batches['SENSOR_ANALOG16'].column_values('value') == [2, 3]
+
+    def test_empty_dump(self, tmp_path):
+        path = tmp_path / 'dump.bin'
+        path.write_bytes(b'')
+        assert parse_dump_parallel(path) == []
+
+    def test_bad_page_raises(self, tmp_path):
+        path = write_dump(tmp_path / 'dump.bin', 6)
+        with pytest.raises(ValueError) as e:
+            parse_dump_parallel(path, 1, max_workers=2, pages_per_chunk=2)
+        assert 'Page number mismatch' in str(e.value)
+
+    def test_bad_chunk_size(self, tmp_path):
+        with pytest.raises(ValueError):
+            parse_dump_parallel(tmp_path / 'dump.bin', pages_per_chunk=0)
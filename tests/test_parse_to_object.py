@@ -9,11 +9,15 @@ import utils as utilities
 import parsley
 import crc8 #cyclic redundancy check
 import struct
+import io
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 PARSE_LOGGER_PAGE_SIZE = 4096 
 
-from parsley.parse_to_object import _ParsleyParseInternal, ParsleyParser, USBDebugParser, LiveTelemetryParser, LoggerParser, BitstringParser
-from parsley.parsley_message import ParsleyError, ParsleyObject
+from parsley.parse_to_object import _ParsleyParseInternal, ParsleyParser, USBDebugParser, LiveTelemetryParser, LiveTelemetryStream, LoggerParser, BitstringParser, SidHeaderCache, SID_CACHE, ResultCache
+from parsley.parsley_message import ParsleyError, ParsleyObject, ParsleyRecord, LazyParsleyObject
 
 class TestParseToObject:
     def _to_dict(self, result):
@@ -408,6 +412,70 @@ class TestParseToObject:
         line = _ParsleyParseInternal.format_line(parsed_data)
         assert next(iter(mt.altimeter_id)) in line
         
+    @staticmethod
+    def _reference_format_line(parsed_data):
+        # format_line() before its templates were cached
+        from parsley.parse_to_object import MSG_PRIO_LEN, MSG_TYPE_LEN, BOARD_TYPE_ID_LEN, BOARD_INST_ID_LEN, MSG_METADATA_LEN
+        res = (
+            f"[ {parsed_data['msg_prio']:<{MSG_PRIO_LEN}} {parsed_data['msg_type']:<{MSG_TYPE_LEN}}"
+            f" {parsed_data['board_type_id']:<{BOARD_TYPE_ID_LEN}} {parsed_data['board_inst_id']:<{BOARD_INST_ID_LEN}}"
+            f" {str(parsed_data['msg_metadata']):<{MSG_METADATA_LEN}} ]"
+        )
+        for k, v in parsed_data['data'].items():
+            formatted_value = f"{v:.3f}" if isinstance(v, float) else v
+            res += f' {k}: {formatted_value}'
+        return res
+
+    def test_format_line_matches_reference(self):
+        rng = random.Random(0)
+        results = [
+            _ParsleyParseInternal.parse_to_object(rng.getrandbits(29), bytes(rng.getrandbits(8) for _ in range(8)))
+            for _ in range(2000)
+        ]
+        dumps = [result.model_dump() for result in results if not isinstance(result, ParsleyError)]
+        assert len(dumps) > 100
+        for parsed_data in dumps:
+            assert _ParsleyParseInternal.format_line(parsed_data) == self._reference_format_line(parsed_data)
+            assert _ParsleyParseInternal.format_line(parsed_data) == self._reference_format_line(parsed_data) # cached
+
+    @pytest.mark.parametrize('change', [
+        {'msg_metadata': True},
+        {'msg_metadata': 1.0},
+        {'msg_metadata': [1, 2]},
+        {'data': {'{odd}': 1.5, 'value': True, 'n': None}},
+        {'data': {}},
+        {'msg_prio': 7},
+    ])
+    def test_format_line_unusual_values(self, change):
+        parsed_data = {
+            'msg_prio': 'LOW', 'msg_type': 'SENSOR_ANALOG16', 'board_type_id': 'POWER',
+            'board_inst_id': 'ROCKET', 'msg_metadata': 1, 'data': {'time': 2.0, 'value': 3},
+        }
+        assert _ParsleyParseInternal.format_line(parsed_data) == self._reference_format_line(parsed_data)
+        parsed_data.update(change)
+        assert _ParsleyParseInternal.format_line(parsed_data) == self._reference_format_line(parsed_data)
+
+    def test_write_lines(self):
+        rng = random.Random(1)
+        frames = [(rng.getrandbits(29), bytes(rng.getrandbits(8) for _ in range(8))) for _ in range(500)]
+        results = [result for result in (_ParsleyParseInternal.parse_to_object(*frame) for frame in frames) if not isinstance(result, ParsleyError)]
+        records = [result for result in (_ParsleyParseInternal.parse_to_object(*frame, validate=False) for frame in frames) if not isinstance(result, ParsleyError)]
+        expected = ''.join(_ParsleyParseInternal.format_line(result.model_dump()) + '\n' for result in results)
+
+        for items in (results, records, [result.model_dump() for result in results]):
+            file = io.StringIO()
+            assert _ParsleyParseInternal.write_lines(items, file, batch_size=7) == len(results)
+            assert file.getvalue() == expected
+
+        file = io.StringIO()
+        assert _ParsleyParseInternal.write_lines([], file) == 0
+        assert file.getvalue() == ''
+
+        error = _ParsleyParseInternal.parse_to_object(0, b'')
+        assert isinstance(error, ParsleyError)
+        with pytest.raises(ValueError):
+            _ParsleyParseInternal.write_lines([error], io.StringIO())
+
     def test_encode_data(self):
         parsed_data = {
             'msg_prio': 'MEDIUM',
@@ -647,3 +715,481 @@ class TestParseToObject:
         with pytest.raises(ValueError) as e:
             LiveTelemetryParser().parse(bytes(frame))
         assert "Bad checksum" in str(e.value)
+
+    def _sample_frames(self):
+        analog_sid = utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '3', 'POWER', 'ROCKET')
+        status_sid = utilities.create_msg_sid_from_strings('HIGH', 'ALT_ARM_STATUS', '1', 'ALTIMETER', 'ANY')
+        leds_sid = utilities.create_msg_sid_from_strings('LOW', 'LEDS_ON', '0', 'GPS', 'GROUND')
+        return [
+            (analog_sid, b'\x03\xE8\x0C\xE4'),
+            (status_sid, b'\x00\x10\x01\x0F\xFF\x08\x00'),
+            (b'\x00\x00', b'\xAB\xCD'),                              # UNDEFINED msg_type
+            (status_sid, b'\x00\x00\x01'),                           # truncated payload
+            (int.from_bytes(analog_sid, 'big'), [0x00, 0x01, 0x00, 0x02]),
+            (leds_sid, b''),
+            (b'\xFF\xFF\xFF\xFF', b'\x00'),                          # unknown msg_type
+            (analog_sid, b'\x00\x02\x00\x05'),
+        ]
+
+    def _usb_debug_lines(self):
+        lines = []
+        for msg_sid, msg_data in self._sample_frames():
+            line = f'${int.from_bytes(msg_sid, "big") if isinstance(msg_sid, bytes) else msg_sid:X}'
+            lines.append(line + ':' + ','.join(f'{byte:02X}' for byte in msg_data) if msg_data else line)
+        return lines + ['$1234', '$1234:A,B', '$1234:ab,CD', ' $1234:0A,0B \r', '$1FFF:AB,CD,']
+
+    def test_usb_debug_parse_text_matches_parse(self):
+        lines = self._usb_debug_lines()[:-1] # the last line makes parse() raise
+        expected = [USBDebugParser().parse(line) for line in lines]
+        assert USBDebugParser().parse_text('\n'.join(lines) + '\n\n') == expected
+        assert USBDebugParser().parse_text('\r\n'.join(lines).encode()) == expected
+        assert USBDebugParser(validate=False).parse_text('\n'.join(lines)) == [USBDebugParser(validate=False).parse(line) for line in lines]
+
+    def test_usb_debug_parse_text_malformed(self):
+        text = '\n'.join(self._usb_debug_lines())
+        with pytest.raises(ValueError):
+            USBDebugParser().parse_text(text)
+        with pytest.raises(ValueError):
+            USBDebugParser().parse_text('booting...\n$1234:AB')
+        assert len(USBDebugParser().parse_text(text + '\nbooting\n$1:2:3', skip_malformed=True)) == len(self._usb_debug_lines()) - 1
+
+    def test_usb_debug_parse_file(self, tmp_path):
+        lines = self._usb_debug_lines()[:-1]
+        expected = [USBDebugParser().parse(line) for line in lines]
+        path = tmp_path / 'capture.txt'
+        path.write_text('\n'.join(lines))
+        assert list(USBDebugParser().parse_file(path, chunk_size=7)) == expected
+        assert list(USBDebugParser().parse_file(str(path))) == expected
+        with open(path) as file:
+            assert list(USBDebugParser().parse_file(file, chunk_size=5)) == expected
+        assert list(USBDebugParser().parse_file(io.BytesIO(b''))) == []
+
+    def test_usb_debug_read_frames_columnar(self):
+        from parsley.columnar import ColumnarDecoder
+        lines = self._usb_debug_lines()[:-1]
+        decoder = ColumnarDecoder()
+        decoder.feed_many(*USBDebugParser().read_frames('\n'.join(lines)))
+        assert decoder.batches['SENSOR_ANALOG16'].column_values('value') == [3300, 2, 5]
+        assert len(decoder.errors) == sum(isinstance(USBDebugParser().parse(line), ParsleyError) for line in lines)
+
+    def _telemetry_frames(self):
+        return [
+            utilities.make_live_telemetry_frame(msg_sid if isinstance(msg_sid, int) else int.from_bytes(msg_sid, 'big'), bytes(msg_data))
+            for msg_sid, msg_data in self._sample_frames()
+        ]
+
+    def test_live_telemetry_stream_matches_parse(self):
+        frames = self._telemetry_frames()
+        expected = [LiveTelemetryParser().parse(frame) for frame in frames]
+        stream = b''.join(frames)
+        for chunk_size in (1, 2, 5, 16, len(stream)):
+            decoder = LiveTelemetryStream()
+            results = []
+            for i in range(0, len(stream), chunk_size):
+                results.extend(decoder.feed(stream[i:i + chunk_size]))
+            assert results == expected
+            assert decoder.pending == 0
+            assert decoder.frames == len(frames)
+            assert decoder.bytes_dropped == 0
+
+    def test_live_telemetry_stream_resyncs(self):
+        frames = self._telemetry_frames()
+        corrupted = bytearray(frames[1])
+        corrupted[-2] ^= 0x40
+        stream = b'\x55\x02' + frames[0] + bytes(corrupted) + b'\x02\xFF' + frames[2] + b'\x02\x09' + frames[3]
+        decoder = LiveTelemetryStream()
+        results = []
+        for i in range(0, len(stream), 3):
+            results.extend(decoder.feed(stream[i:i + 3]))
+        assert results == [LiveTelemetryParser().parse(frame) for frame in (frames[0], frames[2], frames[3])]
+        assert decoder.bytes_dropped == 2 + len(corrupted) + 2 + 2
+
+    def test_live_telemetry_stream_partial_frame(self):
+        frame = self._telemetry_frames()[0]
+        decoder = LiveTelemetryStream(validate=False)
+        assert decoder.feed(frame[:-1]) == []
+        assert decoder.pending == len(frame) - 1
+        assert decoder.feed(frame[-1:]) == [LiveTelemetryParser(validate=False).parse(frame)]
+
+        assert decoder.feed(frame[:4]) == []
+        decoder.reset()
+        assert decoder.pending == 0
+        assert decoder.feed(frame[4:]) == []
+        assert decoder.bytes_dropped == len(frame)
+
+    def test_parse_many_matches_parse_to_object(self):
+        frames = self._sample_frames()
+        results = _ParsleyParseInternal.parse_many([sid for sid, _ in frames], [data for _, data in frames])
+
+        assert len(results) == len(frames)
+        for (msg_sid, msg_data), result in zip(frames, results):
+            assert result == _ParsleyParseInternal.parse_to_object(msg_sid, msg_data)
+        assert [r.data['value'] for r in results if isinstance(r, ParsleyObject) and r.msg_type == 'SENSOR_ANALOG16'] == [3300, 2, 5]
+
+    def test_parse_many_empty(self):
+        assert _ParsleyParseInternal.parse_many([], []) == []
+
+    def test_parse_many_length_mismatch(self):
+        with pytest.raises(ValueError) as e:
+            _ParsleyParseInternal.parse_many([b'\x00'], [])
+        assert 'payloads' in str(e.value)
+
+    def test_logger_parse_many(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        pages = [
+            utilities.make_logger_page(255, [(sid, 1, b'\x00\x01\x00\x0A'), (sid, 2, b'\x00\x02\x00\x0B')]),
+            utilities.make_logger_page(256, [(sid, 3, b'\x00\x03\x00\x0C')]),
+        ]
+        results = LoggerParser().parse_many(pages, 255)
+        assert [r.data['value'] for r in results] == [10, 11, 12]
+        assert results == [r for page_number, page in enumerate(pages, 255) for r in LoggerParser().parse(page, page_number)]
+
+    def test_logger_parse_many_bad_page_number(self):
+        pages = [utilities.make_logger_page(0, []), utilities.make_logger_page(5, [])]
+        with pytest.raises(ValueError) as e:
+            LoggerParser().parse_many(pages, 0)
+        assert 'Page number mismatch' in str(e.value)
+
+    def test_parse_without_validation(self):
+        for msg_sid, msg_data in self._sample_frames():
+            validated = _ParsleyParseInternal.parse_to_object(msg_sid, msg_data)
+            record = _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, validate=False)
+            if isinstance(validated, ParsleyError):
+                assert record == validated
+            else:
+                assert isinstance(record, ParsleyRecord)
+                assert record.to_object() == validated
+                assert record['data'] == validated['data']
+
+    def test_parse_many_without_validation(self):
+        frames = self._sample_frames()
+        records = _ParsleyParseInternal.parse_many([sid for sid, _ in frames], [data for _, data in frames], validate=False)
+        assert records == [_ParsleyParseInternal.parse_to_object(sid, data, validate=False) for sid, data in frames]
+
+    def test_parsers_without_validation(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        page = utilities.make_logger_page(0, [(sid, 1, b'\x00\x01\x00\x0A')])
+        records = list(LoggerParser(validate=False).parse(page, 0))
+        assert [type(r) for r in records] == [ParsleyRecord]
+        assert records[0].data == {'time': 0.001, 'value': 10}
+        assert LoggerParser(validate=False).parse_many([page]) == records
+
+        record = records[0]._replace(log_timestamp=None, monotonic_time=None)
+        assert USBDebugParser(validate=False).parse(f'${sid:X}:00,01,00,0A') == record
+        assert USBDebugParser().parse(f'${sid:X}:00,01,00,0A') == record.to_object()
+
+    def _dump_pages(self, page_count):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        return [
+            utilities.make_logger_page(page, [(sid, page, bytes([0, 1, page >> 8, page & 0xFF]))] * 2)
+            for page in range(page_count)
+        ]
+
+    def test_logger_parse_dump_path(self, tmp_path):
+        pages = self._dump_pages(300) # wraps the page number around 256
+        path = tmp_path / 'dump.bin'
+        path.write_bytes(b''.join(pages))
+
+        results = LoggerParser().parse_dump(path)
+        assert not isinstance(results, list) # results are produced lazily
+        assert [r.data['value'] for r in results] == [page for page in range(300) for _ in range(2)]
+        assert list(LoggerParser().parse_dump(str(path))) == LoggerParser().parse_many(pages)
+
+    def test_logger_parse_dump_file_objects(self, tmp_path):
+        import io
+        pages = self._dump_pages(3)
+        dump = b''.join(pages)
+        assert list(LoggerParser().parse_dump(io.BytesIO(dump))) == LoggerParser().parse_many(pages)
+
+        path = tmp_path / 'dump.bin'
+        path.write_bytes(b'junk' * 1024 + dump)
+        with open(path, 'rb') as file:
+            file.seek(4096) # mapped files are read from their current position
+            assert list(LoggerParser().parse_dump(file)) == LoggerParser().parse_many(pages)
+            assert not file.closed
+
+    def test_logger_parse_dump_empty(self, tmp_path):
+        path = tmp_path / 'empty.bin'
+        path.write_bytes(b'')
+        assert list(LoggerParser().parse_dump(path)) == []
+
+    def test_logger_parse_dump_truncated(self, tmp_path):
+        path = tmp_path / 'dump.bin'
+        path.write_bytes(b''.join(self._dump_pages(2))[:-1])
+        with pytest.raises(ValueError) as e:
+            list(LoggerParser().parse_dump(path))
+        assert 'exactly 4096 bytes' in str(e.value)
+
+    def test_logger_timestamps(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        page = utilities.make_logger_page(0, [(sid, 1234, b'\x04\xD2\x00\x0A'), (0x1FFFFFFF, 5000, b'')])
+        results = list(LoggerParser().parse(page, 0))
+        assert [r.log_timestamp for r in results] == [1234, 5000]
+        assert results[0].monotonic_time == 1.234
+        assert isinstance(results[1], ParsleyError)
+        assert results[1].monotonic_time == 5.0
+        # log fields don't show up in dumps
+        assert 'log_timestamp' not in results[0].model_dump()
+        assert LoggerParser().parse_many([page]) == results
+
+        records = LoggerParser(validate=False).parse_many([page])
+        assert [(r.log_timestamp, r.monotonic_time) for r in records] == [(1234, 1.234), (5000, 5.0)]
+
+    def test_logger_monotonic_time_rollover(self):
+        # 16-bit millisecond time wraps every 65.536 s
+        assert LoggerParser.monotonic_time(1.0, 1000) == 1.0
+        assert LoggerParser.monotonic_time(1.0, 66_536) == pytest.approx(66.536)
+        assert LoggerParser.monotonic_time(1.0, 3 * 65_536 + 1_100) == pytest.approx(3 * 65.536 + 1.0)
+        # board clock slightly ahead of the logger's around a wrap
+        assert LoggerParser.monotonic_time(0.01, 65_530) == pytest.approx(65.546)
+        assert LoggerParser.monotonic_time(65.5, 65_540) == pytest.approx(65.5)
+        assert LoggerParser.monotonic_time(65.5, 10) == pytest.approx(65.5)
+        assert LoggerParser.monotonic_time(None, 2500) == 2.5
+
+    def test_logger_monotonic_time_clock_skew(self):
+        wrap = LoggerParser.TIME_WRAP
+        log_timestamps = range(40_000, 300_000, 700)
+        def offsets(skew):
+            # how far ahead of the logger each message is placed, for a board clock skew seconds ahead
+            return [LoggerParser.monotonic_time((log_timestamp / 1000 + skew) % wrap, log_timestamp) - log_timestamp / 1000 for log_timestamp in log_timestamps]
+        # up to half a wrap (about 32.8 s) apart, the board's own time is recovered
+        for skew in (-32.0, -5.0, 0.0, 5.0, 32.0):
+            assert offsets(skew) == pytest.approx([skew] * len(log_timestamps))
+        # further apart, messages are placed a whole wrap off
+        assert offsets(34.0) == pytest.approx([34.0 - wrap] * len(log_timestamps))
+        assert offsets(-34.0) == pytest.approx([wrap - 34.0] * len(log_timestamps))
+
+    def _encodable_results(self, validate=True):
+        results = [_ParsleyParseInternal.parse_to_object(sid, data, validate) for sid, data in self._sample_frames()]
+        return [result for result in results if not isinstance(result, ParsleyError)]
+
+    def test_live_telemetry_encode_round_trip(self):
+        for validate in (True, False):
+            results = self._encodable_results(validate)
+            stream = LiveTelemetryParser().encode_many(results)
+            assert LiveTelemetryStream(validate).feed(stream) == results
+            assert LiveTelemetryParser(validate).parse(LiveTelemetryParser().encode(results[0])) == results[0]
+
+        frame = LiveTelemetryParser.encode_frame(0x1234, b'\xAB')
+        assert frame == utilities.make_live_telemetry_frame(0x1234, b'\xAB')
+
+    def test_encode_results_errors(self):
+        error = _ParsleyParseInternal.parse_to_object(b'\x00\x00', b'\xAB')
+        with pytest.raises(ValueError):
+            LiveTelemetryParser().encode(error)
+        with pytest.raises(ValueError) as e:
+            LiveTelemetryParser().encode({'msg_type': 'NOT_A_TYPE', 'msg_prio': 'LOW', 'board_type_id': 'ANY', 'board_inst_id': 'ANY', 'msg_metadata': 0})
+        assert 'NOT_A_TYPE' in str(e.value)
+
+    def test_logger_encode_pages_round_trip(self):
+        results = [result.model_copy(update={'log_timestamp': timestamp}) for timestamp, result in enumerate(self._encodable_results() * 300)]
+        pages = list(LoggerParser().encode_pages(results, 254))
+        assert len(pages) > 1
+        assert all(len(page) == LoggerParser.PARSE_LOGGER_PAGE_SIZE for page in pages)
+        decoded = LoggerParser().parse_many(pages, 254)
+        assert [r.log_timestamp for r in decoded] == list(range(len(results)))
+        assert [r.model_dump() for r in decoded] == [r.model_dump() for r in results]
+        assert list(LoggerParser().encode_pages([])) == []
+
+    def test_logger_encode_page_boundary(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('LOW', 'LEDS_ON', '0', 'GPS', 'GROUND'), 'big')
+        leds_on = _ParsleyParseInternal.parse_to_object(sid, b'', validate=False)
+        # 4 + 454 * 9 = 4090 leaves 6 bytes, too few for another header
+        pages = list(LoggerParser().encode_pages([leds_on] * 455))
+        assert len(pages) == 2
+        assert len(list(LoggerParser().parse(pages[0], 0))) == 454
+        assert len(list(LoggerParser().parse(pages[1], 1))) == 1
+
+    def test_logger_pack_pages(self):
+        # raw records, including frames that decode to ParsleyErrors and so can't be encoded from results
+        frames = [(0x3F << 20 | 0x1234, b'\x01\x02'), (0x1234, b'\xFF' * 8)] * 500
+        pages = list(LoggerParser().pack_pages((msg_sid, msg_data, timestamp) for timestamp, (msg_sid, msg_data) in enumerate(frames)))
+        logger_parser = LoggerParser()
+        decoded = logger_parser.parse_many(pages)
+        assert decoded == [logger_parser.add_log_timestamp(_ParsleyParseInternal.parse_to_object(*frame), timestamp) for timestamp, frame in enumerate(frames)]
+
+    def test_logger_write_dump(self, tmp_path):
+        results = self._encodable_results(validate=False) * 1000
+        path = tmp_path / 'dump.bin'
+        page_count = LoggerParser().write_dump(results, path, 3)
+        assert path.stat().st_size == page_count * LoggerParser.PARSE_LOGGER_PAGE_SIZE
+        decoded = list(LoggerParser(validate=False).parse_dump(path, 3))
+        assert [r._replace(log_timestamp=None, monotonic_time=None) for r in decoded] == results
+
+    def test_sid_cache_matches_uncached(self):
+        rng = random.Random(0)
+        sids = [rng.getrandbits(29) for _ in range(300)] + [sid for sid, _ in self._sample_frames() if isinstance(sid, int)]
+        for sid in sids:
+            SID_CACHE.clear()
+            first = _ParsleyParseInternal.parse_to_object(sid, b'\x00' * 8)
+            second = _ParsleyParseInternal.parse_to_object(sid, b'\x00' * 8)
+            assert first == second
+            assert SID_CACHE.cache_info().hits == 1
+
+    def test_sid_cache_oversized_sid(self):
+        # BitString only masks the SID's fields after the first one, so prio keeps the extra bits
+        result = _ParsleyParseInternal.parse_to_object(0xFFFFFFFF, b'')
+        assert result.msg_prio == '0x1F'
+        assert _ParsleyParseInternal.parse_to_object(b'\xFF\xFF\xFF\xFF', b'') == result
+
+    def test_sid_cache_info(self):
+        cache = SidHeaderCache(maxsize=2)
+        for sid in (1, 2, 1, 3, 1):
+            assert cache.get(sid) == _ParsleyParseInternal.decode_sid(sid)
+        info = cache.cache_info()
+        assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 4, 2, 2)
+        cache.clear()
+        assert cache.cache_info() == (0, 0, 2, 0)
+        uncached = SidHeaderCache(maxsize=0)
+        uncached.get(1)
+        assert uncached.cache_info().currsize == 0
+
+    def test_result_cache_matches_uncached(self):
+        frames = [(sid, bytes([t >> 8, t & 0xFF]) + bytes(data[2:])) for t in range(0, 3000, 7) for sid, data in self._sample_frames()]
+        for eviction in ('lru', 'fifo'):
+            cache = ResultCache(maxsize=4, eviction=eviction)
+            for validate in (True, False):
+                for msg_sid, msg_data in frames:
+                    assert _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, validate, cache) == _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, validate)
+            assert cache.cache_info().hits > 0
+            assert cache.cache_info().currsize <= 4
+
+    def test_result_cache_copies_data(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        cache = ResultCache()
+        first = _ParsleyParseInternal.parse_to_object(sid, b'\x00\x01\x00\x0A', False, cache)
+        first.data['value'] = -1
+        second = _ParsleyParseInternal.parse_to_object(sid, b'\x00\x02\x00\x0A', False, cache)
+        assert second.data == {'time': 0.002, 'value': 10}
+        assert list(second.data) == ['time', 'value']
+        assert cache.cache_info()[:2] == (1, 1)
+
+    def test_result_cache_eviction(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        payloads = [b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', b'\x00\x00\x00\x01', b'\x00\x00\x00\x03', b'\x00\x00\x00\x01']
+        lru, fifo = ResultCache(maxsize=2), ResultCache(maxsize=2, eviction='fifo')
+        for payload in payloads:
+            _ParsleyParseInternal.decode_frame(sid, payload, None, lru)
+            _ParsleyParseInternal.decode_frame(sid, payload, None, fifo)
+        assert lru.cache_info()[:2] == (2, 3)
+        assert fifo.cache_info()[:2] == (1, 4)
+        with pytest.raises(ValueError):
+            ResultCache(eviction='random')
+
+    @staticmethod
+    def _random_frames(count: int, seed: int) -> list[tuple[int, bytes]]:
+        rng = random.Random(seed)
+        return [(rng.getrandbits(29), bytes(rng.getrandbits(8) for _ in range(8))) for _ in range(count)]
+
+    @staticmethod
+    def _run_in_threads(work, n_threads: int = 8):
+        # switch threads as often as possible, so switches land between a size check and an eviction
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(n_threads) as executor:
+                for future in [executor.submit(work) for _ in range(n_threads)]:
+                    future.result()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+    def test_sid_cache_shared_between_threads(self):
+        sids = [msg_sid for msg_sid, _ in self._random_frames(200, seed=5)]
+        cache = SidHeaderCache(maxsize=2)
+
+        def work():
+            for _ in range(50):
+                for msg_sid in sids:
+                    assert cache.get(msg_sid) == _ParsleyParseInternal.decode_sid(msg_sid)
+
+        self._run_in_threads(work)
+        assert cache.cache_info().currsize <= 2
+
+    def test_result_cache_shared_between_threads(self):
+        frames = self._random_frames(200, seed=5)
+        expected = [_ParsleyParseInternal.parse_to_object(*frame) for frame in frames]
+        caches = [ResultCache(maxsize=2), ResultCache(maxsize=2, eviction='fifo')]
+
+        def work():
+            for _ in range(20):
+                for frame, result in zip(frames, expected):
+                    for cache in caches:
+                        assert _ParsleyParseInternal.parse_to_object(*frame, True, cache) == result
+
+        self._run_in_threads(work)
+        assert all(cache.cache_info().currsize <= 2 for cache in caches)
+
+    def test_format_line_caches_shared_between_threads(self, monkeypatch):
+        monkeypatch.setattr(parsley.parse_to_object, 'MAX_LINE_TEMPLATES', 2)
+        results = [_ParsleyParseInternal.parse_to_object(*frame) for frame in self._random_frames(200, seed=5)]
+        parsed_datas = [result.model_dump() for result in results if isinstance(result, ParsleyObject)]
+        expected = [_ParsleyParseInternal.format_line(parsed_data) for parsed_data in parsed_datas]
+
+        def work():
+            for _ in range(20):
+                assert [_ParsleyParseInternal.format_line(parsed_data) for parsed_data in parsed_datas] == expected
+
+        self._run_in_threads(work)
+
+    def test_parsers_with_result_cache(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        page = utilities.make_logger_page(0, [(sid, t, bytes([0, t, 0, 10])) for t in range(50)])
+        cache = ResultCache()
+        assert LoggerParser(result_cache=cache).parse_many([page]) == LoggerParser().parse_many([page])
+        assert cache.cache_info()[:2] == (49, 1)
+        assert USBDebugParser(result_cache=cache).parse(f'${sid:X}:00,60,00,0A').data == {'time': 0.096, 'value': 10}
+        assert cache.cache_info().hits == 50
+
+    def test_lazy_matches_eager(self):
+        rng = random.Random(2)
+        frames = [(rng.getrandbits(29), bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 8)))) for _ in range(3000)]
+        n_lazy = 0
+        for msg_sid, msg_data in frames:
+            eager = _ParsleyParseInternal.parse_to_object(msg_sid, msg_data)
+            lazy = _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, lazy=True)
+            if isinstance(eager, ParsleyError):
+                assert lazy == eager
+                continue
+            n_lazy += 1
+            assert isinstance(lazy, LazyParsleyObject)
+            for key in ('msg_prio', 'msg_type', 'board_type_id', 'board_inst_id', 'msg_metadata'):
+                assert lazy[key] == eager[key]
+            assert lazy['data'] == eager['data']
+            assert lazy.model_dump() == eager.model_dump()
+            assert lazy.model_dump(mode='json') == eager.model_dump(mode='json')
+            assert lazy.to_object() == eager
+        assert n_lazy > 100
+
+    def test_lazy_object(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        lazy = _ParsleyParseInternal.parse_to_object(sid, b'\x03\xE8\x00\x10', lazy=True)
+        assert lazy.msg_type == 'SENSOR_ANALOG16'
+        assert lazy['data']['value'] == 16
+        assert lazy.data.get('time') == 1.0
+        with pytest.raises(KeyError):
+            lazy['log_timestamp']
+        with pytest.raises(KeyError):
+            lazy['not_a_key']
+        assert 'SENSOR_ANALOG16' in repr(lazy)
+        assert _ParsleyParseInternal.encode_data(lazy.model_dump() | lazy.model_dump()['data']) == (sid, [0x03, 0xE8, 0x00, 0x10])
+        assert next(_ParsleyParseInternal.encode_results([lazy]))[:2] == (sid, b'\x03\xE8\x00\x10')
+
+    def test_lazy_parsers(self):
+        sid = int.from_bytes(utilities.create_msg_sid_from_strings('MEDIUM', 'SENSOR_ANALOG16', '0', 'POWER', 'ROCKET'), 'big')
+        line = f'${sid:X}:03,E8,00,10'
+        eager = USBDebugParser().parse(line)
+        assert USBDebugParser(lazy=True).parse(line).to_object() == eager
+        assert [result.to_object() for result in USBDebugParser(lazy=True).parse_text(line + '\n' + line)] == [eager, eager]
+
+        frame = utilities.make_live_telemetry_frame(sid, b'\x03\xE8\x00\x10')
+        assert LiveTelemetryParser(lazy=True).parse(frame).to_object() == eager
+        assert LiveTelemetryStream(lazy=True).feed(frame)[0].to_object() == eager
+
+        page = utilities.make_logger_page(0, [(sid, 1000, b'\x03\xE8\x00\x10')])
+        lazy = LoggerParser(lazy=True).parse_many([page])[0]
+        assert (lazy.log_timestamp, lazy.monotonic_time) == (1000, 1.0)
+        assert lazy.to_object() == LoggerParser().parse_many([page])[0]
+
+        file = io.StringIO()
+        _ParsleyParseInternal.write_lines([lazy], file)
+        assert file.getvalue() == _ParsleyParseInternal.format_line(eager.model_dump()) + '\n'
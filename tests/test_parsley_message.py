@@ -1,7 +1,7 @@
 import pytest
 from pydantic import ValidationError
 
-from parsley.parsley_message import ParsleyObject, ParsleyError
+from parsley.parsley_message import ParsleyObject, ParsleyError, ParsleyRecord
 
 def test_parsley_error_getitem():
     err = ParsleyError(
@@ -138,3 +138,104 @@ def test_parsley_object_invalid_type_raises():
             msg_metadata=0,
             data={}
         )
+
+
+def test_parsley_record_getitem():
+    record = ParsleyRecord('HIGH', 'RESET_CMD', 'ANY', 'GROUND', 0, {'time': 1.0})
+
+    assert record['msg_prio'] == 'HIGH'
+    assert record['msg_type'] == 'RESET_CMD'
+    assert record['data'] == {'time': 1.0}
+    assert record[0] == 'HIGH'
+    with pytest.raises(KeyError):
+        record['error']
+
+
+def test_parsley_record_to_object():
+    record = ParsleyRecord('LOW', 'SENSOR_ANALOG16', 'LOGGER', 'ROCKET', 'SENSOR_PT_CHANNEL_1', {'time': 0.0, 'value': 0})
+    obj = record.to_object()
+
+    assert isinstance(obj, ParsleyObject)
+    assert obj == ParsleyObject(**record._asdict())
+
+
+def test_parsley_record_to_object_unknown_prio_raises():
+    record = ParsleyRecord('0x1F', 'RESET_CMD', 'ANY', 'GROUND', 0, {})
+    with pytest.raises(ValidationError):
+        record.to_object()
+
+
+def test_getitem_matches_full_dumps():
+    obj = ParsleyObject(
+        board_type_id='LOGGER', board_inst_id='ROCKET', msg_prio='LOW', msg_type='SENSOR_ANALOG16',
+        msg_metadata='SENSOR_PT_CHANNEL_1', data={'time': 1.0, 'value': 3}, log_timestamp=5, monotonic_time=1.0,
+    )
+    err = ParsleyError('HIGH', 'ANY', 'GROUND', 'RESET_CMD', 0, 'deadbeef', 'error: bad', log_timestamp=5)
+
+    for result, dump in ((obj, obj.model_dump()), (err, err.asdict())):
+        for key, value in dump.items():
+            assert result[key] == value
+        for key in ('not_a_key', 'msg_data' if result is obj else 'data', 0):
+            with pytest.raises(KeyError):
+                result[key]
+        with pytest.raises(TypeError):
+            result[['unhashable']]
+    # logger fields are left out of model_dump() and ParsleyError.asdict(), so they can't be subscripted either
+    for result in (obj, err):
+        with pytest.raises(KeyError):
+            result['log_timestamp']
+        assert result.log_timestamp == 5
+
+
+def test_as_mapping():
+    obj = ParsleyObject(board_type_id='ANY', board_inst_id='GROUND', msg_prio='HIGH', msg_type='RESET_CMD', msg_metadata=0, data={})
+    err = ParsleyError('HIGH', 'ANY', 'GROUND', 'RESET_CMD', 0, 'deadbeef', 'error: bad')
+
+    view = obj.as_mapping()
+    assert dict(view) == obj.model_dump()
+    assert list(view) == list(obj.model_dump())
+    assert len(view) == 6 and 'data' in view and 'log_timestamp' not in view
+    assert view.get('not_a_key') is None
+
+    view = err.as_mapping()
+    assert dict(view) == err.asdict()
+    assert 'log_timestamp' not in view
+    err.error = 'error: worse' # views are live
+    assert view['error'] == 'error: worse'
+    assert 'ResultView' in repr(view)
+
+
+def test_getitem_dumps_nested_models():
+    from pydantic import BaseModel
+
+    class Payload(BaseModel):
+        value: int
+
+    obj = ParsleyObject(board_type_id='ANY', board_inst_id='GROUND', msg_prio='HIGH', msg_type='RESET_CMD', msg_metadata=0, data=Payload(value=3))
+    assert obj['data'] == obj.model_dump()['data'] == {'value': 3}
+
+
+def test_error_log_fields_stay_out_of_dumps():
+    from dataclasses import asdict
+    err = ParsleyError('HIGH', 'ANY', 'GROUND', 'RESET_CMD', 0, 'deadbeef', 'error: bad', log_timestamp=5, monotonic_time=0.5)
+    plain = ParsleyError('HIGH', 'ANY', 'GROUND', 'RESET_CMD', 0, 'deadbeef', 'error: bad')
+
+    assert (err.log_timestamp, err.monotonic_time) == (5, 0.5)
+    assert (plain.log_timestamp, plain.monotonic_time) == (None, None)
+    assert err.asdict() == plain.asdict()
+    assert list(err.asdict()) == ['msg_prio', 'board_type_id', 'board_inst_id', 'msg_type', 'msg_metadata', 'msg_data', 'error']
+    # they're regular dataclass fields, so dataclasses.asdict() and type checkers see them
+    assert asdict(err) == err.asdict() | {'log_timestamp': 5, 'monotonic_time': 0.5}
+    assert repr(err) == repr(plain) and 'log_timestamp' not in repr(err)
+    assert err == plain # compare=False
+
+
+def test_getitem_data_is_a_copy():
+    obj = ParsleyObject(board_type_id='ANY', board_inst_id='GROUND', msg_prio='HIGH', msg_type='SENSOR_ANALOG16',
+                        msg_metadata='SENSOR_PT_CHANNEL_1', data={'time': 1.0, 'value': 3})
+    data = obj['data']
+    assert data == obj.model_dump()['data']
+    data['value'] = 4
+    del data['time']
+    assert obj.data == {'time': 1.0, 'value': 3}
+    assert obj.as_mapping()['data'] is not obj.data
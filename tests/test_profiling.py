@@ -0,0 +1,133 @@
+import pytest
+
+from parsley.bitstring import BitString
+from parsley.parse_to_object import _ParsleyParseInternal, USBDebugParser, LiveTelemetryParser, LiveTelemetryStream, LoggerParser, BitstringParser
+from parsley.parsley_message import ParsleyError
+from parsley.profiling import STAGES, Profiler
+
+import utils as utilities
+
+VALID = {
+    'msg_prio': 'HIGH', 'msg_type': 'SENSOR_ANALOG16', 'board_type_id': 'POWER',
+    'board_inst_id': 'ROCKET', 'msg_metadata': 'SENSOR_5V_VOLT', 'time': 1.5, 'value': 100,
+}
+
+def frames():
+    msg_sid, msg_data = _ParsleyParseInternal.encode_data(VALID)
+    return [
+        (msg_sid, bytes(msg_data)),
+        (msg_sid, bytes(msg_data[:2])),            # truncated
+        (msg_sid | 0x3F << 20, bytes(msg_data)),   # undefined msg_type
+    ]
+
+def without_log_fields(result):
+    return result if isinstance(result, ParsleyError) else result.model_copy(update={'log_timestamp': None, 'monotonic_time': None})
+
+class TestProfiler:
+    def test_parse_to_object(self):
+        profiler = Profiler()
+        for msg_sid, msg_data in frames():
+            assert _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, profiler=profiler) == _ParsleyParseInternal.parse_to_object(msg_sid, msg_data)
+
+        stages = profiler.stages()
+        assert stages['sid_decode'].calls == 3
+        assert stages['field_decode'].calls == 2
+        assert stages['validation'].calls == 1
+        assert stages['framing'].calls == 0
+        assert profiler.errors_by_kind == {'truncated': 1, 'msg_type': 1}
+        assert profiler.frames_by_type['SENSOR_ANALOG16'] == 1
+        assert sum(profiler.frames_by_type.values()) == 3
+
+    def test_validate_false(self):
+        profiler = Profiler()
+        msg_sid, msg_data = frames()[0]
+        record = _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, False, profiler=profiler)
+        assert record == _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, False)
+        assert profiler.stages()['validation'].calls == 0
+
+    def test_parse_many(self):
+        profiler = Profiler()
+        msg_sids, msg_datas = zip(*frames())
+        results = _ParsleyParseInternal.parse_many(msg_sids, msg_datas, profiler=profiler)
+        assert results == _ParsleyParseInternal.parse_many(msg_sids, msg_datas)
+        assert sum(profiler.frames_by_type.values()) == 3
+        assert profiler.stages()['sid_decode'].calls == 4 # grouping plus each frame
+
+    def test_usb_debug(self):
+        lines = [f'${msg_sid:X}:' + ','.join(f'{byte:02X}' for byte in msg_data) for msg_sid, msg_data in frames()]
+        profiler = Profiler()
+        parser = USBDebugParser(profiler=profiler)
+        assert [parser.parse(line) for line in lines] == [USBDebugParser().parse(line) for line in lines]
+        assert parser.parse_text('\n'.join(lines)) == USBDebugParser().parse_text('\n'.join(lines))
+        assert profiler.stages()['framing'].calls == 4
+        assert profiler.bytes_consumed == 2 * sum(len(line) for line in lines) + len(lines) - 1
+
+        with pytest.raises(ValueError):
+            parser.parse('not a line')
+        assert profiler.errors_by_kind['framing'] == 1
+
+    def test_live_telemetry(self):
+        telemetry = [utilities.make_live_telemetry_frame(msg_sid, msg_data) for msg_sid, msg_data in frames()]
+        profiler = Profiler()
+        parser = LiveTelemetryParser(profiler=profiler)
+        assert [parser.parse(frame) for frame in telemetry] == [LiveTelemetryParser().parse(frame) for frame in telemetry]
+        assert profiler.stages()['crc'].calls == 3
+        assert profiler.bytes_consumed == sum(map(len, telemetry))
+
+        with pytest.raises(ValueError):
+            parser.parse(telemetry[0][:-1] + bytes([telemetry[0][-1] ^ 1]))
+        assert profiler.errors_by_kind['crc'] == 1
+
+    def test_live_telemetry_stream(self):
+        telemetry = [utilities.make_live_telemetry_frame(msg_sid, msg_data) for msg_sid, msg_data in frames()]
+        corrupted = bytearray(telemetry[0])
+        corrupted[-1] ^= 1
+        stream = b'\x02\xFF' + b''.join(telemetry) + bytes(corrupted)
+
+        profiler = Profiler()
+        results = LiveTelemetryStream(profiler=profiler).feed(stream)
+        assert results == LiveTelemetryStream().feed(stream)
+        assert len(results) == 3
+        assert profiler.errors_by_kind == {'framing': 1, 'crc': 1, 'truncated': 1, 'msg_type': 1}
+        assert profiler.bytes_consumed == len(stream)
+        assert profiler.stages()['framing'].calls == 1
+
+    def test_logger(self):
+        page = utilities.make_logger_page(0, [(msg_sid, i, msg_data) for i, (msg_sid, msg_data) in enumerate(frames())])
+        profiler = Profiler()
+        parser = LoggerParser(profiler=profiler)
+        expected = list(LoggerParser().parse(page, 0))
+        assert list(parser.parse(page, 0)) == expected
+        assert [without_log_fields(result) for result in parser.parse_many([page])] == [without_log_fields(result) for result in expected]
+        assert profiler.bytes_consumed == 2 * len(page)
+        assert profiler.stages()['framing'].calls == 5 # 4 steps of the record iterator plus read_frames
+        assert sum(profiler.frames_by_type.values()) == 6
+
+    def test_bitstring(self):
+        msg_sid, msg_data = frames()[0]
+        profiler = Profiler()
+        result = BitstringParser(profiler=profiler).parse(BitString(msg_sid.to_bytes(4, 'big') + msg_data))
+        assert result == BitstringParser().parse(BitString(msg_sid.to_bytes(4, 'big') + msg_data))
+        assert profiler.bytes_consumed == 4 + len(msg_data)
+        assert profiler.stages()['framing'].calls == 1
+
+    def test_timed_formatting(self):
+        profiler = Profiler()
+        format_line = profiler.timed('formatting', _ParsleyParseInternal.format_line)
+        result = _ParsleyParseInternal.parse_to_object(*frames()[0])
+        assert format_line(result.model_dump()) == _ParsleyParseInternal.format_line(result.model_dump())
+        assert profiler.stages()['formatting'].calls == 1
+
+    def test_report_and_reset(self):
+        profiler = Profiler()
+        for msg_sid, msg_data in frames():
+            _ParsleyParseInternal.parse_to_object(msg_sid, msg_data, profiler=profiler)
+        report = profiler.report()
+        for stage in STAGES:
+            assert stage in report
+        assert 'SENSOR_ANALOG16' in report and 'truncated' in report
+
+        profiler.reset()
+        assert all(stats == (0, 0) for stats in profiler.stages().values())
+        assert not profiler.frames_by_type and not profiler.errors_by_kind
+        assert profiler.bytes_consumed == 0
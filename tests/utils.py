@@ -1,4 +1,6 @@
 import pytest
+import struct
+import crc8
 
 from parsley.bitstring import BitString
 from parsley.message_definitions import MESSAGE_TYPE, BOARD_TYPE_ID, BOARD_INST_ID, MESSAGE_SID, MESSAGE_PRIO, MESSAGE_METADATA
@@ -33,3 +35,17 @@ def split_format_line(line: str) -> tuple[list[str], dict[str, str]]:
     assert len(parts) % 2 == 0, f"format_line body has unpaired key/value tokens: {body!r}"
     body_dict = {parts[i].rstrip(':'): parts[i + 1] for i in range(0, len(parts), 2)}
     return header_fields, body_dict
+
+
+def make_logger_page(page_number: int, records: list[tuple[int, int, bytes]], page_size: int = 4096) -> bytes:
+    """Build one logger page from (sid, timestamp, data) records, 0xFF-padded like the logger does."""
+    buf = bytearray(b'LOG') + bytes([page_number % 256])
+    for sid, timestamp, data in records:
+        buf += struct.pack('<IIB', sid, timestamp, len(data)) + bytes(data)
+    assert len(buf) <= page_size, 'records do not fit in one logger page'
+    return bytes(buf.ljust(page_size, b'\xff'))
+
+def make_live_telemetry_frame(sid: int, data: bytes) -> bytes:
+    """Build one live-telemetry frame: 0x02, length, 29-bit SID, data, CRC8."""
+    frame = bytearray([0x02, 7 + len(data)]) + (sid & 0x1FFFFFFF).to_bytes(4, 'big') + bytes(data)
+    return bytes(frame + crc8.crc8(frame).digest())